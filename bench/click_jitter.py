@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+连点调度抖动基准测试
+
+用与引擎相同的DeadlineScheduler按固定间隔执行空点击，统计实际执行时间
+相对截止时间的延迟分布。可以指定调度线程的CPU亲和性和优先级，并用
+--load启动忙循环进程模拟繁忙的构建机，对比调优前后的效果。
+
+用法: python bench/click_jitter.py --interval 5 --clicks 2000 --load 4 --cpus 3 --priority realtime
+"""
+
+import os
+import sys
+import argparse
+import threading
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core.clock import NS_PER_MS
+from core.engine import ProbeBurstJob
+from core.scheduler import DeadlineScheduler
+from utils.thread_tuning import tune_current_thread, PRIORITY_NORMAL
+
+
+def _busy_loop():
+    """占满一个CPU的忙循环"""
+    while True:
+        pass
+
+
+def percentile(values, pct):
+    """计算百分位数"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Click scheduler jitter benchmark")
+    parser.add_argument("--interval", type=float, default=10.0, help="点击间隔(毫秒)")
+    parser.add_argument("--clicks", type=int, default=1000, help="点击次数")
+    parser.add_argument("--cpus", type=int, nargs="*", default=[], help="调度线程绑定的CPU")
+    parser.add_argument("--priority", default=PRIORITY_NORMAL, help="normal/high/realtime")
+    parser.add_argument("--load", type=int, default=0, help="后台忙循环进程数量")
+    args = parser.parse_args()
+    
+    workers = [multiprocessing.Process(target=_busy_loop, daemon=True) for _ in range(args.load)]
+    for worker in workers:
+        worker.start()
+    
+    reports = []
+    scheduler = DeadlineScheduler(thread_init=lambda: reports.append(tune_current_thread(args.cpus, args.priority)))
+    scheduler.start()
+    
+    # 使用设置界面测试连点的同一个任务，每次执行时记录相对截止时间的延迟
+    done = threading.Event()
+    lateness = []
+    
+    def on_tick(count):
+        lateness.append(job.times[-1] - job.deadline_ns)
+    
+    job = ProbeBurstJob(int(args.interval * NS_PER_MS), args.clicks, on_tick, lambda job: done.set())
+    scheduler.submit(job)
+    done.wait()
+    scheduler.stop()
+    
+    for worker in workers:
+        worker.terminate()
+    
+    lateness_ms = [value / NS_PER_MS for value in lateness]
+    print(f"granted: {reports[0] if reports else None}")
+    print(f"interval {args.interval}ms x {len(lateness_ms)} clicks, load={args.load}")
+    print(f"lateness ms: p50={percentile(lateness_ms, 50):.3f} p99={percentile(lateness_ms, 99):.3f} "
+          f"max={max(lateness_ms):.3f} mean={sum(lateness_ms) / len(lateness_ms):.3f}")
+
+
+if __name__ == "__main__":
+    main()
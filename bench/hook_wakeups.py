@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+钩子线程唤醒次数基准测试
+
+分别以all和buttons两种输入源模式运行监听器，测试期间持续移动鼠标，
+对比每秒进入Python回调的底层事件数量。
+
+用法: python bench/hook_wakeups.py --seconds 10
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core.input_source import create_listener, INPUT_MODE_ALL, INPUT_MODE_BUTTONS
+
+
+def measure(mode, seconds):
+    """
+    运行一次测量
+    
+    Args:
+        mode: 输入源模式
+        seconds: 测量时长(秒)
+    
+    Returns:
+        tuple: (每秒唤醒次数, 每秒送达的点击回调次数)
+    """
+    delivered = [0]
+    
+    def on_click(x, y, button, pressed):
+        delivered[0] += 1
+    
+    listener = create_listener(on_click, mode)
+    listener.start()
+    listener.wait()
+    start = time.perf_counter()
+    time.sleep(seconds)
+    elapsed = time.perf_counter() - start
+    wakeups = listener.hook_wakeups
+    listener.stop()
+    return wakeups / elapsed, delivered[0] / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hook thread wakeup benchmark")
+    parser.add_argument("--seconds", type=float, default=10.0, help="每种模式的测量时长")
+    args = parser.parse_args()
+    
+    for mode in (INPUT_MODE_ALL, INPUT_MODE_BUTTONS):
+        print(f"[{mode}] 请持续移动鼠标 {args.seconds:.0f} 秒...")
+        wakeups, delivered = measure(mode, args.seconds)
+        print(f"[{mode}] hook wakeups/s: {wakeups:.1f}, click callbacks/s: {delivered:.1f}")
+
+
+if __name__ == "__main__":
+    main()
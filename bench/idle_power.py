@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+空闲功耗基准测试(Linux)
+
+从/proc/<pid>/task/<tid>读取每个线程的上下文切换次数(自愿+非自愿)和CPU时间，
+计算空闲期间每秒唤醒次数和每小时CPU时间。空闲时所有线程都应阻塞，唤醒次数接近0。
+
+--pid 测量运行中的程序(测试期间不要操作鼠标和键盘)。
+--self 在本进程中启动不依赖Qt的引擎组件(调度线程、统计写入线程、控制服务线程、状态页)，
+先运行一次短暂的连点，再测量之后的空闲状态；任何线程超过--max-wakeups时返回1。
+
+用法: python bench/idle_power.py --pid 1234 --duration 60
+      python bench/idle_power.py --self --duration 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+def read_threads(pid):
+    """
+    读取进程所有线程的计数
+    
+    Args:
+        pid: 进程ID
+    
+    Returns:
+        dict: 线程ID -> (线程名, 上下文切换次数, CPU时间秒)
+    """
+    ticks = os.sysconf("SC_CLK_TCK")
+    result = {}
+    task_dir = f"/proc/{pid}/task"
+    for tid in os.listdir(task_dir):
+        try:
+            with open(f"{task_dir}/{tid}/comm") as f:
+                name = f.read().strip()
+            with open(f"{task_dir}/{tid}/stat") as f:
+                # comm可能包含空格，从最后一个")"之后开始按字段解析
+                fields = f.read().rsplit(")", 1)[1].split()
+            switches = 0
+            with open(f"{task_dir}/{tid}/status") as f:
+                for line in f:
+                    if line.startswith(("voluntary_ctxt_switches", "nonvoluntary_ctxt_switches")):
+                        switches += int(line.split()[1])
+        except OSError:
+            # 线程在读取期间退出
+            continue
+        # stat中")"之后第12、13个字段为utime、stime
+        cpu_s = (int(fields[11]) + int(fields[12])) / ticks
+        result[int(tid)] = (name, switches, cpu_s)
+    return result
+
+
+def measure(pid, duration, names=None):
+    """
+    测量一段时间内各线程的唤醒次数和CPU时间
+    
+    Args:
+        pid: 进程ID
+        duration: 测量时长(秒)
+        names: 线程ID -> 显示名称，覆盖/proc中的名称
+    
+    Returns:
+        list: (线程ID, 名称, 每秒唤醒次数, 每小时CPU毫秒)，按唤醒次数降序
+    """
+    before = read_threads(pid)
+    start = time.monotonic()
+    time.sleep(duration)
+    elapsed = time.monotonic() - start
+    after = read_threads(pid)
+    
+    rows = []
+    for tid, (name, switches, cpu_s) in after.items():
+        if tid not in before:
+            continue
+        _, switches_before, cpu_before = before[tid]
+        name = (names or {}).get(tid, name)
+        rows.append((tid, name, (switches - switches_before) / elapsed, (cpu_s - cpu_before) * 3600 * 1000 / elapsed))
+    rows.sort(key=lambda row: -row[2])
+    return rows
+
+
+def start_self_components():
+    """
+    在本进程中启动空闲时应全部阻塞的引擎组件，并运行一次短暂的连点
+    
+    Returns:
+        list: 需要保持引用的组件
+    """
+    from core.scheduler import DeadlineScheduler
+    from core.engine import ClickEngine
+    from core.clock import monotonic_ns
+    from core.control import ControlServer
+    from core.status_page import StatusPage
+    from utils.stats_store import StatsStore
+    
+    class NullInjector:
+        def click(self):
+            pass
+        
+        def press(self):
+            pass
+        
+        def release(self):
+            pass
+    
+    scheduler = DeadlineScheduler()
+    scheduler.start()
+    engine = ClickEngine(NullInjector(), scheduler)
+    engine.configure(2, 300, 10)
+    directory = tempfile.mkdtemp(prefix="rapidclicker_idle_")
+    stats = StatsStore(directory)
+    stats.start()
+    page = StatusPage(os.path.join(directory, "status.bin"))
+    engine.on_click_injected = page.click_injected
+    engine.on_stopped = lambda count, active_ns: stats.record_burst(time.time(), active_ns, count)
+    control = ControlServer(0)
+    control.start()
+    
+    # 一次短暂的连点，确认结束后各线程回到阻塞状态
+    now = monotonic_ns()
+    engine.on_button(True, now)
+    engine.on_button(False, now + 1000)
+    engine.on_button(True, now + 2000)
+    time.sleep(0.2)
+    engine.on_button(False, monotonic_ns())
+    print(f"warm-up burst: {engine.injected_clicks} clicks")
+    time.sleep(0.5)
+    return [scheduler, engine, stats, page, control]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Idle wakeup and CPU benchmark (Linux /proc)")
+    parser.add_argument("--pid", type=int, help="要测量的进程ID")
+    parser.add_argument("--self", dest="self_test", action="store_true", help="测量本进程中启动的引擎组件")
+    parser.add_argument("--duration", type=float, default=30.0, help="测量时长(秒)")
+    parser.add_argument("--max-wakeups", type=float, default=0.5, help="--self时每个线程允许的每秒唤醒次数")
+    args = parser.parse_args()
+    
+    if not os.path.isdir("/proc/self/task"):
+        parser.error("this benchmark needs Linux /proc")
+    if args.pid is None and not args.self_test:
+        parser.error("one of --pid or --self is required")
+    
+    names = None
+    if args.self_test:
+        components = start_self_components()
+        pid = os.getpid()
+        names = {thread.native_id: thread.name for thread in threading.enumerate()}
+    else:
+        pid = args.pid
+    
+    print(f"measuring pid {pid} for {args.duration:.0f}s, keep input devices idle...")
+    rows = measure(pid, args.duration, names)
+    
+    print(f"{'tid':>8}  {'thread':<24} {'wakeups/s':>10} {'cpu ms/h':>10}")
+    for tid, name, wakeups, cpu_ms in rows:
+        print(f"{tid:>8}  {name:<24} {wakeups:>10.2f} {cpu_ms:>10.1f}")
+    print(f"{'total':>8}  {'':<24} {sum(row[2] for row in rows):>10.2f} {sum(row[3] for row in rows):>10.1f}")
+    
+    if args.self_test:
+        components[0].stop()
+        components[2].stop()
+        components[3].close()
+        components[4].stop()
+        busy = [row for row in rows if row[1] != "MainThread" and row[2] > args.max_wakeups]
+        if busy:
+            print("idle check FAILED: " + ", ".join(f"{row[1]} {row[2]:.2f}/s" for row in busy))
+            return 1
+        print("idle check passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+启动与对话框打开耗时基准测试
+
+测量主要模块的导入耗时，以及设置和关于对话框的打开耗时(从调用到窗口可见并完成首次绘制)：
+    cold: 每次新建对话框(旧的行为)
+    warm: 预先创建并完成样式和布局计算，关闭后隐藏，打开时只刷新(keep_dialogs_warm)
+
+需要完整的运行环境(Windows、PyQt5、pynput)；关于对话框会创建MouseHandler并启动鼠标监听。
+
+用法: python bench/startup.py --repeat 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+def time_imports():
+    """
+    测量主要模块的导入耗时
+    
+    Returns:
+        list: (模块名, 毫秒)
+    """
+    import importlib
+    
+    results = []
+    for name in ("PyQt5.QtWidgets", "pynput.mouse", "utils.config", "core.mouse_handler",
+                 "ui.settings_dialog", "ui.about_dialog", "core.tray_icon"):
+        start = time.perf_counter()
+        importlib.import_module(name)
+        results.append((name, (time.perf_counter() - start) * 1000))
+    return results
+
+
+def wait_visible(app, dialog, timeout_s=5.0):
+    """处理事件直到对话框可见并完成首次绘制"""
+    deadline = time.perf_counter() + timeout_s
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        handle = dialog.windowHandle()
+        if dialog.isVisible() and handle is not None and handle.isExposed():
+            return
+    raise RuntimeError(f"{type(dialog).__name__} did not become visible")
+
+
+def measure(app, dialog_class, warm_up, repeat):
+    """
+    测量对话框打开耗时
+    
+    Args:
+        app: QApplication
+        dialog_class: 对话框类
+        warm_up: 预热函数(与托盘的_warm_up相同)
+        repeat: 重复次数
+    
+    Returns:
+        tuple: (cold毫秒列表, warm毫秒列表)
+    """
+    cold = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dialog = dialog_class()
+        dialog.show()
+        wait_visible(app, dialog)
+        cold.append((time.perf_counter() - start) * 1000)
+        dialog.hide()
+        dialog.deleteLater()
+        app.processEvents()
+    
+    dialog = dialog_class()
+    warm_up(dialog)
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dialog.refresh()
+        dialog.show()
+        wait_visible(app, dialog)
+        warm.append((time.perf_counter() - start) * 1000)
+        dialog.hide()
+        app.processEvents()
+    return cold, warm
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup and dialog time-to-visible benchmark")
+    parser.add_argument("--repeat", type=int, default=10, help="每种方式打开对话框的次数")
+    args = parser.parse_args()
+    
+    for name, ms in time_imports():
+        print(f"import {name:<22} {ms:8.1f} ms")
+    
+    from PyQt5.QtWidgets import QApplication, QWidget
+    from ui.settings_dialog import SettingsDialog
+    from ui.about_dialog import AboutDialog
+    
+    start = time.perf_counter()
+    app = QApplication(sys.argv)
+    print(f"QApplication               {(time.perf_counter() - start) * 1000:8.1f} ms")
+    
+    def warm_up(dialog):
+        dialog.ensurePolished()
+        for child in dialog.findChildren(QWidget):
+            child.ensurePolished()
+        dialog.layout().activate()
+    
+    for dialog_class in (SettingsDialog, AboutDialog):
+        cold, warm = measure(app, dialog_class, warm_up, args.repeat)
+        print(f"{dialog_class.__name__:<15} cold median {statistics.median(cold):7.1f} ms  max {max(cold):7.1f} ms")
+        print(f"{dialog_class.__name__:<15} warm median {statistics.median(warm):7.1f} ms  max {max(warm):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
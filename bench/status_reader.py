@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+状态页读取示例与一致性测试
+
+默认按指定频率读取运行中程序的状态页并打印，演示叠加层的读取方式。
+--selftest 启动一个子进程以最快速度更新状态页，同时在本进程中读取并校验
+每份快照的一致性(本次连点点击次数始终等于累计点击次数)，报告重试次数。
+
+用法: python bench/status_reader.py --hz 60
+      python bench/status_reader.py --selftest --duration 3
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core.status_page import StatusPage, StatusPageReader
+
+
+def _hammer(path, ready, stop):
+    """子进程：不停地更新状态页"""
+    page = StatusPage(path)
+    page.burst_started()
+    ready.set()
+    count = 0
+    while not stop.is_set():
+        count += 1
+        page.click_injected(count, count * 1000)
+    page.close()
+
+
+def selftest(duration):
+    """跨进程读取一致性测试"""
+    path = os.path.join(tempfile.gettempdir(), f"status_selftest_{os.getpid()}.bin")
+    ready = multiprocessing.Event()
+    stop = multiprocessing.Event()
+    writer = multiprocessing.Process(target=_hammer, args=(path, ready, stop))
+    writer.start()
+    ready.wait()
+    
+    reader = StatusPageReader(path)
+    reads = torn = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        status = reader.read()
+        reads += 1
+        if status["burst_clicks"] != status["total_clicks"]:
+            torn += 1
+    last = reader.read()
+    reader.close()
+    stop.set()
+    writer.join()
+    
+    print(f"reads: {reads} ({reads / duration:.0f}/s), writes seen: {last['total_clicks']}, "
+          f"retries: {reader.retries}, inconsistent snapshots: {torn}")
+    return torn == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Status page reader")
+    parser.add_argument("--path", help="状态页路径，默认使用程序的默认位置")
+    parser.add_argument("--hz", type=float, default=60.0, help="读取频率")
+    parser.add_argument("--duration", type=float, default=5.0, help="运行时长(秒)")
+    parser.add_argument("--selftest", action="store_true", help="跨进程一致性测试")
+    args = parser.parse_args()
+    
+    if args.selftest:
+        sys.exit(0 if selftest(args.duration) else 1)
+    
+    reader = StatusPageReader(args.path)
+    period = 1.0 / args.hz
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        status = reader.read()
+        age_ms = (time.perf_counter_ns() - status["updated_ns"]) / 1e6
+        print(f"\rarmed={status['armed']:d} clicking={status['clicking']:d} bursts={status['bursts']} "
+              f"clicks={status['burst_clicks']} cps={status['cps']:.1f} age={age_ms:.0f}ms   ", end="")
+        time.sleep(period)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -108,6 +108,7 @@ a = Analysis(
     binaries=extra_binaries,
     datas=[
         ('assets/*', 'assets'),  # 复制assets目录下的所有文件
+        ('assets/lang/*.json', 'assets/lang'),  # 各语言的消息目录
     ],
     hiddenimports=WINDOWS_PYNPUT_IMPORTS + ['win32api', 'win32event', 'ctypes', 'PyQt5.sip'],
     hookspath=[],
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+按应用启用连点的规则模块
+
+规则写在配置项app_rules中，每条规则形如"process:game.exe"或"class:Chrome_WidgetWin_1"，
+省略前缀时按进程名匹配，支持*和?通配符，不区分大小写。app_rules_mode决定规则的含义:
+    off: 不使用规则，所有窗口都允许连点
+    allow: 只在匹配的窗口中允许连点
+    deny: 在匹配的窗口中禁止连点
+"""
+
+import re
+import fnmatch
+
+
+# 规则模式
+RULES_OFF = "off"
+RULES_ALLOW = "allow"
+RULES_DENY = "deny"
+
+# 规则类型前缀
+KIND_PROCESS = "process"
+KIND_CLASS = "class"
+
+
+class _Matcher:
+    """同一类型规则的匹配器：精确名称用集合查找，通配符合并为一个正则"""
+    
+    def __init__(self, patterns):
+        exact = set()
+        wildcards = []
+        for pattern in patterns:
+            if any(ch in pattern for ch in "*?["):
+                wildcards.append(fnmatch.translate(pattern))
+            else:
+                exact.add(pattern)
+        self._exact = frozenset(exact)
+        self._regex = re.compile("|".join(wildcards)) if wildcards else None
+    
+    def match(self, name):
+        """
+        检查名称是否匹配
+        
+        Args:
+            name: 小写的进程名或窗口类名
+        
+        Returns:
+            bool: 匹配任意规则返回True
+        """
+        if not name:
+            return False
+        if name in self._exact:
+            return True
+        return self._regex is not None and self._regex.match(name) is not None
+
+
+class AppRuleSet:
+    """
+    编译后的应用规则
+    
+    在配置变化时编译一次；前台窗口变化时调用allows得到结果并缓存，
+    钩子线程上只读取缓存的布尔值。
+    """
+    
+    def __init__(self, mode=RULES_OFF, rules=()):
+        """
+        编译规则
+        
+        Args:
+            mode: 规则模式(off/allow/deny)
+            rules: 规则字符串列表
+        """
+        by_kind = {KIND_PROCESS: [], KIND_CLASS: []}
+        for rule in rules or ():
+            kind, sep, pattern = rule.strip().partition(":")
+            if not sep:
+                kind, pattern = KIND_PROCESS, kind
+            kind = kind.strip().lower()
+            if kind not in by_kind:
+                print(f"Ignoring app rule with unknown type: {rule}")
+                continue
+            by_kind[kind].append(pattern.strip().lower())
+        
+        self.mode = mode
+        self._process = _Matcher(by_kind[KIND_PROCESS])
+        self._class = _Matcher(by_kind[KIND_CLASS])
+        # 没有有效规则时视为关闭，避免allow模式下空规则导致处处禁用
+        self.active = mode in (RULES_ALLOW, RULES_DENY) and any(by_kind.values())
+    
+    def matches(self, process, window_class):
+        """
+        检查窗口是否匹配任意规则
+        
+        Args:
+            process: 进程名
+            window_class: 窗口类名
+        
+        Returns:
+            bool: 匹配返回True
+        """
+        return self._process.match((process or "").lower()) or self._class.match((window_class or "").lower())
+    
+    def allows(self, process, window_class):
+        """
+        检查在该窗口中是否允许连点
+        
+        Args:
+            process: 进程名
+            window_class: 窗口类名
+        
+        Returns:
+            bool: 允许返回True
+        """
+        if not self.active:
+            return True
+        matched = self.matches(process, window_class)
+        return matched if self.mode == RULES_ALLOW else not matched
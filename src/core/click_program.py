@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+点击程序模块，把配置中的点击程序预编译为时间表
+
+点击程序由若干步骤组成，定义在配置项click_programs中，例如:
+    
+    {
+        "steps": [
+            {"type": "ramp", "from_ms": 200, "to_ms": 50, "clicks": 10},
+            {"type": "burst", "clicks": 5, "interval_ms": 50, "pause_ms": 300, "repeat": 3},
+            {"type": "random", "dist": "lognormal", "clicks": 200, "mean_ms": 60, "spread_ms": 15}
+        ],
+        "hold_ms": 20,            # 每次点击按下的时长，0表示立即释放
+        "hold_spread_ms": 5,      # 按下时长的随机幅度
+        "hold_dist": "uniform",   # 按下时长的分布
+        "loop_from": 1,           # 程序结束后从第几个步骤重新开始，为null时不循环
+        "seed": 1                 # 随机数种子
+    }
+
+步骤类型:
+    fixed: 固定间隔，interval_ms
+    ramp: 间隔从from_ms线性变化到to_ms，clicks次
+    burst: clicks次间隔interval_ms的点击后暂停pause_ms，重复repeat轮
+    random: clicks次按dist(uniform/normal/lognormal)分布抽取的间隔，mean_ms/spread_ms
+
+随机数在编译时按种子一次性抽取，调度线程只按下标读取时间表，每次点击不做任何计算。
+"""
+
+import math
+import random
+from array import array
+
+from core.clock import NS_PER_MS
+
+
+# 随机分布
+DIST_UNIFORM = "uniform"
+DIST_NORMAL = "normal"
+DIST_LOGNORMAL = "lognormal"
+
+# 抽样间隔的下限(毫秒)
+_MIN_INTERVAL_MS = 1.0
+
+
+class ClickProgramError(ValueError):
+    """点击程序定义错误"""
+    pass
+
+
+class CompiledProgram:
+    """
+    编译后的点击程序
+    
+    offsets[i]为第i次点击相对程序开始的时间，holds[i]为第i次点击的按下时长，
+    单位均为纳秒。最后一次点击之后经过tail_ns回到loop_index继续循环。
+    """
+    
+    def __init__(self, name, offsets, holds, tail_ns, loop_index):
+        self.name = name
+        self.offsets = offsets
+        self.holds = holds
+        self.size = len(offsets)
+        self.loop_index = loop_index    # 循环起点的点击序号，None表示不循环
+        # 回到循环起点时时间基准的偏移
+        if loop_index is None:
+            self.loop_shift_ns = 0
+        else:
+            self.loop_shift_ns = offsets[-1] + tail_ns - offsets[loop_index]
+    
+    @property
+    def loops(self):
+        """程序结束后是否循环"""
+        return self.loop_index is not None
+
+
+def _sample(rng, dist, mean_ms, spread_ms):
+    """
+    按分布抽取一个时间值
+    
+    Args:
+        rng: random.Random实例
+        dist: 分布名称
+        mean_ms: 均值(毫秒)
+        spread_ms: uniform为半宽，normal和lognormal为标准差(毫秒)
+    
+    Returns:
+        float: 抽取的时间(毫秒)
+    """
+    if spread_ms <= 0:
+        return mean_ms
+    if dist == DIST_UNIFORM:
+        return rng.uniform(mean_ms - spread_ms, mean_ms + spread_ms)
+    if dist == DIST_NORMAL:
+        return rng.gauss(mean_ms, spread_ms)
+    if dist == DIST_LOGNORMAL:
+        # 由目标均值和标准差换算对数正态分布的参数
+        sigma2 = math.log(1.0 + (spread_ms / mean_ms) ** 2)
+        return rng.lognormvariate(math.log(mean_ms) - sigma2 / 2, math.sqrt(sigma2))
+    raise ClickProgramError(f"unknown distribution: {dist}")
+
+
+def _step_intervals(step, rng):
+    """
+    展开一个步骤，得到每次点击之后的间隔
+    
+    Args:
+        step: 步骤定义
+        rng: random.Random实例
+    
+    Returns:
+        list: 间隔(毫秒)
+    """
+    kind = step.get("type", "fixed")
+    clicks = int(step.get("clicks", 1))
+    if clicks < 1:
+        raise ClickProgramError(f"{kind} step needs at least one click")
+    
+    if kind == "fixed":
+        return [float(step["interval_ms"])] * clicks
+    
+    if kind == "ramp":
+        start, end = float(step["from_ms"]), float(step["to_ms"])
+        if clicks == 1:
+            return [end]
+        return [start + (end - start) * i / (clicks - 1) for i in range(clicks)]
+    
+    if kind == "burst":
+        interval = float(step["interval_ms"])
+        pause = float(step.get("pause_ms", 0))
+        intervals = []
+        for _ in range(int(step.get("repeat", 1))):
+            intervals.extend([interval] * clicks)
+            intervals[-1] = interval + pause
+        return intervals
+    
+    if kind == "random":
+        dist = step.get("dist", DIST_UNIFORM)
+        mean, spread = float(step["mean_ms"]), float(step.get("spread_ms", 0))
+        minimum = float(step.get("min_ms", _MIN_INTERVAL_MS))
+        return [max(minimum, _sample(rng, dist, mean, spread)) for _ in range(clicks)]
+    
+    raise ClickProgramError(f"unknown step type: {kind}")
+
+
+def compile_program(name, spec):
+    """
+    编译点击程序
+    
+    Args:
+        name: 程序名称
+        spec: 程序定义字典
+    
+    Returns:
+        CompiledProgram: 编译结果
+    
+    Raises:
+        ClickProgramError: 定义无效时抛出
+    """
+    steps = spec.get("steps") or []
+    if not steps:
+        raise ClickProgramError(f"program {name} has no steps")
+    rng = random.Random(spec.get("seed", 0))
+    
+    intervals = []
+    step_starts = []
+    try:
+        for step in steps:
+            step_starts.append(len(intervals))
+            intervals.extend(_step_intervals(step, rng))
+    except (KeyError, TypeError) as e:
+        raise ClickProgramError(f"program {name}: invalid step ({e})")
+    
+    offsets = array("q", bytes(8 * len(intervals)))
+    holds = array("q", bytes(8 * len(intervals)))
+    hold_ms = float(spec.get("hold_ms", 0))
+    hold_spread = float(spec.get("hold_spread_ms", 0))
+    hold_dist = spec.get("hold_dist", DIST_UNIFORM)
+    t_ns = 0
+    for i, interval_ms in enumerate(intervals):
+        interval_ns = int(max(_MIN_INTERVAL_MS, interval_ms) * NS_PER_MS)
+        offsets[i] = t_ns
+        # 按下时长不能超过到下一次点击的间隔
+        hold_ns = int(max(0.0, _sample(rng, hold_dist, hold_ms, hold_spread)) * NS_PER_MS) if hold_ms > 0 else 0
+        holds[i] = min(hold_ns, interval_ns - NS_PER_MS)
+        t_ns += interval_ns
+    tail_ns = t_ns - offsets[-1]
+    
+    loop_from = spec.get("loop_from", 0)
+    if loop_from is None:
+        loop_index = None
+    elif 0 <= int(loop_from) < len(steps):
+        loop_index = step_starts[int(loop_from)]
+    else:
+        raise ClickProgramError(f"program {name}: loop_from out of range")
+    return CompiledProgram(name, offsets, holds, tail_ns, loop_index)
+
+
+def fixed_program(interval_ms):
+    """
+    编译固定间隔、循环执行的默认程序
+    
+    Args:
+        interval_ms: 点击间隔(毫秒)
+    
+    Returns:
+        CompiledProgram: 编译结果
+    """
+    return compile_program("fixed", {"steps": [{"type": "fixed", "interval_ms": interval_ms}]})
+
+
+def compile_programs(specs):
+    """
+    编译配置中的全部点击程序，无效的程序会被跳过
+    
+    Args:
+        specs: 程序名称到定义的字典
+    
+    Returns:
+        dict: 程序名称到CompiledProgram的字典
+    """
+    programs = {}
+    for name, spec in (specs or {}).items():
+        try:
+            programs[name] = compile_program(name, spec)
+        except (ClickProgramError, ValueError) as e:
+            print(f"Error compiling click program {name}: {e}")
+    return programs
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+时钟模块，统一引擎使用的单调纳秒时钟
+"""
+
+import time
+
+
+# 引擎统一使用的单调时钟(纳秒)，Windows上基于QPC，不受NTP调整影响
+monotonic_ns = time.perf_counter_ns
+
+NS_PER_MS = 1000000
+
+
+class EventTimeNormalizer:
+    """
+    将系统事件时间戳(毫秒，32位回绕)换算到单调纳秒时钟
+    
+    MSLLHOOKSTRUCT.time和X服务器时间都是32位毫秒计数，与本进程的单调时钟
+    存在未知的固定偏移。每次事件都用(回调时刻 - 事件时刻)估计偏移，取其中
+    最小值作为投递延迟为零时的偏移；为了跟随两个时钟之间的漂移，
+    偏移估计会按经过的时间缓慢放宽。
+    """
+    
+    # 32位毫秒计数器的回绕周期
+    WRAP_MS = 1 << 32
+    
+    # 允许的时钟漂移(每纳秒放宽的偏移量)，约100ppm
+    DRIFT_ALLOWANCE = 1e-4
+    
+    def __init__(self):
+        self._last_raw = None      # 上一次的原始时间戳(毫秒)
+        self._extended_ms = 0      # 展开回绕后的事件时间(毫秒)
+        self._offset_ns = 0        # 事件时钟到单调时钟的偏移估计
+        self._last_now_ns = 0      # 上一次估计偏移时的单调时间
+    
+    def normalize(self, raw_ms, now_ns):
+        """
+        换算事件时间戳
+        
+        Args:
+            raw_ms: 系统提供的事件时间(毫秒)，为None时退化为回调时刻
+            now_ns: 回调入口处的单调时间(纳秒)
+        
+        Returns:
+            tuple: (事件发生时的单调时间(纳秒), 排队延迟(纳秒))
+        """
+        if raw_ms is None:
+            return now_ns, 0
+        
+        if self._last_raw is None:
+            self._extended_ms = raw_ms
+            self._offset_ns = now_ns - raw_ms * NS_PER_MS
+        else:
+            # 按差值展开32位回绕，乱序到达的事件会得到一个接近WRAP_MS的差值，按负数处理
+            delta = (raw_ms - self._last_raw) % self.WRAP_MS
+            if delta > self.WRAP_MS // 2:
+                delta -= self.WRAP_MS
+            self._extended_ms += delta
+            
+            offset_ns = now_ns - self._extended_ms * NS_PER_MS
+            relaxed_ns = self._offset_ns + int((now_ns - self._last_now_ns) * self.DRIFT_ALLOWANCE)
+            self._offset_ns = offset_ns if offset_ns < relaxed_ns else relaxed_ns
+        
+        self._last_raw = raw_ms
+        self._last_now_ns = now_ns
+        
+        event_ns = self._extended_ms * NS_PER_MS + self._offset_ns
+        if event_ns > now_ns:
+            event_ns = now_ns
+        return event_ns, now_ns - event_ns
+
+
+class MonotonicClock:
+    """真实时钟，供调度器等待截止时间"""
+    
+    # 距离截止时间较远时先在条件变量上粗等待(可被新任务唤醒)，
+    # 最后一段用高精度sleep，避免Windows上条件变量约15ms的定时粒度
+    COARSE_WAIT_NS = 20 * NS_PER_MS
+    
+    def now_ns(self):
+        """获取当前单调时间(纳秒)"""
+        return monotonic_ns()
+    
+    def wait_until(self, cond, deadline_ns):
+        """
+        在持有cond的情况下等待到截止时间
+        
+        返回时可能尚未到达截止时间(被notify唤醒)，调用方需要重新检查。
+        
+        Args:
+            cond: 已持有的threading.Condition
+            deadline_ns: 截止时间(纳秒)
+        """
+        remaining = deadline_ns - monotonic_ns()
+        if remaining <= 0:
+            return
+        if remaining > self.COARSE_WAIT_NS:
+            cond.wait((remaining - self.COARSE_WAIT_NS) / 1e9)
+            return
+        cond.release()
+        try:
+            time.sleep(remaining / 1e9)
+        finally:
+            cond.acquire()
+
+
+class VirtualClock:
+    """虚拟时钟，等待时立即推进时间，用于确定性模拟"""
+    
+    def __init__(self, start_ns=0):
+        self._now_ns = start_ns
+    
+    def now_ns(self):
+        """获取当前虚拟时间(纳秒)"""
+        return self._now_ns
+    
+    def advance_to(self, t_ns):
+        """
+        将虚拟时间推进到指定时刻，时间不会倒退
+        
+        Args:
+            t_ns: 目标时间(纳秒)
+        """
+        if t_ns > self._now_ns:
+            self._now_ns = t_ns
+    
+    def wait_until(self, cond, deadline_ns):
+        """立即推进到截止时间，不阻塞"""
+        self.advance_to(deadline_ns)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地控制接口模块，通过仅监听127.0.0.1的文本行协议向运行中的程序发送命令
+
+协议：客户端每行发送一条命令(命令名加空格分隔的参数)，服务端每条命令回复一行，
+以"ok"或"error"开头。可以使用 main.py --control "<命令>" 或 nc 等工具连接。
+
+连接后的第一行必须是"auth <令牌>"。令牌每次启动随机生成，写入只有当前用户可读的
+令牌文件，因此其他用户的进程和浏览器中的网页(可以向127.0.0.1发送HTTP请求，但读不到
+令牌文件)都无法发送命令。认证失败、未知命令或看起来像HTTP请求的行会立即关闭连接。
+"""
+
+import os
+import hmac
+import socket
+import secrets
+import threading
+
+from utils.constants import APP_NAME
+
+
+# 认证前等待第一行的超时时间(秒)
+_AUTH_TIMEOUT_S = 5.0
+
+# 客户端等待回复的默认超时时间(秒)
+DEFAULT_TIMEOUT_S = 5.0
+
+# 命令处理函数最多阻塞的时间(秒)，留出余量使回复在客户端超时之前到达
+MAX_COMMAND_WAIT_S = DEFAULT_TIMEOUT_S - 1.0
+
+# HTTP请求行的方法名，收到时说明对端不是本协议的客户端
+_HTTP_METHODS = ("GET", "POST", "PUT", "DELETE", "HEAD", "OPTIONS", "PATCH", "CONNECT", "TRACE")
+
+
+def default_token_path():
+    """默认的令牌文件路径(用户目录)"""
+    return os.path.join(os.path.expanduser("~"), f".{APP_NAME.lower()}_control_token")
+
+
+def _looks_like_http(line):
+    """判断一行是否为HTTP请求行或请求头"""
+    word = line.split(" ", 1)[0]
+    return word in _HTTP_METHODS or line.startswith("HTTP/") or word.endswith(":")
+
+
+class _ClosingError(Exception):
+    """需要立即关闭连接"""
+    pass
+
+
+class ControlServer:
+    """
+    本地控制服务器
+    
+    服务线程阻塞在accept/recv上，没有连接时不会产生任何唤醒。
+    命令处理函数在服务线程上调用，需要操作界面时应通过通知总线转交。
+    """
+    
+    def __init__(self, port, token_path=None):
+        """
+        初始化控制服务器
+        
+        Args:
+            port: 监听端口(仅127.0.0.1)
+            token_path: 令牌文件路径，默认写入用户目录
+        """
+        self._port = port
+        self._token_path = token_path or default_token_path()
+        self._token = secrets.token_hex(16)
+        self._commands = {}         # 命令名 -> (处理函数, 说明)
+        self._socket = None
+        self._thread = None
+        self.register("help", self._help, "list commands")
+    
+    def register(self, name, handler, description=""):
+        """
+        注册命令
+        
+        Args:
+            name: 命令名
+            handler: 处理函数，参数为命令参数列表，返回回复文本
+            description: 命令说明
+        """
+        self._commands[name] = (handler, description)
+    
+    def start(self):
+        """
+        开始监听
+        
+        Returns:
+            bool: 成功返回True
+        """
+        try:
+            self._write_token()
+        except OSError as e:
+            print(f"Error writing control token: {e}")
+            return False
+        try:
+            self._socket = socket.create_server(("127.0.0.1", self._port))
+        except OSError as e:
+            print(f"Error starting control server on port {self._port}: {e}")
+            self._socket = None
+            return False
+        
+        self._thread = threading.Thread(target=self._serve, name="RapidClickControl", daemon=True)
+        self._thread.start()
+        print(f"[DEBUG] Control server listening on 127.0.0.1:{self._port}")
+        return True
+    
+    def stop(self):
+        """停止监听"""
+        server = self._socket
+        self._socket = None
+        if server is not None:
+            server.close()
+        try:
+            os.remove(self._token_path)
+        except OSError:
+            pass
+    
+    @property
+    def port(self):
+        """实际监听的端口(端口为0时由系统分配)"""
+        server = self._socket
+        return server.getsockname()[1] if server is not None else self._port
+    
+    def _write_token(self):
+        """把令牌写入只有当前用户可读写的文件"""
+        try:
+            os.remove(self._token_path)
+        except FileNotFoundError:
+            pass
+        # O_EXCL避免跟随预先放置的符号链接；Windows上用户目录本身只对当前用户开放
+        fd = os.open(self._token_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self._token)
+    
+    def _serve(self):
+        """服务线程主循环，每个连接在独立的线程上处理，等待中的命令不会阻塞其他连接"""
+        while self._socket is not None:
+            try:
+                conn, _ = self._socket.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve_connection, args=(conn,),
+                             name="RapidClickControlConnection", daemon=True).start()
+    
+    def _serve_connection(self, conn):
+        """连接线程"""
+        with conn:
+            try:
+                self._handle_connection(conn)
+            except OSError as e:
+                print(f"Error in control connection: {e}")
+    
+    def _handle_connection(self, conn):
+        """处理一个连接上的所有命令，第一行必须是认证"""
+        conn.settimeout(_AUTH_TIMEOUT_S)
+        reader = conn.makefile("r", encoding="utf-8", errors="replace")
+        if not self._authenticate(reader.readline().strip()):
+            conn.sendall(b"error authentication required\n")
+            return
+        conn.settimeout(None)
+        conn.sendall(b"ok\n")
+        
+        for line in reader:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                reply = self.execute(line)
+            except _ClosingError as e:
+                conn.sendall(f"error {e}\n".encode("utf-8"))
+                return
+            conn.sendall((reply.replace("\n", " ") + "\n").encode("utf-8"))
+    
+    def _authenticate(self, line):
+        """检查认证行"""
+        word, _, token = line.partition(" ")
+        return word == "auth" and hmac.compare_digest(token.encode("utf-8"), self._token.encode("utf-8"))
+    
+    def execute(self, line):
+        """
+        执行一条命令
+        
+        Args:
+            line: 命令行文本
+        
+        Returns:
+            str: 回复文本
+        
+        Raises:
+            _ClosingError: 未知命令或HTTP请求，连接应立即关闭
+        """
+        if _looks_like_http(line):
+            raise _ClosingError("not a control client")
+        name, *args = line.split()
+        entry = self._commands.get(name)
+        if entry is None:
+            raise _ClosingError(f"unknown command: {name}")
+        try:
+            return f"ok {entry[0](args)}".rstrip()
+        except Exception as e:
+            return f"error {name}: {e}"
+    
+    def _help(self, args):
+        """列出已注册的命令"""
+        return "; ".join(f"{name} - {description}" for name, (_, description) in sorted(self._commands.items()))
+
+
+def send_command(port, line, timeout=DEFAULT_TIMEOUT_S, token_path=None):
+    """
+    向运行中的程序发送一条命令
+    
+    Args:
+        port: 控制端口
+        line: 命令行文本
+        timeout: 超时时间(秒)
+        token_path: 令牌文件路径，默认读取用户目录
+    
+    Returns:
+        str: 服务端回复
+    
+    Raises:
+        OSError: 连接失败或读取令牌文件失败
+    """
+    with open(token_path or default_token_path(), "r", encoding="utf-8") as f:
+        token = f.read().strip()
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as conn:
+        reader = conn.makefile("r", encoding="utf-8")
+        conn.sendall(f"auth {token}\n".encode("utf-8"))
+        reply = reader.readline().strip()
+        if reply != "ok":
+            return reply
+        conn.sendall((line.strip() + "\n").encode("utf-8"))
+        return reader.readline().strip()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+快速点击触发检测模块
+"""
+
+
+class TriggerDetector:
+    """
+    窗口触发检测器
+    
+    最近trigger_count次按下全部落在trigger_window内时触发。按下时间保存在
+    容量为trigger_count的预分配环形缓冲区中，每次判定都是O(1)。
+    """
+    
+    def __init__(self, trigger_count, trigger_window_ns):
+        """
+        初始化检测器
+        
+        Args:
+            trigger_count: 触发所需的按下次数
+            trigger_window_ns: 触发时间窗口(纳秒)
+        """
+        self.configure(trigger_count, trigger_window_ns)
+    
+    def configure(self, trigger_count, trigger_window_ns):
+        """
+        更新触发参数并清空历史
+        
+        Args:
+            trigger_count: 触发所需的按下次数
+            trigger_window_ns: 触发时间窗口(纳秒)
+        """
+        self.trigger_count = max(1, int(trigger_count))
+        self.trigger_window_ns = int(trigger_window_ns)
+        self._times = [0] * self.trigger_count
+        self.reset()
+    
+    def reset(self):
+        """清空按下记录"""
+        self._index = 0           # 下一次写入的位置，写满后也是最早一次按下的位置
+        self.size = 0             # 当前连续快速按下的次数(最多trigger_count)
+        self.last_press_ns = 0    # 最后一次按下时间
+    
+    def press(self, t_ns):
+        """
+        记录一次按下并判断是否触发
+        
+        Args:
+            t_ns: 按下时间(单调纳秒)
+        
+        Returns:
+            bool: 最近trigger_count次按下是否全部落在时间窗口内
+        """
+        # 距上次按下超过时间窗口，之前的按下不可能再参与触发
+        if self.size and t_ns - self.last_press_ns > self.trigger_window_ns:
+            self.size = 0
+        
+        self._times[self._index] = t_ns
+        self._index += 1
+        if self._index == self.trigger_count:
+            self._index = 0
+        if self.size < self.trigger_count:
+            self.size += 1
+        self.last_press_ns = t_ns
+        
+        if self.size < self.trigger_count:
+            return False
+        return t_ns - self._times[self._index] <= self.trigger_window_ns
+    
+    def span_ns(self):
+        """
+        获取最近一组按下的时间跨度
+        
+        Returns:
+            int: 最早一次与最后一次按下的间隔(纳秒)，记录不足时返回0
+        """
+        if self.size == 0:
+            return 0
+        oldest = (self._index - self.size) % self.trigger_count
+        return self.last_press_ns - self._times[oldest]
+    
+    def release(self, t_ns):
+        """
+        记录一次释放，窗口检测器不使用
+        
+        Args:
+            t_ns: 释放时间(单调纳秒)
+        """
+        pass
+
+
+class AdaptiveTriggerDetector(TriggerDetector):
+    """
+    学习用户快速点击节奏的检测器
+    
+    在窗口检测的基础上，用指数滑动平均学习有意快速点击时的按下间隔均值和方差。
+    学到足够的样本后，当前这一轮的每个间隔都落在均值±tolerance个标准差以内时，
+    按下min_count次即可提前触发，不必等满trigger_count次。
+    
+    一轮快速点击中，任意一次触发后按住超过confirm_hold_ns即确认为有意触发，这一轮的
+    间隔才用于学习；一轮结束时仍未确认的计为误触发(按这一轮首次触发是提前还是完整
+    触发分别统计)。每轮只统计一次触发和触发延迟(本轮首次按下到首次触发)，
+    用于调整激进程度。
+    """
+    
+    # 指数滑动平均的权重
+    ALPHA = 0.1
+    
+    def __init__(self, trigger_count, trigger_window_ns, min_count=3, tolerance=2.0,
+                 min_samples=20, confirm_hold_ns=150000000):
+        """
+        初始化检测器
+        
+        Args:
+            trigger_count: 完整触发所需的按下次数
+            trigger_window_ns: 触发时间窗口(纳秒)
+            min_count: 提前触发所需的最少按下次数
+            tolerance: 间隔允许偏离均值的标准差倍数
+            min_samples: 允许提前触发前至少学习的间隔数
+            confirm_hold_ns: 触发后按住超过该时长视为有意触发(纳秒)
+        """
+        self.tune(min_count, tolerance, min_samples, confirm_hold_ns)
+        
+        # 学习到的节奏
+        self.mean_ns = 0.0
+        self.var_ns = 0.0
+        self.samples = 0
+        
+        # 统计
+        self.early_triggers = 0
+        self.full_triggers = 0
+        self.false_early = 0
+        self.false_full = 0
+        self._early_latency_ns = 0
+        self._full_latency_ns = 0
+        
+        self.on_learned = None    # 学到新的间隔后在钩子线程上调用，参数为model()的返回值
+        super(AdaptiveTriggerDetector, self).__init__(trigger_count, trigger_window_ns)
+    
+    def tune(self, min_count, tolerance, min_samples, confirm_hold_ns):
+        """
+        调整提前触发的激进程度，保留学习结果和统计
+        
+        Args:
+            min_count: 提前触发所需的最少按下次数
+            tolerance: 间隔允许偏离均值的标准差倍数
+            min_samples: 允许提前触发前至少学习的间隔数
+            confirm_hold_ns: 触发后按住超过该时长视为有意触发(纳秒)
+        """
+        self.min_count = max(2, int(min_count))
+        self.tolerance = float(tolerance)
+        self.min_samples = int(min_samples)
+        self.confirm_hold_ns = int(confirm_hold_ns)
+    
+    def reset(self):
+        super(AdaptiveTriggerDetector, self).reset()
+        self._run_start_ns = 0       # 本轮首次按下时间
+        self._run_early = None       # 本轮首次触发是否为提前触发，未触发时为None
+        self._run_confirmed = False  # 本轮是否已确认为有意触发
+        self._trigger_ns = 0         # 最近一次触发的按下时间，释放后清零
+    
+    def load_model(self, model):
+        """
+        载入学习到的节奏
+        
+        Args:
+            model: (均值毫秒, 方差毫秒², 样本数)，为空时从头学习
+        """
+        if model:
+            mean_ms, var_ms, samples = model
+            self.mean_ns = float(mean_ms) * 1e6
+            self.var_ns = float(var_ms) * 1e12
+            self.samples = int(samples)
+        else:
+            self.mean_ns = 0.0
+            self.var_ns = 0.0
+            self.samples = 0
+    
+    def model(self):
+        """
+        导出学习到的节奏
+        
+        Returns:
+            list: [均值毫秒, 方差毫秒², 样本数]
+        """
+        return [self.mean_ns / 1e6, self.var_ns / 1e12, self.samples]
+    
+    def _run_gaps(self):
+        """本轮按下之间的间隔，从早到晚"""
+        times = self._times
+        count = self.trigger_count
+        start = self._index - self.size
+        return [times[(start + i + 1) % count] - times[(start + i) % count] for i in range(self.size - 1)]
+    
+    def _cadence_matches(self, gaps):
+        """每个间隔都落在学习到的均值±tolerance个标准差以内"""
+        spread = self.tolerance * self.var_ns ** 0.5
+        low = self.mean_ns - spread
+        high = self.mean_ns + spread
+        for gap in gaps:
+            if gap < low or gap > high:
+                return False
+        return True
+    
+    def press(self, t_ns):
+        triggered = super(AdaptiveTriggerDetector, self).press(t_ns)
+        if self.size == 1:
+            # 上一轮已结束
+            self._end_run()
+            self._run_start_ns = t_ns
+        
+        early = False
+        if (not triggered and self.samples >= self.min_samples
+                and self.min_count <= self.size < self.trigger_count
+                and self._cadence_matches(self._run_gaps())):
+            triggered = early = True
+        if not triggered:
+            return False
+        
+        self._trigger_ns = t_ns
+        if self._run_early is None:
+            # 本轮首次触发
+            self._run_early = early
+            latency_ns = t_ns - self._run_start_ns
+            if early:
+                self.early_triggers += 1
+                self._early_latency_ns += latency_ns
+            else:
+                self.full_triggers += 1
+                self._full_latency_ns += latency_ns
+        return True
+    
+    def release(self, t_ns):
+        trigger_ns = self._trigger_ns
+        if not trigger_ns:
+            return
+        self._trigger_ns = 0
+        if not self._run_confirmed and t_ns - trigger_ns >= self.confirm_hold_ns:
+            # 释放前环形缓冲区中仍是触发时的这一轮按下
+            self._run_confirmed = True
+            self._learn(self._run_gaps())
+    
+    def _end_run(self):
+        """一轮快速点击结束，未确认的触发计为误触发"""
+        if self._run_early is not None and not self._run_confirmed:
+            if self._run_early:
+                self.false_early += 1
+            else:
+                self.false_full += 1
+        self._run_early = None
+        self._run_confirmed = False
+        self._trigger_ns = 0
+    
+    def _learn(self, gaps):
+        """用一轮有意快速点击的间隔更新指数滑动平均"""
+        alpha = self.ALPHA
+        for gap in gaps:
+            if self.samples == 0:
+                self.mean_ns = float(gap)
+                self.var_ns = 0.0
+            else:
+                diff = gap - self.mean_ns
+                increment = alpha * diff
+                self.mean_ns += increment
+                self.var_ns = (1 - alpha) * (self.var_ns + diff * increment)
+            self.samples += 1
+        if self.on_learned:
+            self.on_learned(self.model())
+    
+    def snapshot(self):
+        """
+        获取学习结果和统计
+        
+        Returns:
+            dict: 学习到的间隔均值和标准差(毫秒)、样本数、提前与完整触发的次数、
+                平均触发延迟(毫秒)、误触发次数和误触发率
+        """
+        triggers = self.early_triggers + self.full_triggers
+        return {
+            "samples": self.samples,
+            "mean_gap_ms": self.mean_ns / 1e6,
+            "std_gap_ms": self.var_ns ** 0.5 / 1e6,
+            "early_triggers": self.early_triggers,
+            "full_triggers": self.full_triggers,
+            "early_latency_ms": self._early_latency_ns / self.early_triggers / 1e6 if self.early_triggers else 0.0,
+            "full_latency_ms": self._full_latency_ns / self.full_triggers / 1e6 if self.full_triggers else 0.0,
+            "false_early": self.false_early,
+            "false_full": self.false_full,
+            "false_early_rate": self.false_early / self.early_triggers if self.early_triggers else 0.0,
+            "false_trigger_rate": (self.false_early + self.false_full) / triggers if triggers else 0.0,
+        }
@@ -0,0 +1,495 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+连点引擎模块，负责触发检测和连点调度
+
+引擎不依赖Qt和pynput：输入由调用方通过on_button送入，点击通过注入器发出，
+时间来自调度器的时钟，因此可以在虚拟时钟下做确定性模拟。
+"""
+
+import threading
+from array import array
+
+from core.click_program import fixed_program
+from core.clock import NS_PER_MS
+from core.detector import TriggerDetector
+from core.injected import InjectedEvents
+from core.flight_recorder import (
+    FR_PRESS, FR_TRIGGER_EVAL, FR_WORKER_ARMED, FR_CLICK_INJECTED, FR_RELEASE, FR_STOP
+)
+from core.scheduler import DeadlineScheduler, ScheduledJob
+
+
+# on_button返回的事件码
+EVENT_IGNORED = 0      # 事件被忽略
+EVENT_PRESS = 1        # 记录了一次按下，未触发
+EVENT_TRIGGERED = 2    # 按下满足触发条件
+EVENT_RELEASE = 3      # 释放，没有正在进行的连点
+EVENT_STOPPED = 4      # 释放并停止了连点
+
+
+def _no_record(code, t_ns, arg=0):
+    """未配置飞行记录器时使用的空记录函数"""
+    pass
+
+
+class HeldBurstJob(ScheduledJob):
+    """
+    按住期间执行点击程序的调度任务
+    
+    按程序的时间表逐个取出点击时间，按下时长大于0时每次点击分为按下和释放两个阶段。
+    """
+    
+    def __init__(self, engine, program):
+        super(HeldBurstJob, self).__init__()
+        self._engine = engine
+        self.program = program
+        self.index = 0              # 当前点击在程序中的序号
+        self.base_ns = 0            # 程序时间表的时间基准
+        self.press_ns = 0           # 本次点击按下的截止时间
+        self.pressed = False        # 是否已按下尚未释放
+        self.count = 0              # 已注入的点击次数
+        self.start_ns = 0           # 首次点击时间
+    
+    def fire(self, now_ns):
+        if self.pressed:
+            self._engine.inject_held_release(self, now_ns)
+            return self._advance(now_ns)
+        
+        program = self._engine.program
+        if self.count == 0 or program is not self.program:
+            # 开始连点或切换了点击程序时从程序的第一次点击开始
+            self.program = program
+            self.index = 0
+            self.base_ns = self.deadline_ns
+        hold_ns = self.program.holds[self.index]
+        if not self._engine.inject_held_click(self, now_ns, hold_ns > 0):
+            return None
+        self.press_ns = self.deadline_ns
+        if hold_ns > 0:
+            self.pressed = True
+            return self.press_ns + hold_ns
+        return self._advance(now_ns)
+    
+    def active_ns(self, stop_ns):
+        """
+        从首次点击到停止的时长
+        
+        Args:
+            stop_ns: 停止时间(纳秒)
+        
+        Returns:
+            int: 时长(纳秒)，没有点击时为0
+        """
+        return max(0, stop_ns - self.start_ns) if self.count else 0
+    
+    def _advance(self, now_ns):
+        """移动到程序中的下一次点击，返回其截止时间"""
+        program = self.program
+        index = self.index + 1
+        if index == program.size:
+            if not program.loops:
+                return None
+            index = program.loop_index
+            self.base_ns += program.loop_shift_ns
+        self.index = index
+        
+        # 按时间表累加，避免sleep误差逐次累积；落后超过一个间隔时不补点
+        next_deadline = self.base_ns + program.offsets[index]
+        if next_deadline <= now_ns:
+            self.base_ns += now_ns - self.press_ns
+            next_deadline = self.base_ns + program.offsets[index]
+        return next_deadline
+
+
+class ProbeBurstJob(ScheduledJob):
+    """
+    按固定间隔执行指定次数、只记录执行时间的任务
+    
+    与连点任务使用同一个调度线程和同样的截止时间累加方式，但不注入点击，
+    用于在设置界面测量实际能达到的点击间隔。
+    """
+    
+    def __init__(self, interval_ns, clicks, on_tick=None, on_done=None):
+        super(ProbeBurstJob, self).__init__()
+        self.interval_ns = interval_ns
+        self.clicks = clicks
+        self.times = []             # 每次执行的时间(纳秒)
+        self._on_tick = on_tick
+        self._on_done = on_done
+    
+    def fire(self, now_ns):
+        self.times.append(now_ns)
+        if self._on_tick:
+            self._on_tick(len(self.times))
+        if len(self.times) >= self.clicks:
+            return None
+        next_deadline = self.deadline_ns + self.interval_ns
+        if next_deadline <= now_ns:
+            next_deadline = now_ns + self.interval_ns
+        return next_deadline
+    
+    def on_finished(self):
+        if self._on_done:
+            self._on_done(self)
+
+
+class BoundedBurstJob(HeldBurstJob):
+    """
+    有界连点任务：恰好N次点击，或在恰好T毫秒内按程序连点，两者都指定时先达到者为准
+    
+    沿用HeldBurstJob的时间表推进逻辑，但不依赖用户按键。按时长限制时在截止时刻
+    额外执行一次空操作来结束任务，使实际时长可以精确测量。每次点击相对截止时间的
+    延迟记录在errors_us中，report()给出实际次数、时长和计时误差。
+    """
+    
+    def __init__(self, engine, program, clicks=0, duration_ns=0, on_done=None):
+        super(BoundedBurstJob, self).__init__(engine, program)
+        self.clicks = clicks            # 要求的点击次数，0表示不限
+        self.duration_ns = duration_ns  # 要求的时长(纳秒)，0表示不限
+        self.errors_us = array("i")     # 每次点击的计时误差(微秒，正数表示迟到)
+        self.first_deadline_ns = 0      # 第一次点击的截止时间
+        self.last_deadline_ns = 0       # 最后一次执行的截止时间
+        self.finish_ns = 0              # 实际结束时间
+        self.completed = False          # 是否达到限制后正常结束(取消时为False)
+        self._ending = False            # 下一次执行只是结束任务
+        self._on_done = on_done
+    
+    def fire(self, now_ns):
+        self.last_deadline_ns = self.deadline_ns
+        if self._ending:
+            return self._finish(now_ns)
+        
+        engine = self._engine
+        if self.pressed:
+            engine.inject_held_release(self, now_ns)
+            if self.clicks and self.count >= self.clicks:
+                return self._finish(now_ns)
+            return self._limit(self._advance(now_ns), now_ns)
+        
+        if self.count == 0:
+            self.base_ns = self.deadline_ns
+            self.first_deadline_ns = self.deadline_ns
+        hold_ns = self.program.holds[self.index]
+        self.errors_us.append(min((now_ns - self.deadline_ns) // 1000, 0x7FFFFFFF))
+        engine.inject_click(self, now_ns, hold_ns > 0)
+        self.press_ns = self.deadline_ns
+        if hold_ns > 0:
+            self.pressed = True
+            return self._limit(self.press_ns + hold_ns, now_ns)
+        if self.clicks and self.count >= self.clicks:
+            return self._finish(now_ns)
+        return self._limit(self._advance(now_ns), now_ns)
+    
+    def _limit(self, next_deadline, now_ns):
+        """按时长限制截断下一次执行，到达结束时刻时改为执行一次结束"""
+        if not self.duration_ns:
+            # 不循环的点击程序在达到次数之前结束
+            return next_deadline if next_deadline is not None else self._finish(now_ns, False)
+        end_ns = self.first_deadline_ns + self.duration_ns
+        if next_deadline is None or next_deadline >= end_ns:
+            self._ending = True
+            return end_ns
+        return next_deadline
+    
+    def _finish(self, now_ns, completed=True):
+        """结束任务"""
+        self.finish_ns = now_ns
+        self.completed = completed
+        return None
+    
+    def on_finished(self):
+        # 取消时补发释放
+        if self.pressed:
+            self._engine.inject_held_release(self, self._engine.scheduler.clock.now_ns())
+        if not self.finish_ns:
+            self.finish_ns = self._engine.scheduler.clock.now_ns()
+        if self._on_done:
+            self._on_done(self)
+    
+    def report(self):
+        """
+        获取运行结果
+        
+        Returns:
+            dict: 要求与实际的点击次数和时长(毫秒)，duration_error_ms为实际时长与按时间表应有时长之差，
+                以及每次点击计时误差的平均值、p99和最大值(毫秒)
+        """
+        errors = sorted(self.errors_us)
+        last = len(errors) - 1
+        duration_ns = self.finish_ns - self.start_ns if self.count else 0
+        expected_ns = self.last_deadline_ns - self.first_deadline_ns if self.count else 0
+        return {
+            "requested_clicks": self.clicks,
+            "requested_ms": self.duration_ns / NS_PER_MS,
+            "clicks": self.count,
+            "duration_ms": duration_ns / NS_PER_MS,
+            "duration_error_ms": (duration_ns - expected_ns) / NS_PER_MS,
+            "completed": self.completed,
+            "mean_error_ms": sum(errors) / len(errors) / 1000.0 if errors else 0.0,
+            "p99_error_ms": errors[last * 99 // 100] / 1000.0 if errors else 0.0,
+            "max_error_ms": errors[last] / 1000.0 if errors else 0.0,
+        }
+
+
+class ClickEngine:
+    """连点引擎"""
+    
+    def __init__(self, injector, scheduler=None, recorder=None):
+        """
+        初始化引擎
+        
+        Args:
+            injector: 点击注入器，需要提供click()、press()和release()方法
+            scheduler: 截止时间调度器，默认创建使用真实时钟的调度器
+            recorder: 飞行记录器，为None时不记录状态变化
+        """
+        self._injector = injector
+        self._record = recorder.record if recorder is not None else _no_record
+        self._scheduler = scheduler or DeadlineScheduler()
+        self._clock = self._scheduler.clock
+        self._lock = threading.Lock()
+        
+        self._detector = TriggerDetector(5, 300 * NS_PER_MS)
+        self._program = fixed_program(500)
+        
+        self._button_held = False          # 用户是否按住按钮
+        self._burst = None                 # 当前的连点任务
+        self.enabled = True                # 为False时忽略按下，不再触发新的连点
+        self.injected = InjectedEvents()   # 待到达钩子的注入事件，键为是否按下
+        self.injected_clicks = 0           # 累计注入的点击次数
+        
+        # 回调，由外层设置
+        self.on_started = None             # 连点开始
+        self.on_stopped = None             # 连点停止，参数为(点击次数, 从首次点击到停止的纳秒数)
+        self.on_click_injected = None      # 每次注入点击后调用，参数为(次数, 耗时纳秒)
+    
+    @property
+    def scheduler(self):
+        """引擎使用的调度器"""
+        return self._scheduler
+    
+    @property
+    def detector(self):
+        """引擎使用的触发检测器"""
+        return self._detector
+    
+    @property
+    def program(self):
+        """当前使用的点击程序"""
+        return self._program
+    
+    def configure(self, trigger_count, trigger_interval_ms, click_interval_ms, program=None):
+        """
+        更新引擎参数
+        
+        Args:
+            trigger_count: 触发连点的点击次数
+            trigger_interval_ms: 触发时间窗口(毫秒)
+            click_interval_ms: 自动连点间隔(毫秒)，未指定点击程序时使用
+            program: 预编译的点击程序(CompiledProgram)，为None时按固定间隔连点
+        """
+        if program is None:
+            program = fixed_program(click_interval_ms)
+        with self._lock:
+            self._detector.configure(trigger_count, trigger_interval_ms * NS_PER_MS)
+            self._program = program
+    
+    def set_detector(self, detector):
+        """
+        替换触发检测器(如自适应检测器)，沿用当前的触发参数
+        
+        Args:
+            detector: TriggerDetector或其子类的实例
+        """
+        with self._lock:
+            detector.configure(self._detector.trigger_count, self._detector.trigger_window_ns)
+            self._detector = detector
+    
+    def set_program(self, program):
+        """
+        切换点击程序，正在进行的连点在下一次点击时切换
+        
+        Args:
+            program: 预编译的点击程序
+        """
+        with self._lock:
+            self._program = program
+    
+    def is_clicking(self):
+        """是否正在自动连点"""
+        return self._burst is not None
+    
+    def on_button(self, pressed, t_ns):
+        """
+        处理一次用户按键事件
+        
+        Args:
+            pressed: 是否按下
+            t_ns: 事件发生时间(单调纳秒)
+        
+        Returns:
+            int: 事件码(EVENT_*)
+        """
+        if pressed and not self.enabled:
+            return EVENT_IGNORED
+        
+        record = self._record
+        with self._lock:
+            if pressed:
+                record(FR_PRESS, t_ns)
+                self._button_held = True
+                triggered = self._detector.press(t_ns)
+                record(FR_TRIGGER_EVAL, t_ns, triggered)
+                if not triggered:
+                    return EVENT_PRESS
+                if self._burst is None:
+                    self._burst = HeldBurstJob(self, self._program)
+                    started = self._burst
+                else:
+                    started = None
+            else:
+                record(FR_RELEASE, t_ns)
+                self._button_held = False
+                self._detector.release(t_ns)
+                burst = self._burst
+                self._burst = None
+                if burst is None:
+                    return EVENT_RELEASE
+        
+        if not pressed:
+            self._scheduler.cancel(burst)
+            record(FR_STOP, t_ns, burst.count)
+            if self.on_stopped:
+                self.on_stopped(burst.count, burst.active_ns(t_ns))
+            return EVENT_STOPPED
+        
+        if started is not None:
+            self._scheduler.submit(started)
+            record(FR_WORKER_ARMED, t_ns)
+            if self.on_started:
+                self.on_started()
+        return EVENT_TRIGGERED
+    
+    def run_probe(self, interval_ms, clicks, on_tick=None, on_done=None):
+        """
+        在调度线程上运行一次测量用的定时任务
+        
+        Args:
+            interval_ms: 间隔(毫秒)
+            clicks: 执行次数
+            on_tick: 每次执行后在调度线程上调用，参数为已执行次数
+            on_done: 结束(完成或取消)后调用，参数为任务
+        
+        Returns:
+            ProbeBurstJob: 已提交的任务，可传给scheduler.cancel取消
+        """
+        job = ProbeBurstJob(int(interval_ms * NS_PER_MS), clicks, on_tick, on_done)
+        self._scheduler.submit(job)
+        return job
+    
+    def run_bounded(self, clicks=0, duration_ms=0, program=None, on_done=None):
+        """
+        在调度线程上运行一次有界连点，与按住连点使用同一个调度器和时间表
+        
+        Args:
+            clicks: 点击次数，0表示不限
+            duration_ms: 时长(毫秒)，0表示不限
+            program: 预编译的点击程序，默认使用当前程序
+            on_done: 结束(完成或取消)后调用，参数为任务
+        
+        Returns:
+            BoundedBurstJob: 已提交的任务，可传给scheduler.cancel取消
+        
+        Raises:
+            ValueError: 次数和时长都未指定
+        """
+        if clicks <= 0 and duration_ms <= 0:
+            raise ValueError("a click count or a duration is required")
+        job = BoundedBurstJob(self, program or self._program, max(0, int(clicks)),
+                              max(0, int(duration_ms * NS_PER_MS)), on_done)
+        self._scheduler.submit(job)
+        return job
+    
+    def inject_held_click(self, job, now_ns, press_only=False):
+        """
+        在调度线程上为按住连点注入一次点击
+        
+        Args:
+            job: 发起点击的连点任务
+            now_ns: 当前时间(纳秒)
+            press_only: 只注入按下，释放由inject_held_release完成
+        
+        Returns:
+            bool: 是否注入了点击，用户已释放时返回False
+        """
+        with self._lock:
+            if job is not self._burst or not self._button_held:
+                return False
+        self.inject_click(job, now_ns, press_only)
+        return True
+    
+    def inject_click(self, job, now_ns, press_only=False):
+        """
+        在调度线程上为任务注入一次点击，不检查用户按键状态
+        
+        Args:
+            job: 发起点击的任务
+            now_ns: 当前时间(纳秒)
+            press_only: 只注入按下，释放由inject_held_release完成
+        """
+        # 先登记再注入，钩子可能在注入调用返回之前或之后很久才收到事件
+        injected = self.injected
+        injected.expect(True)
+        if not press_only:
+            injected.expect(False)
+        try:
+            if press_only:
+                self._injector.press()
+            else:
+                self._injector.click()
+        except Exception as e:
+            print(f"Error during rapid clicking: {e}")
+            injected.forget(True)
+            if not press_only:
+                injected.forget(False)
+        
+        if job.count == 0:
+            job.start_ns = now_ns
+        job.count += 1
+        self.injected_clicks += 1
+        self._record(FR_CLICK_INJECTED, now_ns, job.count)
+        if self.on_click_injected:
+            self.on_click_injected(job.count, self._clock.now_ns() - job.start_ns)
+    
+    def inject_held_release(self, job, now_ns):
+        """
+        在调度线程上释放inject_held_click按下的按钮
+        
+        Args:
+            job: 发起点击的连点任务
+            now_ns: 当前时间(纳秒)
+        """
+        job.pressed = False
+        self.injected.expect(False)
+        try:
+            self._injector.release()
+        except Exception as e:
+            print(f"Error during rapid clicking: {e}")
+            self.injected.forget(False)
+    
+    def stop(self):
+        """停止当前连点"""
+        with self._lock:
+            burst = self._burst
+            self._burst = None
+        if burst is not None:
+            self._scheduler.cancel(burst)
+            # 用户仍按住时停止，需要释放程序按下的按钮；用户释放时按钮已随之抬起
+            if burst.pressed:
+                self.inject_held_release(burst, self._clock.now_ns())
+            now_ns = self._clock.now_ns()
+            self._record(FR_STOP, now_ns, burst.count)
+            if self.on_stopped:
+                self.on_stopped(burst.count, burst.active_ns(now_ns))
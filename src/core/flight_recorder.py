@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+飞行记录器模块，在预分配的环形缓冲区中记录引擎状态变化，供事后分析
+"""
+
+import os
+import sys
+import time
+import signal
+import itertools
+import threading
+from array import array
+
+from core.clock import monotonic_ns, NS_PER_MS
+from utils.constants import APP_NAME
+
+
+# 事件码
+FR_PRESS = 1              # 检测到用户按下
+FR_TRIGGER_EVAL = 2       # 完成触发判定，参数为是否触发
+FR_WORKER_ARMED = 3       # 连点任务已提交调度器
+FR_CLICK_INJECTED = 4     # 注入一次点击，参数为本次连点的点击序号
+FR_RELEASE = 5            # 检测到用户释放
+FR_STOP = 6               # 连点停止，参数为本次连点的点击次数
+FR_LISTENER_RESTART = 7   # 看门狗重启了监听器
+
+FR_NAMES = {
+    FR_PRESS: "press",
+    FR_TRIGGER_EVAL: "trigger_eval",
+    FR_WORKER_ARMED: "worker_armed",
+    FR_CLICK_INJECTED: "click_injected",
+    FR_RELEASE: "release",
+    FR_STOP: "stop",
+    FR_LISTENER_RESTART: "listener_restart",
+}
+
+# 每条记录占用的槽位：序号、事件码、时间(纳秒)、参数
+_FIELDS = 4
+
+
+class FlightRecorder:
+    """
+    固定容量的状态变化记录器
+    
+    所有记录写入启动时分配好的array，写入只是几次下标赋值，不会扩容或创建列表。
+    序号由itertools.count分配，在多个线程同时写入时也不会占用同一个槽位。
+    """
+    
+    def __init__(self, capacity=4096):
+        """
+        初始化记录器
+        
+        Args:
+            capacity: 最多保留的记录条数
+        """
+        self._capacity = max(1, int(capacity))
+        self._buffer = array("q", bytes(8 * _FIELDS * self._capacity))
+        self._seq = itertools.count(1)
+        self._dump_lock = threading.Lock()
+    
+    def record(self, code, t_ns, arg=0):
+        """
+        写入一条记录
+        
+        Args:
+            code: 事件码(FR_*)
+            t_ns: 事件时间(单调纳秒)
+            arg: 事件参数
+        """
+        seq = next(self._seq)
+        base = (seq % self._capacity) * _FIELDS
+        buffer = self._buffer
+        buffer[base + 1] = code
+        buffer[base + 2] = t_ns
+        buffer[base + 3] = arg
+        buffer[base] = seq
+    
+    def entries(self):
+        """
+        按时间顺序获取当前保留的记录
+        
+        Returns:
+            list: (序号, 事件码, 时间纳秒, 参数)组成的列表
+        """
+        snapshot = self._buffer.tolist()
+        rows = [tuple(snapshot[i:i + _FIELDS]) for i in range(0, len(snapshot), _FIELDS)]
+        return sorted(row for row in rows if row[0] > 0)
+    
+    def dump(self, path=None, reason="manual"):
+        """
+        将记录写入文本文件
+        
+        Args:
+            path: 文件路径，默认写入用户目录
+            reason: 导出原因
+        
+        Returns:
+            str: 写入的文件路径，失败时返回None
+        """
+        if path is None:
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(os.path.expanduser("~"), f".{APP_NAME.lower()}_flight_{stamp}.log")
+        
+        # 用当前的墙上时间和单调时间换算每条记录的绝对时间
+        wall_now = time.time()
+        mono_now = monotonic_ns()
+        
+        with self._dump_lock:
+            try:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(f"# {APP_NAME} flight recorder dump, reason={reason}\n")
+                    f.write("# seq\twall_time\tt_ms\tevent\targ\n")
+                    for seq, code, t_ns, arg in self.entries():
+                        wall = wall_now - (mono_now - t_ns) / 1e9
+                        stamp = time.strftime("%H:%M:%S", time.localtime(wall)) + f".{int(wall * 1000) % 1000:03d}"
+                        f.write(f"{seq}\t{stamp}\t{t_ns / NS_PER_MS:.3f}\t{FR_NAMES.get(code, code)}\t{arg}\n")
+                return path
+            except Exception as e:
+                print(f"Error dumping flight recorder: {e}")
+                return None
+
+
+def install_crash_dump(recorder):
+    """
+    在未捕获异常时自动导出记录
+    
+    Args:
+        recorder: FlightRecorder实例
+    """
+    previous_hook = sys.excepthook
+    previous_thread_hook = threading.excepthook
+    
+    def excepthook(exc_type, exc_value, exc_traceback):
+        recorder.dump(reason=f"crash: {exc_type.__name__}")
+        previous_hook(exc_type, exc_value, exc_traceback)
+    
+    def thread_excepthook(args):
+        recorder.dump(reason=f"thread crash: {args.exc_type.__name__}")
+        previous_thread_hook(args)
+    
+    sys.excepthook = excepthook
+    threading.excepthook = thread_excepthook
+
+
+def install_signal_dump(recorder):
+    """
+    收到SIGUSR1(Windows上为SIGBREAK，即Ctrl+Break)时导出记录，必须在主线程调用
+    
+    Args:
+        recorder: FlightRecorder实例
+    
+    Returns:
+        int: 注册的信号编号，平台不支持时返回None
+    """
+    signum = getattr(signal, "SIGUSR1", None) or getattr(signal, "SIGBREAK", None)
+    if signum is None:
+        return None
+    signal.signal(signum, lambda *args: recorder.dump(reason="signal"))
+    return signum
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+程序注入事件过滤模块
+
+注入的点击或按键并不会在注入调用内同步回到钩子：Windows低级钩子在监听线程上排队处理，
+X11/XTest事件经过X服务器转发，钩子收到它们时注入调用可能早已返回。因此不能用
+"正在注入"的布尔标志判断事件来源，而是在注入前登记预期的事件，钩子每收到一个匹配的
+事件就抵消一个登记。登记在一段时间后过期，注入的事件丢失时不会一直吞掉用户的输入。
+"""
+
+import threading
+from collections import deque
+
+from core.clock import monotonic_ns, NS_PER_MS
+
+
+class InjectedEvents:
+    """待到达的注入事件计数，注入线程登记，钩子线程抵消"""
+    
+    # 注入事件最迟到达的时间，超过后登记作废
+    EXPIRY_NS = 1000 * NS_PER_MS
+    
+    # 每种事件最多保留的登记数量，没有钩子消费时(如模拟)不会无限增长
+    MAX_PENDING = 64
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}          # 事件键 -> 登记时间的队列(从早到晚)
+    
+    def expect(self, key):
+        """
+        登记一个即将注入的事件，在调用注入之前调用
+        
+        Args:
+            key: 事件键，如是否按下或(按键编号, 是否按下)
+        """
+        now_ns = monotonic_ns()
+        with self._lock:
+            queue = self._pending.get(key)
+            if queue is None:
+                queue = self._pending[key] = deque(maxlen=self.MAX_PENDING)
+            queue.append(now_ns)
+    
+    def forget(self, key):
+        """
+        撤销最近一次登记，注入失败时调用
+        
+        Args:
+            key: 事件键
+        """
+        with self._lock:
+            queue = self._pending.get(key)
+            if queue:
+                queue.pop()
+    
+    def consume(self, key):
+        """
+        钩子收到事件时调用，判断它是否为登记过的注入事件
+        
+        Args:
+            key: 事件键
+        
+        Returns:
+            bool: 是注入事件时返回True，并抵消一个登记
+        """
+        with self._lock:
+            queue = self._pending.get(key)
+            if not queue:
+                return False
+            expired = monotonic_ns() - self.EXPIRY_NS
+            while queue and queue[0] < expired:
+                queue.popleft()
+            if not queue:
+                return False
+            queue.popleft()
+            return True
+    
+    def pending(self):
+        """
+        获取尚未到达的登记数量(包括已过期但还未清理的)
+        
+        Returns:
+            int: 登记数量
+        """
+        with self._lock:
+            return sum(len(queue) for queue in self._pending.values())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+鼠标输入源模块，尽量在系统层面只订阅按键事件
+"""
+
+from pynput import mouse
+
+
+# 输入源模式
+INPUT_MODE_BUTTONS = "buttons"   # 仅订阅按键按下/释放事件
+INPUT_MODE_ALL = "all"           # pynput默认行为，订阅全部指针事件
+
+# 当前pynput使用的后端名称(_win32/_xorg/_darwin)
+_BACKEND = mouse.Listener.__module__.rsplit(".", 1)[-1]
+
+
+def scroll_hook_events(notches):
+    """
+    一次注入的单方向滚动会让钩子收到的事件数量
+    
+    X11上pynput按刻度逐个发送按键4-7，每个刻度一个事件；Windows上每个方向一条滚轮消息。
+    
+    Args:
+        notches: 该方向的刻度数
+    
+    Returns:
+        int: 钩子收到的事件数量
+    """
+    if not notches:
+        return 0
+    return abs(notches) if _BACKEND == "_xorg" else 1
+
+
+class _ThreadInitMixin:
+    """在监听线程开始运行前调用thread_init，用于设置亲和性和优先级"""
+    
+    thread_init = None
+    
+    def run(self):
+        if self.thread_init is not None:
+            self.thread_init()
+        super(_ThreadInitMixin, self).run()
+
+
+if _BACKEND == "_xorg":
+    import Xlib.X
+    
+    class _AllEventsListener(_ThreadInitMixin, mouse.Listener):
+        """订阅全部指针事件的监听器，统计钩子线程唤醒次数"""
+        
+        # pynput把事件掩码当作XRecord的事件类型范围使用，
+        # 实际录制的是ButtonPress..LeaveNotify，其中包含MotionNotify
+        counts_wakeups = True
+        hook_wakeups = 0
+        event_time = None  # 当前事件的X服务器时间(毫秒)
+        
+        def _handle(self, display, event):
+            self.hook_wakeups += 1
+            self.event_time = event.time
+            super(_AllEventsListener, self)._handle(display, event)
+    
+    class _ButtonOnlyListener(_AllEventsListener):
+        """只让X服务器录制ButtonPress/ButtonRelease的监听器"""
+        
+        # XRecord的device_events是事件类型的闭区间，这里只保留按键事件，
+        # 指针移动在X服务器端就被过滤，不会唤醒Python线程
+        _EVENTS = (Xlib.X.ButtonPress, Xlib.X.ButtonRelease)
+
+elif _BACKEND == "_win32":
+    import ctypes
+    from pynput._util.win32 import SystemHook
+    
+    class _AllEventsListener(_ThreadInitMixin, mouse.Listener):
+        """订阅全部指针事件的监听器，统计钩子线程唤醒次数"""
+        
+        counts_wakeups = True
+        hook_wakeups = 0
+        event_time = None  # 当前事件的MSLLHOOKSTRUCT.time(毫秒)
+        
+        def _convert(self, code, msg, lpdata):
+            # pynput的鼠标监听器没有实现_convert，默认通过抛出NotImplementedError
+            # 回退到_handle；这里直接调用以省掉每个事件一次的异常开销
+            self.hook_wakeups += 1
+            self._dispatch(code, msg, lpdata)
+            return None
+        
+        def _dispatch(self, code, msg, lpdata):
+            """记录事件时间戳后交给pynput分发"""
+            if code == SystemHook.HC_ACTION:
+                self.event_time = ctypes.cast(lpdata, self._LPMSLLHOOKSTRUCT).contents.time
+            self._handle(code, msg, lpdata)
+    
+    class _ButtonOnlyListener(_AllEventsListener):
+        """只处理按键消息的监听器"""
+        
+        # WH_MOUSE_LL无法按消息类型订阅，每个事件都会进入回调，
+        # 因此在读取MSLLHOOKSTRUCT之前用整数集合尽早丢弃移动和滚轮消息
+        _BUTTON_MESSAGES = frozenset(
+            list(mouse.Listener.CLICK_BUTTONS) + list(mouse.Listener.X_BUTTONS))
+        
+        # 启用滚轮连续滚动时额外保留的滚轮消息(WM_MOUSEWHEEL/WM_MOUSEHWHEEL)
+        _WHEEL_MESSAGES = frozenset((0x020A, 0x020E))
+        messages = _BUTTON_MESSAGES
+        
+        def _convert(self, code, msg, lpdata):
+            self.hook_wakeups += 1
+            if msg in self.messages:
+                self._dispatch(code, msg, lpdata)
+            return None
+
+else:
+    class _AllEventsListener(_ThreadInitMixin, mouse.Listener):
+        """其他后端使用pynput默认监听器，不统计钩子线程唤醒次数"""
+        
+        counts_wakeups = False
+        hook_wakeups = 0
+        event_time = None  # 无法获取系统时间戳，回调使用进入时刻
+    
+    _ButtonOnlyListener = _AllEventsListener
+
+
+def create_listener(on_click, mode=INPUT_MODE_BUTTONS, thread_init=None, on_scroll=None):
+    """
+    创建鼠标监听器
+    
+    Args:
+        on_click: 点击回调，参数与pynput的on_click一致
+        mode: 输入源模式(buttons/all)
+        thread_init: 监听线程启动后首先调用的函数
+        on_scroll: 滚轮回调，参数与pynput的on_scroll一致；为None时buttons模式不处理滚轮消息
+    
+    Returns:
+        mouse.Listener: 尚未启动的监听器，hook_wakeups属性记录钩子线程唤醒次数(counts_wakeups
+            为False的后端不统计，始终为0)，event_time属性在回调期间保存当前事件的系统时间戳(毫秒)
+    """
+    listener_class = _ButtonOnlyListener if mode == INPUT_MODE_BUTTONS else _AllEventsListener
+    listener = listener_class(on_click=on_click, on_scroll=on_scroll)
+    if _BACKEND == "_win32" and listener_class is _ButtonOnlyListener:
+        messages = _ButtonOnlyListener._BUTTON_MESSAGES
+        if on_scroll is not None:
+            messages = messages | _ButtonOnlyListener._WHEEL_MESSAGES
+        listener.messages = messages
+    listener.thread_init = thread_init
+    listener.name = "RapidClickHook"
+    listener.daemon = True
+    return listener
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+键盘连发模块
+
+快速连按同一个键后按住，按配置的间隔重复注入该键。每个键使用一个独立的ClickEngine
+(各自的触发检测器和连点任务)，所有键共用鼠标连点的调度线程，不为每个键创建线程。
+"""
+
+import threading
+
+from pynput import keyboard
+
+from core.clock import monotonic_ns
+from core.engine import ClickEngine
+
+
+def key_name(key):
+    """
+    获取按键的配置名称
+    
+    Args:
+        key: pynput的Key或KeyCode
+    
+    Returns:
+        str: 特殊键为名称(如"space"、"f1")，字符键为小写字符，其他为"vk<虚拟键码>"
+    """
+    if isinstance(key, keyboard.Key):
+        return key.name
+    if getattr(key, "char", None):
+        return key.char.lower()
+    return f"vk{getattr(key, 'vk', 0)}"
+
+
+class KeyInjector:
+    """通过pynput键盘控制器注入指定按键"""
+    
+    def __init__(self, controller, key):
+        self._controller = controller
+        self._key = key
+    
+    def click(self):
+        """注入一次按下和释放"""
+        self._controller.press(self._key)
+        self._controller.release(self._key)
+    
+    def press(self):
+        """注入按下"""
+        self._controller.press(self._key)
+    
+    def release(self):
+        """注入释放"""
+        self._controller.release(self._key)
+
+
+class KeyboardHandler:
+    """
+    键盘连发处理器
+    
+    按键引擎在第一次按下某个键时创建，之后复用；监听线程只做集合查找和引擎的O(1)触发判定。
+    """
+    
+    def __init__(self, scheduler):
+        """
+        初始化键盘连发处理器
+        
+        Args:
+            scheduler: 与鼠标连点共用的截止时间调度器
+        """
+        self._scheduler = scheduler
+        self._controller = keyboard.Controller()
+        self._listener = None
+        self._lock = threading.Lock()
+        self._engines = {}              # 按键名称 -> ClickEngine
+        self._held = set()              # 用户正按住的键，用于过滤系统的自动重复
+        self._keys = frozenset()        # 允许连发的键，为空时所有键都允许
+        self._trigger_count = 3
+        self._trigger_interval_ms = 300
+        self._repeat_interval_ms = 50
+        self.enabled = True
+        
+        # 回调，由外层设置，参数为按键名称
+        self.on_started = None
+        self.on_stopped = None
+    
+    def configure(self, keys, trigger_count, trigger_interval_ms, repeat_interval_ms):
+        """
+        更新连发参数
+        
+        Args:
+            keys: 允许连发的键名称列表，为空时所有键都允许
+            trigger_count: 触发连发的按键次数
+            trigger_interval_ms: 触发时间窗口(毫秒)
+            repeat_interval_ms: 连发间隔(毫秒)
+        """
+        with self._lock:
+            self._keys = frozenset(name.lower() for name in keys)
+            self._trigger_count = trigger_count
+            self._trigger_interval_ms = trigger_interval_ms
+            self._repeat_interval_ms = repeat_interval_ms
+            engines = list(self._engines.values())
+        for engine in engines:
+            engine.configure(trigger_count, trigger_interval_ms, repeat_interval_ms)
+    
+    def set_enabled(self, enabled):
+        """
+        启用或暂停触发，已在连发的键不受影响，由stop_all结束
+        
+        Args:
+            enabled: 是否允许触发
+        """
+        self.enabled = enabled
+        with self._lock:
+            engines = list(self._engines.values())
+        for engine in engines:
+            engine.enabled = enabled
+    
+    def start(self):
+        """开始监听键盘"""
+        if self._listener is None:
+            self._listener = keyboard.Listener(on_press=self._on_press, on_release=self._on_release)
+            self._listener.start()
+    
+    def stop(self):
+        """停止监听并结束所有连发"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        self.stop_all()
+        self._held.clear()
+    
+    def stop_all(self):
+        """结束所有正在连发的键"""
+        with self._lock:
+            engines = list(self._engines.values())
+        for engine in engines:
+            engine.stop()
+    
+    def is_repeating(self):
+        """是否有键正在连发"""
+        return any(engine.is_clicking() for engine in list(self._engines.values()))
+    
+    def _engine_for(self, name, key):
+        """获取按键的引擎，不存在时创建"""
+        engine = self._engines.get(name)
+        if engine is not None:
+            return engine
+        with self._lock:
+            engine = self._engines.get(name)
+            if engine is None:
+                engine = ClickEngine(KeyInjector(self._controller, key), self._scheduler)
+                engine.configure(self._trigger_count, self._trigger_interval_ms, self._repeat_interval_ms)
+                engine.enabled = self.enabled
+                engine.on_started = lambda: self.on_started and self.on_started(name)
+                engine.on_stopped = lambda count, active_ns: self.on_stopped and self.on_stopped(name)
+                self._engines[name] = engine
+        return engine
+    
+    def _lookup(self, key):
+        """
+        获取按键名称和引擎
+        
+        Returns:
+            tuple: (名称, 引擎)，不允许连发的键返回(名称, None)
+        """
+        key = self._listener.canonical(key) if self._listener is not None else key
+        name = key_name(key)
+        if self._keys and name not in self._keys:
+            return name, None
+        return name, self._engine_for(name, key)
+    
+    def _on_press(self, key):
+        """键盘按下回调，在监听线程上调用"""
+        name, engine = self._lookup(key)
+        # 忽略不连发的键、程序注入的按键和按住时系统产生的自动重复
+        if engine is None or engine.injected.consume(True) or name in self._held:
+            return
+        self._held.add(name)
+        engine.on_button(True, monotonic_ns())
+    
+    def _on_release(self, key):
+        """键盘释放回调，在监听线程上调用"""
+        name, engine = self._lookup(key)
+        # 注入的释放可能在注入调用返回之后才到达，按登记的数量抵消，不当作用户释放
+        if engine is None or engine.injected.consume(False):
+            return
+        self._held.discard(name)
+        engine.on_button(False, monotonic_ns())
@@ -0,0 +1,440 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+宏录制与回放模块
+
+录制：钩子线程把每次按键事件(位置、按键、按下/释放、单调时间)追加到几个紧凑的array中，
+不创建事件对象；停止录制时一次性写入宏文件。
+
+回放：调度线程按截止时间逐个注入事件，截止时间始终由本轮起点加上按速度缩放后的
+录制时间计算，不会累积误差。宏文件按块流式读取，读取发生在注入之后、等待下一个
+截止时间之前，长宏不需要完整加载到内存。每个事件的实际执行时间与截止时间之差
+记录下来作为回放的计时误差。
+
+宏文件格式(小端)：
+    文件头: 魔数"RCMK"、版本、事件数量、录制时长(纳秒)
+    事件:   相对录制开始的时间(纳秒)、x、y、按键码(按键编号 << 1 | 是否按下)
+"""
+
+import os
+import struct
+import threading
+from array import array
+
+from core.injected import InjectedEvents
+from core.scheduler import ScheduledJob
+from utils.constants import APP_NAME
+
+
+# 按键编号
+BUTTON_LEFT = 1
+BUTTON_RIGHT = 2
+BUTTON_MIDDLE = 3
+
+_MAGIC = b"RCMK"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHIq")
+_EVENT = struct.Struct("<qiiB")
+
+# 回放时每次从文件读取的事件数量
+_CHUNK_EVENTS = 4096
+
+
+class MacroRecorder:
+    """宏录制器，add只在钩子线程上调用"""
+    
+    def __init__(self, start_ns):
+        """
+        初始化录制器
+        
+        Args:
+            start_ns: 录制开始时间(单调纳秒)
+        """
+        self.start_ns = start_ns
+        self._times = array("q")
+        self._xs = array("i")
+        self._ys = array("i")
+        self._codes = array("B")
+    
+    def __len__(self):
+        return len(self._codes)
+    
+    def add(self, x, y, button, pressed, t_ns):
+        """
+        追加一个按键事件
+        
+        Args:
+            x, y: 光标位置
+            button: 按键编号(BUTTON_*)
+            pressed: 是否按下
+            t_ns: 事件时间(单调纳秒)
+        """
+        self._times.append(max(0, t_ns - self.start_ns))
+        self._xs.append(int(x))
+        self._ys.append(int(y))
+        self._codes.append((button << 1) | (1 if pressed else 0))
+    
+    def trim_before(self, t_ns):
+        """
+        丢弃t_ns之前最后一次按下及其之后的所有事件
+        
+        从托盘菜单停止录制时，打开菜单的那次点击也会被录制，用菜单弹出的时间去掉它。
+        
+        Args:
+            t_ns: 截断时间(单调纳秒)
+        """
+        offset = t_ns - self.start_ns
+        cut = len(self._codes)
+        for i in range(len(self._codes) - 1, -1, -1):
+            if self._times[i] <= offset and self._codes[i] & 1:
+                cut = i
+                break
+        del self._times[cut:]
+        del self._xs[cut:]
+        del self._ys[cut:]
+        del self._codes[cut:]
+    
+    def save(self, path, stop_ns):
+        """
+        写入宏文件，先写临时文件再替换，写入失败不会破坏原有的宏
+        
+        Args:
+            path: 宏文件路径
+            stop_ns: 录制结束时间(单调纳秒)，决定循环回放时两轮之间的间隔
+        
+        Returns:
+            tuple: (事件数量, 录制时长纳秒)
+        """
+        count = len(self._codes)
+        duration_ns = max(stop_ns - self.start_ns, self._times[-1] if count else 0)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, count, duration_ns))
+            pack = _EVENT.pack
+            for start in range(0, count, _CHUNK_EVENTS):
+                end = min(start + _CHUNK_EVENTS, count)
+                f.write(b"".join(
+                    pack(self._times[i], self._xs[i], self._ys[i], self._codes[i]) for i in range(start, end)))
+        os.replace(tmp_path, path)
+        return count, duration_ns
+
+
+class MacroFile:
+    """按块读取的宏文件"""
+    
+    def __init__(self, path):
+        """
+        打开宏文件并读取文件头
+        
+        Args:
+            path: 宏文件路径
+        
+        Raises:
+            OSError: 文件无法打开
+            ValueError: 不是宏文件或版本不支持
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            header = self._file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError(f"{path} is not a macro file")
+            magic, version, self.count, self.duration_ns = _HEADER.unpack(header)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a version {_VERSION} macro file")
+        except Exception:
+            self._file.close()
+            raise
+    
+    def rewind(self):
+        """回到第一个事件"""
+        self._file.seek(_HEADER.size)
+    
+    def read_chunk(self):
+        """
+        读取下一块事件
+        
+        Returns:
+            list: (时间纳秒, x, y, 按键码)，读到文件末尾时为空列表
+        """
+        data = self._file.read(_EVENT.size * _CHUNK_EVENTS)
+        usable = len(data) - len(data) % _EVENT.size
+        return list(_EVENT.iter_unpack(data[:usable]))
+    
+    def close(self):
+        self._file.close()
+
+
+class MacroPlayJob(ScheduledJob):
+    """按截止时间回放宏的调度任务"""
+    
+    def __init__(self, macro, injector, speed=1.0, loops=1, on_done=None, injected=None):
+        """
+        初始化回放任务
+        
+        Args:
+            macro: MacroFile
+            injector: 注入器，提供button_at(x, y, 按键编号, 是否按下)
+            speed: 速度倍数，2表示两倍速
+            loops: 回放次数，0表示直到取消
+            on_done: 任务结束时调用，参数为任务
+            injected: 登记注入事件的InjectedEvents，键为(按键编号, 是否按下)，默认新建
+        """
+        super(MacroPlayJob, self).__init__()
+        self.macro = macro
+        self.speed = speed
+        self.loops = loops
+        self.loop = 0                   # 当前轮次
+        self.events = 0                 # 已注入的事件数量
+        self.injected = injected or InjectedEvents()    # 待到达钩子的注入事件，钩子据此忽略回放产生的事件
+        self.errors_us = array("i")     # 每个事件的计时误差(微秒，正数表示迟到)
+        self._injector = injector
+        self._on_done = on_done
+        self._held = {}                 # 已按下未释放的按键 -> 位置
+        self._chunk = []
+        self._pos = 0
+        self._loop_base_ns = 0
+        # 取消可能发生在其他线程上，注入、读取与关闭文件之间互斥
+        self._io_lock = threading.Lock()
+        self._closed = False
+    
+    def start(self, scheduler):
+        """
+        读取第一个事件并提交到调度器
+        
+        Args:
+            scheduler: 截止时间调度器
+        
+        Returns:
+            bool: 宏为空时返回False
+        """
+        event = self._next_event()
+        if event is None:
+            self._close()
+            return False
+        self._loop_base_ns = scheduler.clock.now_ns()
+        scheduler.submit(self, self._deadline(event))
+        return True
+    
+    def _scaled(self, t_ns):
+        return int(t_ns / self.speed)
+    
+    def _deadline(self, event):
+        return self._loop_base_ns + self._scaled(event[0])
+    
+    def _next_event(self):
+        """取出下一个事件，当前块用完时从文件读取下一块"""
+        if self._pos >= len(self._chunk):
+            self._chunk = self.macro.read_chunk()
+            self._pos = 0
+            if not self._chunk:
+                return None
+        return self._chunk[self._pos]
+    
+    def fire(self, now_ns):
+        with self._io_lock:
+            if self._closed:
+                return None
+            _, x, y, code = self._chunk[self._pos]
+            self._pos += 1
+            self.errors_us.append(min((now_ns - self.deadline_ns) // 1000, 0x7FFFFFFF))
+            button = code >> 1
+            pressed = bool(code & 1)
+            self.injected.expect((button, pressed))
+            try:
+                self._injector.button_at(x, y, button, pressed)
+            except Exception as e:
+                print(f"Error during macro playback: {e}")
+                self.injected.forget((button, pressed))
+                return None
+            if pressed:
+                self._held[button] = (x, y)
+            else:
+                self._held.pop(button, None)
+            self.events += 1
+            
+            # 在等待下一个截止时间之前读取下一个事件，文件读取不会推迟注入
+            event = self._next_event()
+            if event is None:
+                self.loop += 1
+                if self.loops and self.loop >= self.loops:
+                    return None
+                self._loop_base_ns += self._scaled(self.macro.duration_ns)
+                self.macro.rewind()
+                event = self._next_event()
+                if event is None:
+                    return None
+            return self._deadline(event)
+    
+    def _close(self):
+        """释放仍按下的按键并关闭文件"""
+        with self._io_lock:
+            if self._closed:
+                return
+            self._closed = True
+            for button, (x, y) in self._held.items():
+                self.injected.expect((button, False))
+                try:
+                    self._injector.button_at(x, y, button, False)
+                except Exception as e:
+                    print(f"Error releasing button after macro playback: {e}")
+                    self.injected.forget((button, False))
+            self._held.clear()
+            self.macro.close()
+    
+    def on_finished(self):
+        self._close()
+        if self._on_done:
+            self._on_done(self)
+    
+    def timing(self):
+        """
+        获取计时误差摘要
+        
+        Returns:
+            dict: events、loops、mean_ms、p50_ms、p99_ms、max_ms
+        """
+        errors = sorted(self.errors_us)
+        if not errors:
+            return {"events": 0, "loops": self.loop, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        last = len(errors) - 1
+        return {
+            "events": len(errors),
+            "loops": self.loop,
+            "mean_ms": sum(errors) / len(errors) / 1000.0,
+            "p50_ms": errors[last // 2] / 1000.0,
+            "p99_ms": errors[last * 99 // 100] / 1000.0,
+            "max_ms": errors[last] / 1000.0,
+        }
+    
+    def write_timing(self, path):
+        """
+        写入每个事件的计时误差
+        
+        Args:
+            path: 输出文件路径
+        """
+        per_loop = max(1, self.macro.count)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# loop\tevent\terror_ms\n")
+            for i, error_us in enumerate(self.errors_us):
+                f.write(f"{i // per_loop}\t{i % per_loop}\t{error_us / 1000.0:.3f}\n")
+
+
+class MacroPlayer:
+    """宏回放管理，同一时间只回放一个宏"""
+    
+    def __init__(self, injector, scheduler):
+        """
+        初始化回放管理
+        
+        Args:
+            injector: 注入器，提供button_at(x, y, 按键编号, 是否按下)
+            scheduler: 与鼠标连点共用的截止时间调度器
+        """
+        self._injector = injector
+        self._scheduler = scheduler
+        self._job = None
+        self.last_job = None            # 最近一次回放的任务，用于查看计时误差
+        self.on_finished = None         # 回放结束时调用，参数为任务
+        # 所有回放共用，回放结束后才到达钩子的事件也能识别
+        self._injected = InjectedEvents()
+    
+    def consume_injected(self, button, pressed):
+        """
+        钩子收到按键事件时调用，判断它是否由回放注入
+        
+        Args:
+            button: 按键编号(BUTTON_*)
+            pressed: 是否按下
+        
+        Returns:
+            bool: 是回放注入的事件时返回True
+        """
+        return self._injected.consume((button, pressed))
+    
+    def play(self, path, speed=1.0, loops=1):
+        """
+        开始回放，正在进行的回放先停止
+        
+        Args:
+            path: 宏文件路径
+            speed: 速度倍数
+            loops: 回放次数，0表示直到停止
+        
+        Returns:
+            MacroPlayJob: 回放任务，宏为空时返回None
+        
+        Raises:
+            OSError, ValueError: 宏文件无法读取
+        """
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.stop()
+        job = MacroPlayJob(MacroFile(path), self._injector, speed, max(0, int(loops)), self._job_finished,
+                           self._injected)
+        self._job = job
+        self.last_job = job
+        if not job.start(self._scheduler):
+            self._job = None
+            return None
+        return job
+    
+    def stop(self):
+        """停止回放"""
+        job = self._job
+        if job is not None:
+            self._scheduler.cancel(job)
+    
+    def is_playing(self):
+        """
+        检查是否正在回放
+        
+        Returns:
+            bool: 正在回放返回True
+        """
+        return self._job is not None
+    
+    def _job_finished(self, job):
+        """任务结束(完成或取消)"""
+        if self._job is job:
+            self._job = None
+        print(f"[DEBUG] 宏回放结束: {job.events}个事件, 平均误差{job.timing()['mean_ms']:.3f}ms")
+        if self.on_finished:
+            self.on_finished(job)
+
+
+def default_macro_path():
+    """默认的宏文件路径(用户目录)"""
+    return os.path.join(os.path.expanduser("~"), f".{APP_NAME.lower()}_macro.bin")
+
+
+def macro_dir():
+    """宏目录，与默认宏文件同在用户目录下，控制接口只能读写其中的文件"""
+    return os.path.join(os.path.dirname(default_macro_path()), f".{APP_NAME.lower()}_macros")
+
+
+def macro_dir_path(name):
+    """
+    把文件名解析为宏目录中的路径
+    
+    Args:
+        name: 文件名，不能是绝对路径，也不能包含目录
+    
+    Returns:
+        str: 宏目录中的文件路径
+    
+    Raises:
+        ValueError: 文件名无效
+    """
+    if (not name or os.path.isabs(name) or os.path.basename(name) != name
+            or "/" in name or "\\" in name or name in (".", "..")):
+        raise ValueError(f"invalid macro name {name!r}: use a plain file name inside {macro_dir()}")
+    return os.path.join(macro_dir(), name)
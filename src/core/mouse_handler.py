@@ -11,9 +11,40 @@ from collections import deque
 from PyQt5.QtCore import QObject, pyqtSignal
 from pynput import mouse
 
+from core.app_rules import AppRuleSet, RULES_OFF
+from core.click_program import compile_programs, fixed_program
+from core.clock import monotonic_ns, EventTimeNormalizer, NS_PER_MS
+from core.control import MAX_COMMAND_WAIT_S
+from core.detector import TriggerDetector, AdaptiveTriggerDetector
+from core.engine import ClickEngine, EVENT_PRESS, EVENT_TRIGGERED, EVENT_RELEASE, EVENT_STOPPED
+from core.profiles import compile_profiles, ProfileHotkeys
+from core.flight_recorder import FlightRecorder, FR_LISTENER_RESTART
+from core.keyboard_handler import KeyboardHandler
+from core.macro import MacroRecorder, MacroPlayer, default_macro_path, macro_dir_path, BUTTON_LEFT, BUTTON_RIGHT, BUTTON_MIDDLE
+from core.input_source import create_listener, scroll_hook_events, INPUT_MODE_BUTTONS
+from core.scheduler import DeadlineScheduler
+from core.scroll_engine import ScrollEngine
+from core.shadow import ShadowDetectors
+from core.status_page import StatusPage
+from core.window_target import TargetManager, target_under_cursor
+from core.watchdog import HookWatchdog, IncidentLog
 from utils.config import Config
 from utils.debug import DebugHelper
 from utils.language import Language
+from utils.notify_bus import NotificationBus
+from utils.profiler import SamplingProfiler
+from utils.foreground import ForegroundTracker
+from utils.stats_store import StatsStore
+from utils.thread_tuning import tune_current_thread, PRIORITY_NORMAL
+
+
+# 宏录制与回放使用的按键编号
+_MACRO_BUTTONS = {
+    mouse.Button.left: BUTTON_LEFT,
+    mouse.Button.right: BUTTON_RIGHT,
+    mouse.Button.middle: BUTTON_MIDDLE,
+}
+_MACRO_BUTTON_NAMES = {code: button for button, code in _MACRO_BUTTONS.items()}
 
 
 class MouseClickEvent:
@@ -26,6 +57,48 @@ class MouseClickEvent:
         self.is_program_click = is_program_click  # 标记是否是程序生成的点击
 
 
+class ControllerInjector:
+    """通过pynput控制器在当前光标位置注入左键点击"""
+    
+    def __init__(self, controller):
+        self._controller = controller
+    
+    def click(self):
+        """注入一次左键点击"""
+        self._controller.click(mouse.Button.left)
+    
+    def press(self):
+        """注入左键按下"""
+        self._controller.press(mouse.Button.left)
+    
+    def release(self):
+        """注入左键释放"""
+        self._controller.release(mouse.Button.left)
+    
+    def scroll(self, dx, dy):
+        """注入一次滚动，dx、dy为刻度数"""
+        self._controller.scroll(dx, dy)
+    
+    def scroll_events(self, notches):
+        """单方向注入notches个刻度时钩子收到的事件数量"""
+        return scroll_hook_events(notches)
+    
+    def button_at(self, x, y, button, pressed):
+        """
+        把光标移到(x, y)后注入按键，供宏回放使用
+        
+        Args:
+            x, y: 屏幕坐标
+            button: 宏按键编号(BUTTON_*)
+            pressed: True为按下，False为释放
+        """
+        self._controller.position = (x, y)
+        if pressed:
+            self._controller.press(_MACRO_BUTTON_NAMES[button])
+        else:
+            self._controller.release(_MACRO_BUTTON_NAMES[button])
+
+
 class MouseHandler(QObject):
     """鼠标事件处理器，实现为单例模式"""
     
@@ -34,6 +107,7 @@ class MouseHandler(QObject):
     # 信号定义
     rapid_click_started = pyqtSignal()
     rapid_click_stopped = pyqtSignal()
+    engine_incident = pyqtSignal(str, str)  # 看门狗事件(类型, 描述)
     
     def __new__(cls):
         if cls._instance is None:
@@ -44,13 +118,18 @@ class MouseHandler(QObject):
     def __init__(self):
         if self._initialized:
             return
-            
+        
         super(MouseHandler, self).__init__()
         
         # 初始化配置和调试工具
         self._config = Config()
         self._debug = DebugHelper()
         self._lang = Language()
+        self._bus = NotificationBus()
+        
+        # 连点状态经通知总线合并后在界面线程上发出信号
+        self._reported_clicking = False
+        self._bus.subscribe("engine_state", self._on_engine_state_notification)
         
         # 注册配置变更事件
         self._config.config_changed.connect(self._on_config_changed)
@@ -59,29 +138,109 @@ class MouseHandler(QObject):
         self._trigger_click_count = self._config.get("trigger_click_count", 5)
         self._trigger_click_interval = self._config.get("trigger_click_interval", 300) / 1000.0  # 转换为秒
         self._auto_click_interval = self._config.get("auto_click_interval", 500) / 1000.0  # 转换为秒
+        self._input_mode = self._config.get("input_source_mode", INPUT_MODE_BUTTONS)
         
         # 鼠标事件监听器
         self._listener = None
         self._controller = mouse.Controller()
         
+        # 线程调优结果，由各线程启动时填写
+        self._thread_tuning = {}
+        
+        # 连点引擎：触发检测和调度线程
+        self._recorder = FlightRecorder(self._config.get("flight_recorder_size", 4096))
+        scheduler = DeadlineScheduler(thread_init=self._tune_click_worker)
+        injector = ControllerInjector(self._controller)
+        self._engine = ClickEngine(injector, scheduler, self._recorder)
+        self._engine.on_started = self._on_engine_started
+        self._engine.on_stopped = self._on_engine_stopped
+        self._engine.on_click_injected = self._on_click_injected
+        self._program_specs = None
+        self._programs = {}                # 程序名称 -> 预编译的点击程序
+        self._profiles = {}                # 方案名称 -> 编译后的配置方案快照
+        self._profile = None               # 当前使用的方案快照
+        self._shadow = None                # 影子触发检测器，未配置候选参数时为None
+        self._shadow_key = None
+        self._adaptive = None              # 自适应触发检测器，未启用时为None
+        self._adaptive_profile = None      # 自适应检测器当前载入的是哪个配置方案学到的节奏
+        self._bus.subscribe("cadence_learned", self._on_cadence_learned)
+        self._hotkeys = ProfileHotkeys(self.switch_profile)
+        self._apply_engine_config()
+        
+        # 钩子回调看门狗
+        self._incidents = IncidentLog()
+        self._watchdog = HookWatchdog(self, scheduler)
+        self._apply_watchdog_config()
+        
+        # 滚轮连续滚动，与鼠标连点共用调度线程
+        self._scroll_enabled = self._config.get("scroll_enabled", False)
+        self._scroll = ScrollEngine(injector, scheduler)
+        self._scroll.on_started = lambda: print("[DEBUG] 滚轮连续滚动开始")
+        self._scroll.on_stopped = lambda count: print(f"[DEBUG] 滚轮连续滚动停止，注入{count}次")
+        self._apply_scroll_config()
+        
+        # 后台窗口连点，与鼠标连点共用调度线程，不使用全局光标
+        self._targets = TargetManager(scheduler)
+        self._targets.on_finished = lambda job: self._bus.post_event("target_finished", job)
+        
+        # 有界连点(恰好N次或恰好T毫秒)，与按住连点共用调度线程
+        self._bounded = None
+        self.last_bounded = None
+        
+        # 宏录制与回放，回放与鼠标连点共用调度线程
+        self._macro_recorder = None
+        self._macro = MacroPlayer(injector, scheduler)
+        self._macro.on_finished = lambda job: self._bus.post_event("macro_finished", job)
+        
+        # 键盘连发，与鼠标连点共用调度线程
+        self._keyboard = None
+        self._apply_keyboard_config()
+        
+        # 供外部程序读取的内存映射状态页
+        self._status_page = None
+        if self._config.get("status_page_enabled", False):
+            try:
+                self._status_page = StatusPage(self._config.get("status_page_path", "") or None)
+                print(f"[DEBUG] Status page: {self._status_page.path}")
+            except (OSError, ValueError) as e:
+                print(f"Error creating status page: {e}")
+        
+        # 使用统计，写入在统计线程上完成
+        self._stats = None
+        self._burst_started_at = 0.0
+        self._burst_app = None
+        if self._config.get("stats_enabled", True):
+            self._stats = StatsStore(
+                max_bytes=self._config.get("stats_max_bytes", 1024 * 1024),
+                keep_files=self._config.get("stats_keep_files", 3),
+            )
+            self._stats.start()
+        
+        # 按应用启用规则：前台窗口变化时计算一次，钩子线程只读取引擎的enabled标志
+        self._trigger_enabled = True
+        self._app_allowed = True
+        self._app_rules = AppRuleSet()
+        self._app_rules_key = None
+        self._foreground = None
+        self._apply_app_rules_config()
+        
+        # 按需启动的采样分析器
+        self._profiler = SamplingProfiler(self._config.get("profile_interval_ms", 5))
+        
         # 点击事件队列
         self._click_events = deque(maxlen=50)  # 增加队列大小
-        self._press_times = deque(maxlen=50)   # 增大时间记录队列容量
-        
-        # 状态标志
-        self._rapid_clicking = False       # 是否正在自动连点
-        self._stop_rapid_click = threading.Event()
-        self._rapid_click_thread = None
-        self._rapid_click_ready = False    # 标记是否已满足快速点击条件
-        self._button_held = False          # 标记左键是否正在被按住
-        self._last_press_time = 0          # 记录最后一次点击时间，用于判断是否超时
-        self._program_clicking = False     # 标记是否是程序在点击
-        self._button_state_lock = threading.Lock()  # 用于保护按钮状态
+        
+        # 事件时间戳换算与排队延迟统计
+        self._event_clock = EventTimeNormalizer()
+        self._queue_delay_last_ns = 0
+        self._queue_delay_avg_ns = 0.0     # 排队延迟的指数滑动平均
+        self._queue_delay_max_ns = 0
         
         # 初始化完成标志
         self._initialized = True
         
-        # 开始监听鼠标事件
+        # 启动调度线程并开始监听鼠标事件
+        self._engine.scheduler.start()
         self.start_listening()
         
         # 打印初始配置
@@ -90,8 +249,8 @@ class MouseHandler(QObject):
     def start_listening(self):
         """开始监听鼠标事件"""
         if self._listener is None or not self._listener.running:
-            self._listener = mouse.Listener(on_click=self._on_click)
-            self._listener.daemon = True
+            on_scroll = self._on_scroll if self._scroll_enabled else None
+            self._listener = create_listener(self._on_click, self._input_mode, self._tune_listener, on_scroll)
             self._listener.start()
     
     def stop_listening(self):
@@ -100,6 +259,35 @@ class MouseHandler(QObject):
             self._listener.stop()
             self._listener = None
     
+    def _tune_click_worker(self):
+        """在调度线程内设置CPU亲和性和优先级"""
+        report = tune_current_thread(
+            self._config.get("click_worker_cpus", []),
+            self._config.get("click_worker_priority", PRIORITY_NORMAL),
+        )
+        self._thread_tuning["click_worker"] = report
+        print(f"[DEBUG] 连点线程调度设置: {report}")
+    
+    def _tune_listener(self):
+        """在监听线程内设置CPU亲和性和优先级"""
+        report = tune_current_thread(
+            self._config.get("listener_cpus", []),
+            self._config.get("listener_priority", PRIORITY_NORMAL),
+        )
+        self._thread_tuning["listener"] = report
+        print(f"[DEBUG] 监听线程调度设置: {report}")
+    
+    def get_hook_wakeups(self):
+        """
+        获取钩子线程被唤醒的累计次数
+        
+        Returns:
+            int: 进入Python回调的底层事件数量
+        """
+        if self._listener is None:
+            return 0
+        return self._listener.hook_wakeups
+    
     def _on_click(self, x, y, button, pressed):
         """
         鼠标点击事件处理
@@ -109,187 +297,889 @@ class MouseHandler(QObject):
             button: 点击的按钮
             pressed: 是否按下(True为按下，False为释放)
         """
-        # 仅处理左键事件
-        if button != mouse.Button.left:
+        # 如果是程序生成的点击(宏回放或连点)，忽略；宏回放可能注入任意按键，连点引擎只注入左键
+        code = _MACRO_BUTTONS.get(button)
+        if code is not None and self._macro.consume_injected(code, pressed):
             return
-            
-        # 如果是程序生成的点击，忽略
-        if self._program_clicking:
+        if button == mouse.Button.left and self._engine.injected.consume(pressed):
             return
         
-        # 当前时间
-        current_time = time.time()
+        # 仅处理左键事件，录制宏时记录所有按键
+        recorder = self._macro_recorder
+        if button != mouse.Button.left and recorder is None:
+            return
+        
+        # 按下按键时结束连续滚动
+        if pressed and self._scroll.is_scrolling():
+            self._scroll.stop()
+        
+        # 事件发生时间：使用系统提供的时间戳换算到单调时钟，排队延迟单独统计
+        entry_time = monotonic_ns()
+        listener = self._listener
+        event_time = listener.event_time if listener is not None else None
+        current_time, queue_delay = self._event_clock.normalize(event_time, entry_time)
+        self._record_queue_delay(queue_delay)
+        
+        if recorder is not None:
+            if code is not None:
+                recorder.add(x, y, code, pressed, current_time)
+            if button != mouse.Button.left:
+                return
+        
+        # 回调耗时接近预算时跳过日志、提示和事件记录
+        verbose = not self._watchdog.shedding
         
         # 记录当前事件
-        event = MouseClickEvent(button, pressed, current_time)
-        self._click_events.append(event)
-        
-        # 使用锁保护按钮状态更新
-        with self._button_state_lock:
-            # 按下处理
-            if pressed:
-                # 如果超过了时间间隔，则重置计数
-                if self._last_press_time > 0 and (current_time - self._last_press_time) > self._trigger_click_interval:
-                    self._press_times.clear()
-                    self._rapid_click_ready = False
-                    print(f"[DEBUG] {self._lang.get('debug_click_timeout')}, 重置计数")
-                
-                self._button_held = True
-                self._last_press_time = current_time
-                self._press_times.append(current_time)
-                self._debug.log("debug_click_detected")
-                print(f"[DEBUG] {self._lang.get('debug_click_recorded')}: {len(self._press_times)}")
-                
-                # 检查是否满足快速点击条件 (大于等于阈值次数)
-                if self._check_rapid_click_conditions():
-                    self._rapid_click_ready = True
-                    print(f"[DEBUG] {self._lang.get('debug_rapid_mode_activated')}! (点击次数: {len(self._press_times)})")
-                    self._debug.log("debug_rapid_click_triggered")
-                    
-                    # 如果满足条件且按下左键，开始连点
-                    if not self._rapid_clicking:
-                        print(f"[DEBUG] 开始自动点击")
-                        self._start_rapid_clicking()
-            
-            # 鼠标释放处理
-            elif not pressed:
-                # 更新按钮状态
-                self._button_held = False
-                print(f"[DEBUG] 检测到鼠标释放")
-                
-                # 如果正在连点则停止
-                if self._rapid_clicking:
-                    print(f"[DEBUG] {self._lang.get('debug_release_detected')}")
-                    self._debug.log("debug_rapid_click_stopped")
-                    # 强制停止连点
-                    self._stop_rapid_click.set()
-                    self._rapid_clicking = False
-                    self._stop_rapid_clicking()
-    
-    def _check_rapid_click_conditions(self):
-        """
-        检查是否满足快速点击条件 - 点击次数是否达到或超过阈值
+        if verbose:
+            event = MouseClickEvent(button, pressed, current_time)
+            self._click_events.append(event)
+        
+        # 交给引擎做触发检测和连点控制
+        result = self._engine.on_button(pressed, current_time)
+        
+        # 影子检测器只记录，不影响引擎
+        shadow = self._shadow
+        if pressed and shadow is not None:
+            shadow.press(current_time, result == EVENT_TRIGGERED)
+        
+        if verbose:
+            self._log_button_result(result)
+        
+        self._watchdog.timer.record(monotonic_ns() - entry_time)
+        self._watchdog.arm()
+    
+    def _on_scroll(self, x, y, dx, dy):
+        """
+        鼠标滚轮事件处理，仅在启用连续滚动时注册
+        
+        Args:
+            x, y: 鼠标坐标
+            dx, dy: 滚动量(刻度)
+        """
+        # 忽略程序注入的滚动，注入的刻度可能在注入调用返回很久之后才到达
+        if self._scroll.consume_injected(dx, dy):
+            return
+        entry_time = monotonic_ns()
+        listener = self._listener
+        event_time = listener.event_time if listener is not None else None
+        current_time = self._event_clock.normalize(event_time, entry_time)[0]
+        self._scroll.on_scroll(dx, dy, current_time)
+    
+    def _log_button_result(self, result):
+        """
+        输出按键处理结果的调试信息
+        
+        Args:
+            result: 引擎返回的事件码
+        """
+        if result == EVENT_PRESS:
+            self._debug.log("debug_click_detected")
+            print(f"[DEBUG] {self._lang.get('debug_click_recorded')}: {self._engine.detector.size}")
+        elif result == EVENT_TRIGGERED:
+            self._debug.log("debug_click_detected")
+            print(f"[DEBUG] {self._lang.get('debug_rapid_mode_activated')}! (点击次数: {self._engine.detector.size}, {self._engine.detector.span_ns() / 1e9:.3f}秒)")
+            self._debug.log("debug_rapid_click_triggered")
+        elif result == EVENT_RELEASE:
+            print(f"[DEBUG] 检测到鼠标释放")
+        elif result == EVENT_STOPPED:
+            print(f"[DEBUG] {self._lang.get('debug_release_detected')}")
+            self._debug.log("debug_rapid_click_stopped")
+    
+    def _on_engine_started(self):
+        """引擎开始连点"""
+        # 只记录开始时间和跟踪线程缓存的前台应用名，钩子线程上不做系统调用；
+        # 没有启用前台跟踪时由统计线程查询
+        self._burst_started_at = time.time()
+        tracker = self._foreground
+        self._burst_app = tracker.process if tracker is not None else None
+        if self._status_page is not None:
+            self._status_page.burst_started()
+        
+        # 投递连点状态，由通知总线合并后发送信号
+        self._bus.post("engine_state", True)
+        if not self._watchdog.shedding:
+            print(f"[DEBUG] {self._lang.get('debug_auto_clicking_started')}!")
+    
+    def _on_engine_stopped(self, count, active_ns):
+        """
+        引擎停止连点
+        
+        Args:
+            count: 本次连点的点击次数
+            active_ns: 从首次点击到停止的时长(纳秒)
+        """
+        if self._stats is not None:
+            self._stats.record_burst(self._burst_started_at, active_ns, count, self._burst_app)
+        if self._status_page is not None:
+            self._status_page.burst_stopped()
+        
+        # 投递连点状态，由通知总线合并后发送信号
+        self._bus.post("engine_state", False)
+        if not self._watchdog.shedding:
+            print(f"[DEBUG] {self._lang.get('debug_auto_clicking_stopped')}!")
+    
+    def _on_engine_state_notification(self, clicking, count):
+        """
+        通知总线派发的连点状态，状态未变化时不发送信号
+        
+        Args:
+            clicking: 窗口内最新的连点状态
+            count: 窗口内合并的状态变化次数
+        """
+        if clicking == self._reported_clicking:
+            return
+        self._reported_clicking = clicking
+        if clicking:
+            self.rapid_click_started.emit()
+        else:
+            self.rapid_click_stopped.emit()
+    
+    def _on_click_injected(self, count, elapsed_ns):
+        """
+        调度线程每注入一次点击后调用
+        
+        Args:
+            count: 本次连点已注入的点击次数
+            elapsed_ns: 从首次点击到现在的耗时(纳秒)
+        """
+        if self._status_page is not None:
+            self._status_page.click_injected(count, elapsed_ns)
+        
+        # 每10次点击打印一次状态
+        if count % 10 == 0 and not self._watchdog.shedding:
+            avg_ms = elapsed_ns / (count - 1) / NS_PER_MS
+            print(f"[DEBUG] {self._lang.format('debug_clicks_performed', count=count, avg=f'{avg_ms:.1f}')}")
+    
+    def _apply_engine_config(self):
+        """将当前配置下发给引擎"""
+        # 点击程序只在定义变化时重新编译，切换程序只是查表
+        specs = self._config.get("click_programs", {})
+        if specs != self._program_specs:
+            self._program_specs = specs
+            self._programs = compile_programs(specs)
+        
+        # 配置方案在配置变化时全部重新编译，切换方案只是查表
+        self._profiles = compile_profiles(self._config, self._config.get("profiles", {}), self._programs)
+        self._apply_profile(self._profiles.get(self._config.get("active_profile", ""), self._profiles[""]))
+        self._hotkeys.apply(self._config.get("profile_hotkeys", {}))
+    
+    def _apply_shadow_config(self):
+        """候选参数或实际使用的触发参数变化时重建影子检测器，对比统计以实际检测器为基准"""
+        configs = self._config.get("shadow_detectors", [])
+        key = (tuple(tuple(config) for config in configs),
+               self._profile.trigger_count, self._profile.trigger_interval_ms)
+        if key == self._shadow_key:
+            return
+        self._shadow_key = key
+        self._shadow = ShadowDetectors(configs, self._profile.trigger_interval_ms) if configs else None
+    
+    def _apply_profile(self, snapshot):
+        """
+        把配置方案快照下发给引擎
+        
+        Args:
+            snapshot: ProfileSnapshot
+        """
+        self._profile = snapshot
+        self._trigger_click_count = snapshot.trigger_count
+        self._trigger_click_interval = snapshot.trigger_interval_ms / 1000.0
+        self._auto_click_interval = snapshot.click_interval_ms / 1000.0
+        self._engine.configure(
+            snapshot.trigger_count, snapshot.trigger_interval_ms, snapshot.click_interval_ms, snapshot.program)
+        self._apply_adaptive_config()
+        # 切换方案后影子检测器的对比基准随之改变
+        self._apply_shadow_config()
+    
+    def _apply_adaptive_config(self):
+        """按配置启用或停用自适应触发检测，切换配置方案时载入该方案学到的节奏"""
+        if not self._config.get("adaptive_trigger", False):
+            if self._adaptive is not None:
+                self._adaptive = None
+                self._adaptive_profile = None
+                self._engine.set_detector(TriggerDetector(1, 0))
+            return
+        
+        params = (
+            self._config.get("adaptive_min_count", 3),
+            self._config.get("adaptive_tolerance", 2.0),
+            self._config.get("adaptive_min_samples", 20),
+            self._config.get("adaptive_confirm_hold_ms", 150) * NS_PER_MS,
+        )
+        if self._adaptive is None:
+            detector = AdaptiveTriggerDetector(1, 0, *params)
+            self._engine.set_detector(detector)
+            self._adaptive = detector
+        else:
+            self._adaptive.tune(*params)
+        
+        name = self._profile.name
+        if name != self._adaptive_profile:
+            self._adaptive_profile = name
+            self._adaptive.load_model(self._config.get("adaptive_cadence", {}).get(name))
+            # 在钩子线程上调用，经通知总线合并后在界面线程上保存
+            self._adaptive.on_learned = lambda model: self._bus.post_event("cadence_learned", (name, model))
+    
+    def _on_cadence_learned(self, value, count):
+        """
+        保存学到的点击节奏，每个学习结果都按顺序保存，不同方案的结果不会互相覆盖
+        
+        Args:
+            value: (配置方案名称, 学习结果)
+            count: 通知数量，事件通知始终为1
+        """
+        name, model = value
+        cadence = dict(self._config.get("adaptive_cadence", {}))
+        cadence[name] = model
+        self._config.set("adaptive_cadence", cadence)
+        self._config.save_in_background()
+    
+    def switch_profile(self, name):
+        """
+        切换配置方案，可以在热键线程上调用
+        
+        只更新内存中的引擎参数，配置文件稍后在后台写入，不发送配置变更信号。
+        切换结果投递到通知总线的"profile_switched"主题。
+        
+        Args:
+            name: 方案名称，空字符串表示顶层配置
         
         Returns:
-            bool: 是否满足条件
+            bool: 切换成功返回True，方案不存在时返回False
         """
-        # 如果点击次数不足，直接返回False
-        if len(self._press_times) < self._trigger_click_count:
-            print(f"[DEBUG] 点击次数不足: {len(self._press_times)}/{self._trigger_click_count}")
+        snapshot = self._profiles.get(name)
+        if snapshot is None:
+            print(f"[DEBUG] 配置方案不存在: {name}")
             return False
+        self._apply_profile(snapshot)
+        self._config.set("active_profile", name)
+        self._config.save_in_background()
+        self._bus.post("profile_switched", name)
+        return True
+    
+    def start_target_at_cursor(self, program=None):
+        """
+        对光标下的窗口开始后台连点，点击位置固定为当前光标在该窗口中的坐标
         
-        # 获取所有点击的时间
-        click_times = list(self._press_times)
+        Args:
+            program: 预编译的点击程序，默认使用当前配置方案的程序
         
-        # 检查最近trigger_click_count次点击是否在时间窗口内
-        recent_clicks = click_times[-self._trigger_click_count:]
-        first_time = recent_clicks[0]
-        last_time = recent_clicks[-1]
-        time_window = last_time - first_time
+        Returns:
+            tuple: (目标编号, 窗口, x, y)，光标下没有窗口时返回None
+        """
+        found = target_under_cursor()
+        if found is None:
+            return None
+        window, x, y = found
+        target_id = self._targets.start(window, x, y, program or self._engine.program)
+        print(f"[DEBUG] 后台连点目标{target_id}: 窗口{window:#x} ({x}, {y})")
+        return target_id, window, x, y
+    
+    @property
+    def targets(self):
+        """后台窗口连点管理器"""
+        return self._targets
+    
+    def _macro_path(self):
+        """配置的宏文件路径"""
+        return self._config.get("macro_path", "") or default_macro_path()
+    
+    def start_macro_recording(self):
+        """
+        开始录制宏，之后的鼠标按键事件(左、右、中键)连同位置和时间一起记录
         
-        # 判断是否在触发时间窗口内
-        result = time_window <= self._trigger_click_interval
+        Returns:
+            bool: 已经在录制时返回False
+        """
+        if self._macro_recorder is not None:
+            return False
+        self._macro_recorder = MacroRecorder(monotonic_ns())
+        print("[DEBUG] 开始录制宏")
+        return True
+    
+    def stop_macro_recording(self, trim_ns=None):
+        """
+        停止录制并保存宏文件
         
-        if result:
-            print(f"[DEBUG] 满足快速点击条件: {self._trigger_click_count}次点击在{time_window:.3f}秒内 (阈值: {self._trigger_click_interval:.3f}秒)")
-        else:
-            print(f"[DEBUG] 不满足时间条件: {self._trigger_click_count}次点击在{time_window:.3f}秒内 (阈值: {self._trigger_click_interval:.3f}秒)")
+        Args:
+            trim_ns: 丢弃该时间之前最后一次按下及之后的事件，用于去掉打开托盘菜单的点击
+        
+        Returns:
+            tuple: (文件路径, 事件数量, 录制时长纳秒)，没有在录制时返回None
+        
+        Raises:
+            OSError: 文件写入失败
+        """
+        recorder = self._macro_recorder
+        if recorder is None:
+            return None
+        self._macro_recorder = None
+        stop_ns = monotonic_ns()
+        if trim_ns is not None:
+            recorder.trim_before(trim_ns)
+            stop_ns = trim_ns
+        path = self._macro_path()
+        count, duration_ns = recorder.save(path, stop_ns)
+        print(f"[DEBUG] 宏已保存: {path} ({count}个事件, {duration_ns / NS_PER_MS:.0f}ms)")
+        return path, count, duration_ns
+    
+    def macro_recording_size(self):
+        """
+        获取正在录制的事件数量
         
-        return result
+        Returns:
+            int: 事件数量，没有在录制时返回None
+        """
+        recorder = self._macro_recorder
+        return len(recorder) if recorder is not None else None
     
-    def _start_rapid_clicking(self):
-        """开始自动连点"""
-        if self._rapid_clicking:
+    def play_macro(self, speed=None, loops=None, path=None):
+        """
+        开始回放宏，结束后向通知总线投递"macro_finished"
+        
+        Args:
+            speed: 速度倍数，默认使用配置
+            loops: 回放次数，0表示直到停止，默认使用配置
+            path: 宏文件路径，默认使用配置
+        
+        Returns:
+            MacroPlayJob: 回放任务，宏为空时返回None
+        
+        Raises:
+            OSError, ValueError: 宏文件无法读取或参数无效
+            RuntimeError: 正在录制宏
+        """
+        if self._macro_recorder is not None:
+            raise RuntimeError("a macro is being recorded")
+        if speed is None:
+            speed = self._config.get("macro_speed", 1.0)
+        if loops is None:
+            loops = self._config.get("macro_loops", 1)
+        return self._macro.play(path or self._macro_path(), float(speed), loops)
+    
+    @property
+    def macro(self):
+        """宏回放管理"""
+        return self._macro
+    
+    def get_profile_names(self):
+        """
+        获取配置方案名称，不含默认方案
+        
+        Returns:
+            list: 方案名称
+        """
+        return sorted(name for name in self._profiles if name)
+    
+    @property
+    def active_profile(self):
+        """当前配置方案的名称，空字符串表示顶层配置"""
+        return self._profile.name
+    
+    def set_trigger_enabled(self, enabled):
+        """
+        启用或暂停连点触发，校准时暂停以免用户的快速点击触发连点
+        
+        Args:
+            enabled: 是否允许触发
+        """
+        self._trigger_enabled = enabled
+        self._update_armed()
+    
+    def _update_armed(self):
+        """根据暂停状态和应用规则更新引擎是否允许触发"""
+        armed = self._trigger_enabled and self._app_allowed
+        if armed == self._engine.enabled:
             return
-            
-        self._rapid_clicking = True
-        self._stop_rapid_click.clear()
-        
-        # 创建并启动连点线程
-        self._rapid_click_thread = threading.Thread(target=self._rapid_click_worker)
-        self._rapid_click_thread.daemon = True
-        self._rapid_click_thread.start()
-        
-        # 发送开始连点信号
-        self.rapid_click_started.emit()
-        print(f"[DEBUG] {self._lang.get('debug_auto_clicking_started')}!")
-    
-    def _stop_rapid_clicking(self):
-        """停止自动连点"""
-        if not self._rapid_clicking:
+        self._engine.enabled = armed
+        self._scroll.enabled = armed
+        if self._keyboard is not None:
+            self._keyboard.set_enabled(armed)
+        if self._status_page is not None:
+            self._status_page.set_armed(armed)
+        self._bus.post("armed", armed)
+    
+    def _apply_app_rules_config(self):
+        """规则变化时重新编译，并按需启动或停止前台窗口跟踪"""
+        mode = self._config.get("app_rules_mode", RULES_OFF)
+        rules = self._config.get("app_rules", [])
+        key = (mode, tuple(rules))
+        if key == self._app_rules_key:
             return
-            
-        self._rapid_clicking = False
-        self._stop_rapid_click.set()
-        
-        # 确保程序点击标记被取消
-        self._program_clicking = False
-        
-        if self._rapid_click_thread and self._rapid_click_thread.is_alive():
-            self._rapid_click_thread.join(0.5)  # 等待线程结束，但最多等待0.5秒
-        
-        self._rapid_click_thread = None
-        
-        # 发送停止连点信号
-        self.rapid_click_stopped.emit()
-        print(f"[DEBUG] {self._lang.get('debug_auto_clicking_stopped')}!")
-    
-    def _rapid_click_worker(self):
-        """自动连点工作线程"""
-        count = 0
-        start_time = time.time()
-        
-        while self._rapid_clicking and not self._stop_rapid_click.is_set():
-            # 检查用户是否仍然按住按钮
-            with self._button_state_lock:
-                if not self._button_held:
-                    print("[DEBUG] 用户已释放按钮，停止自动点击")
-                    self._stop_rapid_clicking()
-                    break  # 使用break而不是return确保最后的清理代码执行
-            
+        self._app_rules_key = key
+        self._app_rules = AppRuleSet(mode, rules)
+        
+        if self._app_rules.active:
+            if self._foreground is None:
+                self._foreground = ForegroundTracker(self._on_foreground_changed)
+                if not self._foreground.start():
+                    self._foreground = None
+            if self._foreground is not None:
+                # 用缓存的前台窗口身份重新计算，不重新查询
+                self._on_foreground_changed(self._foreground.process, self._foreground.window_class)
+        else:
+            if self._foreground is not None:
+                self._foreground.stop()
+                self._foreground = None
+            self._app_allowed = True
+            self._update_armed()
+    
+    def _on_foreground_changed(self, process, window_class):
+        """
+        前台窗口变化，在跟踪线程上调用
+        
+        Args:
+            process: 进程名
+            window_class: 窗口类名
+        """
+        allowed = self._app_rules.allows(process, window_class)
+        if allowed == self._app_allowed:
+            return
+        self._app_allowed = allowed
+        self._update_armed()
+        print(f"[DEBUG] 前台窗口 {process or '?'} ({window_class or '?'}): {'允许' if allowed else '禁止'}连点")
+        # 切换到禁止的窗口时结束正在进行的连点
+        if not allowed:
+            if self._engine.is_clicking():
+                self._engine.stop()
+            self._scroll.stop()
+            if self._keyboard is not None:
+                self._keyboard.stop_all()
+    
+    def _apply_scroll_config(self):
+        """将滚轮连续滚动的配置下发给引擎"""
+        self._scroll.configure(
+            self._config.get("scroll_trigger_count", 4),
+            self._config.get("scroll_trigger_interval", 250),
+            self._config.get("scroll_repeat_interval", 30),
+            self._config.get("scroll_notches_per_tick", 3),
+            self._config.get("scroll_sustain_ms", 400),
+        )
+    
+    def _apply_keyboard_config(self):
+        """按配置启动、更新或停止键盘连发"""
+        if not self._config.get("keyboard_enabled", False):
+            if self._keyboard is not None:
+                self._keyboard.stop()
+                self._keyboard = None
+            return
+        
+        if self._keyboard is None:
+            self._keyboard = KeyboardHandler(self._engine.scheduler)
+            self._keyboard.set_enabled(self._engine.enabled)
+            self._keyboard.on_started = lambda name: print(f"[DEBUG] 键盘连发开始: {name}")
+            self._keyboard.on_stopped = lambda name: print(f"[DEBUG] 键盘连发停止: {name}")
+        self._keyboard.configure(
+            self._config.get("keyboard_keys", []),
+            self._config.get("keyboard_trigger_count", 3),
+            self._config.get("keyboard_trigger_interval", 300),
+            self._config.get("keyboard_repeat_interval", 50),
+        )
+        self._keyboard.start()
+    
+    def run_test_burst(self, interval_ms, clicks, on_done=None):
+        """
+        在连点调度线程上运行一次不注入点击的测试连点，进度投递到通知总线的"test_burst"主题
+        
+        Args:
+            interval_ms: 请求的点击间隔(毫秒)
+            clicks: 点击次数
+            on_done: 结束后在调度线程上调用，参数为任务
+        
+        Returns:
+            ProbeBurstJob: 任务，times属性记录每次执行的时间
+        """
+        return self._engine.run_probe(
+            interval_ms, clicks, lambda count: self._bus.post("test_burst", count), on_done)
+    
+    def cancel_test_burst(self, job):
+        """
+        取消测试连点
+        
+        Args:
+            job: run_test_burst返回的任务
+        """
+        self._engine.scheduler.cancel(job)
+    
+    def run_bounded_burst(self, clicks=0, duration_ms=0, interval_ms=None, on_done=None):
+        """
+        在当前光标位置运行一次有界连点，正在进行的有界连点先取消；结束后向通知总线投递"bounded_finished"
+        
+        Args:
+            clicks: 点击次数，0表示不限
+            duration_ms: 时长(毫秒)，0表示不限
+            interval_ms: 点击间隔(毫秒)，默认使用当前配置方案的点击程序
+            on_done: 结束后在调度线程或取消线程上调用，参数为任务
+        
+        Returns:
+            BoundedBurstJob: 任务，report()给出实际次数、时长和计时误差
+        
+        Raises:
+            ValueError: 次数和时长都未指定
+        """
+        self.cancel_bounded_burst()
+        program = fixed_program(interval_ms) if interval_ms else None
+        
+        def finished(job):
+            if self._bounded is job:
+                self._bounded = None
+            print(f"[DEBUG] 有界连点结束: {job.report()}")
+            self._bus.post_event("bounded_finished", job)
+            if on_done:
+                on_done(job)
+        
+        job = self._engine.run_bounded(clicks, duration_ms, program, finished)
+        self._bounded = job
+        self.last_bounded = job
+        # 很短的连点可能在赋值之前就已经在调度线程上结束
+        if job.finished and self._bounded is job:
+            self._bounded = None
+        return job
+    
+    def cancel_bounded_burst(self):
+        """
+        取消正在进行的有界连点
+        
+        Returns:
+            bool: 有正在进行的有界连点时返回True
+        """
+        job = self._bounded
+        if job is None:
+            return False
+        self._engine.scheduler.cancel(job)
+        return True
+    
+    def is_bounded_running(self):
+        """是否正在进行有界连点"""
+        return self._bounded is not None
+    
+    def get_program_names(self):
+        """
+        获取已编译的点击程序名称
+        
+        Returns:
+            list: 程序名称
+        """
+        return sorted(self._programs)
+    
+    def select_program(self, name):
+        """
+        切换点击程序并保存到配置，正在进行的连点在下一次点击时切换
+        
+        Args:
+            name: 程序名称，空字符串表示按固定间隔连点
+        
+        Returns:
+            bool: 切换成功返回True，程序不存在时返回False
+        """
+        if name and name not in self._programs:
+            return False
+        # 先切换引擎，再保存到当前配置方案
+        self._engine.set_program(self._programs[name] if name else fixed_program(self._auto_click_interval * 1000))
+        profiles = self._config.get("profiles", {})
+        if self._profile.name in profiles:
+            # 复制后再修改，不改动配置中(可能与默认配置共享)的原字典
+            profiles = dict(profiles)
+            profiles[self._profile.name] = dict(profiles[self._profile.name], click_program=name)
+            self._config.set("profiles", profiles)
+        else:
+            self._config.set("click_program", name)
+        # 与切换配置方案一样只在后台写入文件，不在调用线程上发送配置变更信号或更新自启动
+        self._config.save_in_background()
+        return True
+    
+    def _apply_watchdog_config(self):
+        """将当前配置下发给看门狗"""
+        self._watchdog.configure(
+            self._config.get("hook_budget_ms", 10),
+            self._config.get("watchdog_interval_ms", 1000),
+            self._config.get("hook_shed_ratio", 0.5),
+        )
+    
+    def get_listener(self):
+        """获取当前监听器"""
+        return self._listener
+    
+    def get_injected_clicks(self):
+        """获取累计注入的点击次数"""
+        return self._engine.injected_clicks
+    
+    def restart_listener(self, reason):
+        """
+        重启监听器
+        
+        Args:
+            reason: 重启原因
+        """
+        print(f"[DEBUG] 重启鼠标监听器: {reason}")
+        self._recorder.record(FR_LISTENER_RESTART, monotonic_ns())
+        listener = self._listener
+        self._listener = None
+        if listener is not None:
             try:
-                # 标记为程序点击
-                self._program_clicking = True
-                
-                # 模拟鼠标点击
-                self._controller.click(mouse.Button.left)
-                count += 1
-                
-                # 每10次点击打印一次状态
-                if count % 10 == 0:
-                    elapsed = time.time() - start_time
-                    avg_ms = elapsed / count * 1000
-                    debug_msg = self._lang.get('debug_clicks_performed')
-                    print(f"[DEBUG] {debug_msg.replace('{count}', str(count)).replace('{avg}', f'{avg_ms:.1f}')}")
-                
-                # 取消程序点击标记
-                self._program_clicking = False
-                
-                # 等待指定间隔
-                time.sleep(self._auto_click_interval)
-                
-                # 再次检查按钮状态
-                with self._button_state_lock:
-                    if not self._button_held:
-                        print("[DEBUG] 用户已释放按钮，停止自动点击")
-                        self._stop_rapid_clicking()
-                        break  # 使用break而不是return确保最后的清理代码执行
+                listener.stop()
             except Exception as e:
-                print(f"Error during rapid clicking: {e}")
-                self._program_clicking = False
+                print(f"Error stopping listener: {e}")
+        self.start_listening()
+    
+    def report_incident(self, kind, detail):
+        """
+        记录看门狗事件并通知界面
+        
+        Args:
+            kind: 事件类型
+            detail: 描述
+        """
+        self._incidents.add(kind, detail)
+        print(f"[DEBUG] 看门狗事件 {kind}: {detail}")
+        self.engine_incident.emit(kind, detail)
+    
+    def check_listener(self):
+        """立即检查监听器是否存活，空闲时看门狗不运行，由界面在合适的时机调用"""
+        listener = self._listener
+        if listener is None or not listener.is_alive():
+            self.report_incident("listener_dead", "hook listener thread is not running")
+            self.restart_listener("listener_dead")
+    
+    @property
+    def recorder(self):
+        """引擎的飞行记录器"""
+        return self._recorder
+    
+    def dump_flight_recorder(self, path=None, reason="manual"):
+        """
+        导出飞行记录器内容
+        
+        Args:
+            path: 文件路径，默认写入用户目录
+            reason: 导出原因
+        
+        Returns:
+            str: 写入的文件路径，失败时返回None
+        """
+        return self._recorder.dump(path, reason)
+    
+    def start_profile(self, duration_s=None, path=None):
+        """
+        对钩子线程、调度线程和界面线程进行一次采样分析，结束后向通知总线投递"profile_finished"
+        
+        Args:
+            duration_s: 采样时长(秒)，默认使用配置
+            path: 折叠栈文件路径，默认写入用户目录
         
-        # 确保程序点击标记被取消
-        self._program_clicking = False
+        Returns:
+            str: 将要写入的文件路径，已有分析在进行时返回None
+        """
+        if duration_s is None:
+            duration_s = self._config.get("profile_duration_s", 10)
+        return self._profiler.start(
+            duration_s, path, lambda result: self._bus.post_event("profile_finished", result))
+    
+    def is_profiling(self):
+        """
+        检查是否正在采样分析
+        
+        Returns:
+            bool: 正在分析返回True
+        """
+        return self._profiler.is_running()
+    
+    def register_control_commands(self, server):
+        """
+        向控制服务器注册引擎命令
+        
+        Args:
+            server: ControlServer实例
+        """
+        server.register("profile", self._control_profile, "profile [seconds] - sample threads and write a collapsed-stack file")
+        server.register("dump", lambda args: self.dump_flight_recorder(reason="control"), "write the flight recorder to disk")
+        server.register("metrics", lambda args: repr(self.get_metrics()), "print engine metrics")
+        server.register("status", lambda args: "clicking" if self.get_status() else "idle", "print click state")
+        server.register("profiles", self._control_profiles, "profiles [name] - show or switch the settings profile")
+        server.register("program", self._control_program, "program [name] - show or switch the click program")
+        server.register("target", self._control_target, "target [start|stop <id|all>] - background-click the window under the cursor")
+        server.register("burst", self._control_burst, "burst [clicks <n>|ms <t>|stop] [interval_ms] [wait] - run exactly n clicks or click for exactly t ms")
+        server.register("macro", self._control_macro, "macro [record|stop|play [speed] [loops] [name]|timing <name>] - record or replay mouse button macros (names are files in the macro directory)")
+        server.register("foreground", self._control_foreground, "print the tracked foreground window and whether clicking is allowed there")
+    
+    def _control_profile(self, args):
+        """控制命令：开始采样分析"""
+        duration_s = float(args[0]) if args else None
+        path = self.start_profile(duration_s)
+        if path is None:
+            raise RuntimeError("a profile is already running")
+        return path
+    
+    def _control_program(self, args):
+        """控制命令：查看或切换点击程序"""
+        if args:
+            name = args[0] if args[0] != "fixed" else ""
+            if not self.select_program(name):
+                raise ValueError(f"unknown program {args[0]}")
+        current = self._engine.program.name
+        return f"{current} (available: fixed {' '.join(self.get_program_names())})"
+    
+    def _control_profiles(self, args):
+        """控制命令：查看或切换配置方案"""
+        if args:
+            name = args[0] if args[0] != "default" else ""
+            if not self.switch_profile(name):
+                raise ValueError(f"unknown profile {args[0]}")
+        return f"{self.active_profile or 'default'} (available: default {' '.join(self.get_profile_names())})"
+    
+    def _control_target(self, args):
+        """控制命令：查看、开始或停止后台窗口连点"""
+        if args and args[0] == "start":
+            started = self.start_target_at_cursor()
+            if started is None:
+                raise RuntimeError("no window under the cursor")
+        elif args and args[0] == "stop":
+            if len(args) < 2 or args[1] == "all":
+                self._targets.stop_all()
+            elif not self._targets.stop(int(args[1])):
+                raise ValueError(f"unknown target {args[1]}")
+        elif args:
+            raise ValueError(f"unknown subcommand {args[0]}")
+        targets = self._targets.snapshot()
+        if not targets:
+            return "no targets"
+        return "; ".join(f"{target_id}: window {window:#x} ({x}, {y}) clicks {count}"
+                         for target_id, window, x, y, count in targets)
+    
+    def _control_burst(self, args):
+        """控制命令：运行或取消有界连点，wait时等待结束后返回结果"""
+        if not args:
+            job = self._bounded or self.last_bounded
+            if job is None:
+                return "no bounded burst has been run"
+            return ("running " if job is self._bounded else "") + repr(job.report())
+        if args[0] == "stop":
+            if not self.cancel_bounded_burst():
+                raise RuntimeError("no bounded burst is running")
+            return "cancelled"
+        if args[0] not in ("clicks", "ms") or len(args) < 2:
+            raise ValueError("usage: burst clicks <n>|ms <t> [interval_ms] [wait]")
+        wait = args[-1] == "wait"
+        rest = args[2:-1] if wait else args[2:]
+        interval_ms = float(rest[0]) if rest else None
+        clicks = int(args[1]) if args[0] == "clicks" else 0
+        duration_ms = float(args[1]) if args[0] == "ms" else 0
+        if wait:
+            # 回复必须在客户端超时之前到达，能预先算出时长的连点直接拒绝
+            expected_ms = duration_ms or (clicks * interval_ms if interval_ms else 0)
+            if expected_ms > MAX_COMMAND_WAIT_S * 1000:
+                raise ValueError(f"wait is limited to {MAX_COMMAND_WAIT_S:.0f} s, run without wait and poll 'burst'")
+        done = threading.Event()
+        job = self.run_bounded_burst(clicks, duration_ms, interval_ms, lambda job: done.set())
+        if not wait:
+            return "started"
+        if not done.wait(MAX_COMMAND_WAIT_S):
+            self._engine.scheduler.cancel(job)
+            raise RuntimeError(f"the burst did not finish within {MAX_COMMAND_WAIT_S:.0f} s and was cancelled")
+        return repr(job.report())
+    
+    def _control_macro(self, args):
+        """控制命令：录制、回放宏或查看回放计时误差"""
+        command = args[0] if args else ""
+        if command == "record":
+            if not self.start_macro_recording():
+                raise RuntimeError("already recording")
+            return "recording"
+        if command == "stop":
+            saved = self.stop_macro_recording()
+            if saved is not None:
+                return f"saved {saved[1]} events ({saved[2] / NS_PER_MS:.0f} ms) to {saved[0]}"
+            self._macro.stop()
+            return "stopped"
+        if command == "play":
+            speed = float(args[1]) if len(args) > 1 else None
+            loops = int(args[2]) if len(args) > 2 else None
+            # 控制接口只接受宏目录中的文件名，不能读取任意路径
+            path = macro_dir_path(args[3]) if len(args) > 3 else None
+            if self.play_macro(speed, loops, path) is None:
+                raise ValueError("the macro is empty")
+            return "playing"
+        if command == "timing":
+            job = self._macro.last_job
+            if job is None:
+                raise RuntimeError("no macro has been played")
+            if len(args) > 1:
+                job.write_timing(macro_dir_path(args[1]))
+            return repr(job.timing())
+        if command:
+            raise ValueError(f"unknown subcommand {command}")
+        if self._macro_recorder is not None:
+            return f"recording ({len(self._macro_recorder)} events)"
+        return "playing" if self._macro.is_playing() else "idle"
+    
+    def _control_foreground(self, args):
+        """控制命令：查看跟踪到的前台窗口，便于编写规则"""
+        tracker = self._foreground
+        if tracker is None:
+            return "app rules off"
+        allowed = "allowed" if self._app_allowed else "blocked"
+        return f"process:{tracker.process or '?'} class:{tracker.window_class or '?'} {allowed}"
     
     def _on_config_changed(self):
         """配置变更处理"""
-        # 更新配置参数
-        self._trigger_click_count = self._config.get("trigger_click_count", 5)
-        self._trigger_click_interval = self._config.get("trigger_click_interval", 300) / 1000.0
-        self._auto_click_interval = self._config.get("auto_click_interval", 500) / 1000.0
+        # 更新配置参数(由当前配置方案决定)
+        self._apply_engine_config()
+        self._apply_watchdog_config()
+        self._apply_keyboard_config()
+        self._apply_app_rules_config()
+        
+        self._apply_scroll_config()
+        
+        # 输入源模式或滚轮开关变化时重建监听器
+        input_mode = self._config.get("input_source_mode", INPUT_MODE_BUTTONS)
+        scroll_enabled = self._config.get("scroll_enabled", False)
+        if input_mode != self._input_mode or scroll_enabled != self._scroll_enabled:
+            self._input_mode = input_mode
+            self._scroll_enabled = scroll_enabled
+            if not scroll_enabled:
+                self._scroll.stop()
+            self.stop_listening()
+            self.start_listening()
         
         print(f"[DEBUG] {self._lang.get('debug_config_updated')}: {self._trigger_click_count}, {self._trigger_click_interval*1000}ms, {self._auto_click_interval*1000}ms")
     
+    def _record_queue_delay(self, delay_ns):
+        """
+        记录一次从事件发生到回调执行之间的排队延迟
+        
+        Args:
+            delay_ns: 排队延迟(纳秒)
+        """
+        self._queue_delay_last_ns = delay_ns
+        self._queue_delay_avg_ns += (delay_ns - self._queue_delay_avg_ns) * 0.1
+        if delay_ns > self._queue_delay_max_ns:
+            self._queue_delay_max_ns = delay_ns
+    
+    def get_metrics(self):
+        """
+        获取引擎运行指标快照
+        
+        Returns:
+            dict: 指标名称到数值的映射，时间单位为毫秒
+        """
+        return {
+            "hook_wakeups": self.get_hook_wakeups(),
+            "queue_delay_last_ms": self._queue_delay_last_ns / NS_PER_MS,
+            "queue_delay_avg_ms": self._queue_delay_avg_ns / NS_PER_MS,
+            "queue_delay_max_ms": self._queue_delay_max_ns / NS_PER_MS,
+            "thread_tuning": dict(self._thread_tuning),
+            "hook_callback_p99_ms": self._watchdog.timer.percentile(99) / NS_PER_MS,
+            "hook_callback_budget_ms": self._watchdog.budget_ns / NS_PER_MS,
+            "shedding": self._watchdog.shedding,
+            "incidents": self._incidents.snapshot(),
+            "shadow_detectors": self._shadow.snapshot() if self._shadow is not None else [],
+            "adaptive_detector": self._adaptive.snapshot() if self._adaptive is not None else {},
+        }
+    
+    @property
+    def stats(self):
+        """使用统计存储，未启用时为None"""
+        return self._stats
+    
     def get_status(self):
         """
         获取当前状态
@@ -297,9 +1187,24 @@ class MouseHandler(QObject):
         Returns:
             bool: 是否正在自动连点
         """
-        return self._rapid_clicking
+        return self._engine.is_clicking()
     
     def __del__(self):
         """析构函数，确保资源正确释放"""
-        self._stop_rapid_clicking()
-        self.stop_listening() 
\ No newline at end of file
+        self._watchdog.disarm()
+        self._engine.stop()
+        self._scroll.stop()
+        self._targets.stop_all()
+        self.cancel_bounded_burst()
+        self._macro.stop()
+        self._engine.scheduler.stop()
+        self.stop_listening()
+        if self._foreground is not None:
+            self._foreground.stop()
+        self._hotkeys.stop()
+        if self._keyboard is not None:
+            self._keyboard.stop()
+        if self._stats is not None:
+            self._stats.stop()
+        if self._status_page is not None:
+            self._status_page.close()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+连点配置方案模块
+
+配置方案定义在配置项profiles中，每个方案可以覆盖以下参数，未覆盖的参数使用顶层配置:
+    trigger_click_count、trigger_click_interval、auto_click_interval、click_program
+
+例如(方案引用的点击程序需在click_programs中定义，格式见core/click_program.py):
+    "click_programs": {
+        "humanized": {
+            "steps": [{"type": "random", "dist": "lognormal", "clicks": 256, "mean_ms": 90, "spread_ms": 25}],
+            "hold_ms": 35,
+            "seed": 1
+        }
+    },
+    "profiles": {
+        "fast": {"trigger_click_count": 3, "auto_click_interval": 40},
+        "careful": {"trigger_click_count": 6, "click_program": "humanized"}
+    }
+
+名称为空字符串的方案始终存在，即顶层配置本身。加载配置时把每个方案编译为引擎可以
+直接使用的快照，切换方案只是查表并更新引擎参数，不读写磁盘。
+"""
+
+from pynput import keyboard
+
+from core.click_program import fixed_program
+
+
+# 方案可以覆盖的配置项
+PROFILE_KEYS = ("trigger_click_count", "trigger_click_interval", "auto_click_interval", "click_program")
+
+
+class ProfileSnapshot:
+    """编译后的配置方案，字段与ClickEngine.configure的参数一一对应"""
+    
+    __slots__ = ("name", "trigger_count", "trigger_interval_ms", "click_interval_ms", "program")
+    
+    def __init__(self, name, trigger_count, trigger_interval_ms, click_interval_ms, program):
+        self.name = name
+        self.trigger_count = trigger_count
+        self.trigger_interval_ms = trigger_interval_ms
+        self.click_interval_ms = click_interval_ms
+        self.program = program
+
+
+def _compile_profile(name, values, programs):
+    """
+    编译单个配置方案
+    
+    Args:
+        name: 方案名称
+        values: 合并顶层配置后的参数
+        programs: 程序名称 -> 预编译的点击程序
+    
+    Returns:
+        ProfileSnapshot: 方案快照
+    """
+    click_interval_ms = values["auto_click_interval"]
+    program_name = values.get("click_program", "")
+    program = programs.get(program_name) if program_name else None
+    if program_name and program is None:
+        print(f"Error in profile {name or 'default'}: unknown click program {program_name}")
+    if program is None:
+        program = fixed_program(click_interval_ms)
+    return ProfileSnapshot(
+        name, values["trigger_click_count"], values["trigger_click_interval"], click_interval_ms, program)
+
+
+def compile_profiles(base, specs, programs):
+    """
+    编译全部配置方案
+    
+    Args:
+        base: 顶层配置(dict或Config)，提供PROFILE_KEYS中各项的默认值
+        specs: 方案名称 -> 覆盖的参数
+        programs: 程序名称 -> 预编译的点击程序
+    
+    Returns:
+        dict: 方案名称 -> ProfileSnapshot，包含名称为空字符串的默认方案
+    """
+    defaults = {
+        "trigger_click_count": base.get("trigger_click_count", 5),
+        "trigger_click_interval": base.get("trigger_click_interval", 300),
+        "auto_click_interval": base.get("auto_click_interval", 500),
+        "click_program": base.get("click_program", ""),
+    }
+    snapshots = {"": _compile_profile("", defaults, programs)}
+    for name, spec in (specs or {}).items():
+        if not name:
+            continue
+        values = dict(defaults)
+        values.update((key, spec[key]) for key in PROFILE_KEYS if key in spec)
+        snapshots[name] = _compile_profile(name, values, programs)
+    return snapshots
+
+
+class ProfileHotkeys:
+    """全局热键监听，热键在pynput的键盘监听线程上回调"""
+    
+    def __init__(self, on_hotkey):
+        """
+        初始化热键监听
+        
+        Args:
+            on_hotkey: 热键按下时调用，参数为绑定的方案名称
+        """
+        self._on_hotkey = on_hotkey
+        self._bindings = None
+        self._listener = None
+    
+    def apply(self, bindings):
+        """
+        更新热键绑定，绑定未变化时不重启监听线程
+        
+        Args:
+            bindings: 热键(pynput格式，如"<ctrl>+<alt>+1") -> 方案名称
+        """
+        bindings = dict(bindings or {})
+        if bindings == self._bindings:
+            return
+        self.stop()
+        self._bindings = bindings
+        if not bindings:
+            return
+        
+        handlers = {hotkey: (lambda name=name: self._on_hotkey(name)) for hotkey, name in bindings.items()}
+        try:
+            self._listener = keyboard.GlobalHotKeys(handlers)
+        except ValueError as e:
+            print(f"Error parsing profile hotkeys: {e}")
+            return
+        self._listener.start()
+    
+    def stop(self):
+        """停止监听线程"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        self._bindings = None
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+截止时间调度器模块，所有自动点击都由同一个调度线程按截止时间执行
+"""
+
+import heapq
+import itertools
+import threading
+
+from core.clock import MonotonicClock
+
+
+class ScheduledJob:
+    """调度任务基类"""
+    
+    def __init__(self):
+        self.deadline_ns = 0        # 下一次执行的截止时间
+        self.cancelled = False      # 是否已取消
+        self.finished = False       # 是否已结束(完成或取消)
+    
+    def fire(self, now_ns):
+        """
+        执行一次任务
+        
+        Args:
+            now_ns: 当前时间(纳秒)
+        
+        Returns:
+            int: 下一次执行的截止时间，返回None表示任务结束
+        """
+        return None
+    
+    def on_finished(self):
+        """任务离开调度器时调用(完成或取消)，在调用cancel或执行任务的线程上运行"""
+        pass
+
+
+class DeadlineScheduler:
+    """
+    单线程截止时间调度器
+    
+    任务按截止时间保存在最小堆中，调度线程空闲时在条件变量上无限期阻塞，
+    不会周期性唤醒。执行任务时不持有调度器锁，钩子线程提交或取消任务不会被点击注入阻塞。
+    """
+    
+    def __init__(self, clock=None, name="RapidClickScheduler", thread_init=None):
+        """
+        初始化调度器
+        
+        Args:
+            clock: 时钟对象，默认使用MonotonicClock；模拟时传入VirtualClock
+            name: 调度线程名称
+            thread_init: 调度线程启动后首先调用的函数，用于设置亲和性和优先级
+        """
+        self._clock = clock or MonotonicClock()
+        self._name = name
+        self._thread_init = thread_init
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+    
+    @property
+    def clock(self):
+        """调度器使用的时钟"""
+        return self._clock
+    
+    def start(self):
+        """启动调度线程"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._worker, name=self._name)
+        self._thread.daemon = True
+        self._thread.start()
+    
+    def stop(self):
+        """停止调度线程，未执行的任务全部取消"""
+        with self._cond:
+            self._running = False
+            pending = [entry[2] for entry in self._heap]
+            self._heap = []
+            self._cond.notify()
+        for job in pending:
+            self.cancel(job)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(0.5)
+        self._thread = None
+    
+    def submit(self, job, deadline_ns=None):
+        """
+        提交任务，每个任务对象只能提交一次
+        
+        Args:
+            job: ScheduledJob实例
+            deadline_ns: 首次执行时间，默认立即执行
+        """
+        if deadline_ns is None:
+            deadline_ns = self._clock.now_ns()
+        with self._cond:
+            job.deadline_ns = deadline_ns
+            heapq.heappush(self._heap, (deadline_ns, next(self._seq), job))
+            # 只有新任务成为最早的任务时才需要唤醒调度线程
+            if self._heap[0][2] is job:
+                self._cond.notify()
+    
+    def cancel(self, job):
+        """
+        取消任务，任务的on_finished会在当前线程上立即调用
+        
+        Args:
+            job: 要取消的任务
+        """
+        with self._cond:
+            if job.finished:
+                return
+            job.cancelled = True
+            job.finished = True
+        # 堆中的条目在到期时被惰性丢弃
+        job.on_finished()
+    
+    def next_deadline(self):
+        """
+        获取最早的截止时间
+        
+        Returns:
+            int: 最早的截止时间，没有任务时返回None
+        """
+        with self._cond:
+            self._discard_cancelled_locked()
+            return self._heap[0][0] if self._heap else None
+    
+    def run_due(self):
+        """
+        执行所有已到期的任务
+        
+        调度线程和模拟器都通过该方法执行任务。
+        
+        Returns:
+            int: 下一个截止时间，没有任务时返回None
+        """
+        while True:
+            now_ns = self._clock.now_ns()
+            with self._cond:
+                self._discard_cancelled_locked()
+                if not self._heap or self._heap[0][0] > now_ns:
+                    return self._heap[0][0] if self._heap else None
+                job = heapq.heappop(self._heap)[2]
+            
+            next_deadline = job.fire(now_ns)
+            
+            with self._cond:
+                if job.cancelled:
+                    continue
+                if next_deadline is not None:
+                    job.deadline_ns = next_deadline
+                    heapq.heappush(self._heap, (next_deadline, next(self._seq), job))
+                    continue
+                job.finished = True
+            job.on_finished()
+    
+    def _discard_cancelled_locked(self):
+        """丢弃堆顶已取消的任务"""
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+    
+    def _worker(self):
+        """调度线程"""
+        if self._thread_init is not None:
+            self._thread_init()
+        
+        while True:
+            deadline = self.run_due()
+            with self._cond:
+                if not self._running:
+                    break
+                self._discard_cancelled_locked()
+                if not self._heap:
+                    # 空闲时无限期阻塞，直到有新任务提交
+                    self._cond.wait()
+                elif self._heap[0][0] == deadline:
+                    self._clock.wait_until(self._cond, deadline)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+滚轮连续滚动模块
+
+同一方向的滚轮刻度在时间窗口内达到指定次数后，在调度线程上按固定间隔注入滚动，
+每次注入合并若干刻度。用户继续朝同一方向滚动时保持，停止滚动超过保持时间、
+反向滚动或按下鼠标按键时结束。
+
+与ClickEngine一样不依赖Qt和pynput，时间来自调度器的时钟。
+"""
+
+import threading
+
+from core.clock import NS_PER_MS
+from core.detector import TriggerDetector
+from core.injected import InjectedEvents
+from core.scheduler import DeadlineScheduler, ScheduledJob
+
+
+def _sign(value):
+    """取数值的符号(-1/0/1)"""
+    return (value > 0) - (value < 0)
+
+
+class ScrollRepeatJob(ScheduledJob):
+    """连续滚动的调度任务"""
+    
+    def __init__(self, engine, dx, dy):
+        super(ScrollRepeatJob, self).__init__()
+        self._engine = engine
+        self.dx = dx                # 每次注入的水平刻度数
+        self.dy = dy                # 每次注入的垂直刻度数
+        self.count = 0              # 已注入的次数
+        self.start_ns = 0           # 首次注入时间
+    
+    def fire(self, now_ns):
+        return self._engine.inject_scroll(self, now_ns)
+
+
+class ScrollEngine:
+    """滚轮连续滚动引擎"""
+    
+    def __init__(self, injector, scheduler=None):
+        """
+        初始化引擎
+        
+        Args:
+            injector: 滚动注入器，需要提供scroll(dx, dy)方法；可以提供scroll_events(刻度数)，
+                返回单方向注入时钩子收到的事件数量，默认为1
+            scheduler: 截止时间调度器，一般与连点引擎共用
+        """
+        self._injector = injector
+        self._scroll_events = getattr(injector, "scroll_events", None)
+        self._scheduler = scheduler or DeadlineScheduler()
+        self._clock = self._scheduler.clock
+        self._lock = threading.Lock()
+        
+        self._detector = TriggerDetector(4, 250 * NS_PER_MS)
+        self._interval_ns = 30 * NS_PER_MS
+        self._notches_per_tick = 3
+        self._sustain_ns = 400 * NS_PER_MS
+        
+        self._direction = (0, 0)           # 最近一次用户滚动的方向
+        self._last_user_ns = 0             # 最近一次用户滚动的时间
+        self._job = None                   # 当前的连续滚动任务
+        self.enabled = True                # 为False时不再触发新的连续滚动
+        self.injected = InjectedEvents()   # 待到达钩子的注入滚动，键为单个事件的方向
+        
+        # 回调，由外层设置
+        self.on_started = None             # 连续滚动开始
+        self.on_stopped = None             # 连续滚动停止，参数为注入次数
+    
+    def configure(self, trigger_count, trigger_interval_ms, repeat_interval_ms, notches_per_tick, sustain_ms):
+        """
+        更新引擎参数
+        
+        Args:
+            trigger_count: 触发所需的同方向刻度数
+            trigger_interval_ms: 触发时间窗口(毫秒)
+            repeat_interval_ms: 注入间隔(毫秒)
+            notches_per_tick: 每次注入合并的刻度数
+            sustain_ms: 停止滚动超过该时长后结束(毫秒)
+        """
+        with self._lock:
+            self._detector.configure(trigger_count, trigger_interval_ms * NS_PER_MS)
+            self._interval_ns = max(1, int(repeat_interval_ms * NS_PER_MS))
+            self._notches_per_tick = max(1, int(notches_per_tick))
+            self._sustain_ns = int(sustain_ms * NS_PER_MS)
+    
+    def is_scrolling(self):
+        """是否正在连续滚动"""
+        return self._job is not None
+    
+    def on_scroll(self, dx, dy, t_ns):
+        """
+        处理一次用户滚动
+        
+        Args:
+            dx, dy: 滚动量(刻度)
+            t_ns: 事件发生时间(单调纳秒)
+        
+        Returns:
+            bool: 是否开始了连续滚动
+        """
+        direction = (_sign(dx), _sign(dy))
+        if direction == (0, 0):
+            return False
+        
+        stopped = None
+        started = None
+        with self._lock:
+            if direction != self._direction:
+                # 换方向时重新计数，并结束反方向的连续滚动
+                self._direction = direction
+                self._detector.reset()
+                stopped, self._job = self._job, None
+            self._last_user_ns = t_ns
+            if self._job is None and self.enabled and self._detector.press(t_ns):
+                per_tick = self._notches_per_tick
+                started = self._job = ScrollRepeatJob(self, direction[0] * per_tick, direction[1] * per_tick)
+                self._detector.reset()
+        
+        if stopped is not None:
+            self._finish(stopped)
+        if started is not None:
+            self._scheduler.submit(started)
+            if self.on_started:
+                self.on_started()
+        return started is not None
+    
+    def inject_scroll(self, job, now_ns):
+        """
+        在调度线程上注入一次合并的滚动
+        
+        Args:
+            job: 连续滚动任务
+            now_ns: 当前时间(纳秒)
+        
+        Returns:
+            int: 下一次注入的截止时间，结束时返回None
+        """
+        with self._lock:
+            if job is not self._job:
+                return None
+            if now_ns - self._last_user_ns > self._sustain_ns:
+                # 用户已停止滚动
+                self._job = None
+                expired = True
+            else:
+                expired = False
+            interval_ns = self._interval_ns
+        if expired:
+            self._finish(job)
+            return None
+        
+        # 先登记再注入，钩子可能在注入调用返回之后才收到事件
+        keys = self._expect_scroll(job.dx, job.dy)
+        try:
+            self._injector.scroll(job.dx, job.dy)
+        except Exception as e:
+            print(f"Error during rapid scrolling: {e}")
+            for key in keys:
+                self.injected.forget(key)
+        
+        if job.count == 0:
+            job.start_ns = now_ns
+        job.count += 1
+        
+        # 按截止时间累加，落后超过一个间隔时不补发
+        next_deadline = job.deadline_ns + interval_ns
+        if next_deadline <= now_ns:
+            next_deadline = now_ns + interval_ns
+        return next_deadline
+    
+    def _expect_scroll(self, dx, dy):
+        """
+        登记一次注入会产生的钩子事件，水平和垂直滚动分别到达
+        
+        Returns:
+            list: 登记的事件键
+        """
+        keys = []
+        for key, notches in (((_sign(dx), 0), dx), ((0, _sign(dy)), dy)):
+            if not notches:
+                continue
+            events = self._scroll_events(notches) if self._scroll_events else 1
+            for _ in range(events):
+                self.injected.expect(key)
+                keys.append(key)
+        return keys
+    
+    def consume_injected(self, dx, dy):
+        """
+        钩子收到滚动时调用，判断它是否由连续滚动注入
+        
+        Args:
+            dx, dy: 滚动量(刻度)
+        
+        Returns:
+            bool: 是注入的滚动时返回True
+        """
+        return self.injected.consume((_sign(dx), _sign(dy)))
+    
+    def stop(self):
+        """停止当前连续滚动"""
+        with self._lock:
+            job, self._job = self._job, None
+            self._detector.reset()
+        if job is not None:
+            self._finish(job)
+    
+    def _finish(self, job):
+        """取消任务并通知"""
+        self._scheduler.cancel(job)
+        if self.on_stopped:
+            self.on_stopped(job.count)
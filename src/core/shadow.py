@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+影子触发检测模块
+
+把真实的每次按下同时送入K组候选的触发参数，只记录它们"本来会在什么时候触发"，
+不影响引擎。按下之间的间隔超过所有时间窗口时视为一轮快速点击结束，与实际使用的
+检测器比较：
+    agree: 两者都触发，累计触发时间差(影子 - 实际，负数表示影子更早)
+    extra: 只有影子触发(换成该参数会多触发)
+    missed: 只有实际检测器触发(换成该参数会漏触发)
+
+所有计数保存在预先分配的列表中，每次按下只做K次O(1)判定，不创建新的容器。
+"""
+
+from core.clock import NS_PER_MS
+from core.detector import TriggerDetector
+
+
+class ShadowDetectors:
+    """一组影子触发检测器，只在钩子线程上更新"""
+    
+    def __init__(self, configs, active_window_ms):
+        """
+        初始化影子检测器
+        
+        Args:
+            configs: 候选参数列表，每项为(触发次数, 时间窗口毫秒)
+            active_window_ms: 实际使用的触发时间窗口(毫秒)
+        """
+        self.configs = tuple((int(count), int(window_ms)) for count, window_ms in configs)
+        self._detectors = tuple(TriggerDetector(count, window_ms * NS_PER_MS) for count, window_ms in self.configs)
+        self._indices = tuple(range(len(self.configs)))
+        self._gap_ns = max([window_ms for _, window_ms in self.configs] + [active_window_ms]) * NS_PER_MS
+        
+        k = len(self.configs)
+        self._first_ns = [0] * k          # 本轮中影子首次触发的时间，0表示未触发
+        self._active_first_ns = 0         # 本轮中实际检测器首次触发的时间
+        self._last_press_ns = 0
+        
+        self.episodes = 0                 # 已结束的有触发的轮数
+        self.triggers = [0] * k           # 影子判定为触发的按下次数
+        self.agree = [0] * k
+        self.extra = [0] * k
+        self.missed = [0] * k
+        self.delta_ns = [0] * k           # agree轮次的触发时间差之和
+    
+    def press(self, t_ns, active_triggered):
+        """
+        送入一次真实的按下
+        
+        Args:
+            t_ns: 按下时间(单调纳秒)
+            active_triggered: 实际检测器是否在这次按下触发
+        """
+        if self._last_press_ns and t_ns - self._last_press_ns > self._gap_ns:
+            self._close_episode()
+        self._last_press_ns = t_ns
+        if active_triggered and not self._active_first_ns:
+            self._active_first_ns = t_ns
+        
+        detectors = self._detectors
+        first_ns = self._first_ns
+        triggers = self.triggers
+        for i in self._indices:
+            if detectors[i].press(t_ns):
+                triggers[i] += 1
+                if not first_ns[i]:
+                    first_ns[i] = t_ns
+    
+    def _close_episode(self):
+        """结束一轮快速点击，与实际检测器比较"""
+        active_ns = self._active_first_ns
+        first_ns = self._first_ns
+        any_triggered = active_ns != 0
+        for i in self._indices:
+            shadow_ns = first_ns[i]
+            if shadow_ns:
+                any_triggered = True
+                if active_ns:
+                    self.agree[i] += 1
+                    self.delta_ns[i] += shadow_ns - active_ns
+                else:
+                    self.extra[i] += 1
+            elif active_ns:
+                self.missed[i] += 1
+            first_ns[i] = 0
+        if any_triggered:
+            self.episodes += 1
+        self._active_first_ns = 0
+    
+    def snapshot(self):
+        """
+        获取统计快照，正在进行的一轮在下一轮开始时才计入
+        
+        Returns:
+            list: 每组候选参数一项，包含count、window_ms、triggers、agree、extra、missed、mean_delta_ms
+        """
+        return [
+            {
+                "count": count,
+                "window_ms": window_ms,
+                "triggers": self.triggers[i],
+                "agree": self.agree[i],
+                "extra": self.extra[i],
+                "missed": self.missed[i],
+                "mean_delta_ms": self.delta_ns[i] / self.agree[i] / NS_PER_MS if self.agree[i] else 0.0,
+            }
+            for i, (count, window_ms) in enumerate(self.configs)
+        ]
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+确定性模拟模块
+
+使用虚拟时钟驱动连点引擎和调度器，合成的按下/释放序列按时间顺序送入引擎，
+调度任务在两次输入之间按截止时间立即执行，几小时的连点可以在毫秒级完成。
+"""
+
+import random
+
+from core.clock import VirtualClock, NS_PER_MS
+from core.engine import ClickEngine, EVENT_TRIGGERED
+from core.scheduler import DeadlineScheduler
+
+
+class RecordingInjector:
+    """记录注入时间的点击注入器"""
+    
+    def __init__(self, clock):
+        self._clock = clock
+        self.clicks = []           # 每次注入点击(或按下)的虚拟时间
+        self.releases = []         # 每次点击对应的释放时间，尚未释放时为None
+        self.held_at_click = []    # 注入点击时用户是否按住按钮(由模拟器维护)
+        self.held = False
+    
+    def click(self):
+        """记录一次点击"""
+        self.press()
+        self.release()
+    
+    def press(self):
+        """记录一次按下"""
+        self.clicks.append(self._clock.now_ns())
+        self.releases.append(None)
+        self.held_at_click.append(self.held)
+    
+    def release(self):
+        """记录最近一次按下的释放"""
+        self.releases[-1] = self._clock.now_ns()
+
+
+class SyntheticEventSource:
+    """
+    合成输入事件源
+    
+    生成由若干"手势"组成的按下/释放序列：快速连按后按住、慢速点击、
+    接近阈值的连按以及长时间空闲，用于覆盖触发窗口的边界情况。
+    """
+    
+    def __init__(self, seed=0):
+        self._rng = random.Random(seed)
+    
+    def generate(self, gestures, trigger_count, trigger_interval_ms):
+        """
+        生成事件序列
+        
+        Args:
+            gestures: 手势数量
+            trigger_count: 引擎的触发次数，用于生成边界附近的连按
+            trigger_interval_ms: 引擎的触发时间窗口(毫秒)
+        
+        Returns:
+            list: (时间纳秒, 是否按下)组成的列表，按时间递增，总是以释放结束
+        """
+        rng = self._rng
+        events = []
+        t = 0
+        for _ in range(gestures):
+            kind = rng.random()
+            if kind < 0.1:
+                # 长时间空闲
+                t += rng.randint(1, 3600) * 1000 * NS_PER_MS
+                continue
+            taps = rng.randint(1, trigger_count + 2)
+            mean_gap_ms = trigger_interval_ms // max(1, trigger_count - 1)
+            if kind < 0.3:
+                # 恰好落在窗口边界上的连按(总跨度等于或略大于窗口)
+                gap_range = (mean_gap_ms, mean_gap_ms + rng.randint(0, 1))
+            elif kind < 0.6:
+                # 时间窗口附近的连按，间隔可能略大于或略小于窗口平均值
+                gap_range = (mean_gap_ms // 2, mean_gap_ms * 3 // 2)
+            else:
+                gap_range = (1, trigger_interval_ms * 2)
+            for i in range(taps):
+                hold = rng.randint(1, 40) * NS_PER_MS
+                if i == taps - 1 and rng.random() < 0.7:
+                    # 最后一次按下后按住一段时间
+                    hold = rng.randint(1, 5000) * NS_PER_MS
+                gap = max(1, rng.randint(*gap_range)) * NS_PER_MS
+                hold = min(hold, gap - 1) if i < taps - 1 else hold
+                events.append((t, True))
+                events.append((t + hold, False))
+                t += max(gap, hold + 1)
+        return events
+
+
+class Simulation:
+    """在虚拟时钟下运行连点引擎"""
+    
+    def __init__(self, trigger_count=5, trigger_interval_ms=300, click_interval_ms=50, program=None):
+        """
+        初始化模拟
+        
+        Args:
+            trigger_count: 触发连点的点击次数
+            trigger_interval_ms: 触发时间窗口(毫秒)
+            click_interval_ms: 自动连点间隔(毫秒)
+            program: 预编译的点击程序，为None时按固定间隔连点
+        """
+        self.trigger_count = trigger_count
+        self.trigger_interval_ms = trigger_interval_ms
+        self.click_interval_ms = click_interval_ms
+        
+        self.clock = VirtualClock()
+        self.scheduler = DeadlineScheduler(self.clock)
+        self.injector = RecordingInjector(self.clock)
+        self.engine = ClickEngine(self.injector, self.scheduler)
+        self.engine.configure(trigger_count, trigger_interval_ms, click_interval_ms, program)
+        self.triggers = []         # 引擎判定触发的按下时间
+    
+    def run(self, events):
+        """
+        按时间顺序送入事件并执行到期的调度任务
+        
+        Args:
+            events: (时间纳秒, 是否按下)组成的列表
+        """
+        for t_ns, pressed in events:
+            self._run_scheduler_until(t_ns)
+            self.clock.advance_to(t_ns)
+            self.injector.held = pressed
+            if self.engine.on_button(pressed, t_ns) == EVENT_TRIGGERED:
+                self.triggers.append(t_ns)
+        # 序列以释放结束，剩余任务都应自行结束
+        self._run_scheduler_until(None)
+    
+    def _run_scheduler_until(self, t_ns):
+        """执行截止时间不晚于t_ns的调度任务，t_ns为None时执行到没有任务"""
+        deadline = self.scheduler.next_deadline()
+        while deadline is not None and (t_ns is None or deadline <= t_ns):
+            self.clock.advance_to(deadline)
+            deadline = self.scheduler.run_due()
+    
+    def check_invariants(self, events):
+        """
+        检查不变量
+        
+        Args:
+            events: 运行过的事件序列
+        
+        Returns:
+            list: 违反不变量的描述，为空表示全部满足
+        """
+        violations = []
+        
+        # 1. 只在用户按住按钮时点击
+        for t_ns, held in zip(self.injector.clicks, self.injector.held_at_click):
+            if not held:
+                violations.append(f"click after release at {t_ns}ns")
+        
+        # 2. 恰好在最近N次按下落在窗口内时触发
+        window_ns = self.trigger_interval_ms * NS_PER_MS
+        presses = [t for t, pressed in events if pressed]
+        expected = [
+            presses[i] for i in range(self.trigger_count - 1, len(presses))
+            if presses[i] - presses[i - self.trigger_count + 1] <= window_ns
+        ]
+        if expected != self.triggers:
+            violations.append(f"triggers mismatch: expected {len(expected)}, got {len(self.triggers)}")
+        
+        # 3. 按住期间点击严格按程序时间表进行，第一次点击发生在触发时刻
+        # 4. 程序按下的按钮在按下时长后释放，除非用户先释放
+        program = self.engine.program
+        trigger_set = set(self.triggers)
+        clicks = self.injector.clicks
+        index = 0
+        for i, cur in enumerate(clicks):
+            if cur in trigger_set:
+                index = 0
+            elif i > 0:
+                prev = clicks[i - 1]
+                following = index + 1
+                if following < program.size:
+                    expected = program.offsets[following] - program.offsets[index]
+                elif program.loops:
+                    following = program.loop_index
+                    expected = program.loop_shift_ns + program.offsets[following] - program.offsets[index]
+                else:
+                    violations.append(f"click past program end at {cur}ns")
+                    continue
+                index = following
+                if cur - prev != expected:
+                    violations.append(f"irregular interval {cur - prev}ns at {cur}ns (expected {expected}ns)")
+            
+            released = self.injector.releases[i]
+            if released is not None and released - cur != program.holds[index]:
+                violations.append(f"held {released - cur}ns at {cur}ns (expected {program.holds[index]}ns)")
+        
+        return violations
+
+
+def fuzz(sequences, gestures=50, seed=0, trigger_count=5, trigger_interval_ms=300, click_interval_ms=50,
+         program=None):
+    """
+    随机生成大量输入序列并检查不变量
+    
+    Args:
+        sequences: 序列数量
+        gestures: 每个序列的手势数量
+        seed: 随机种子
+        trigger_count: 触发连点的点击次数
+        trigger_interval_ms: 触发时间窗口(毫秒)
+        click_interval_ms: 自动连点间隔(毫秒)
+        program: 预编译的点击程序，为None时按固定间隔连点
+    
+    Returns:
+        dict: 统计信息，violations为首批违反不变量的描述
+    """
+    source = SyntheticEventSource(seed)
+    stats = {"sequences": 0, "events": 0, "clicks": 0, "triggers": 0, "simulated_ns": 0, "violations": []}
+    for _ in range(sequences):
+        events = source.generate(gestures, trigger_count, trigger_interval_ms)
+        sim = Simulation(trigger_count, trigger_interval_ms, click_interval_ms, program)
+        sim.run(events)
+        stats["sequences"] += 1
+        stats["events"] += len(events)
+        stats["clicks"] += len(sim.injector.clicks)
+        stats["triggers"] += len(sim.triggers)
+        stats["simulated_ns"] += sim.clock.now_ns()
+        if len(stats["violations"]) < 20:
+            stats["violations"].extend(sim.check_invariants(events))
+    return stats
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+实时状态页模块，把引擎状态发布到内存映射文件中，供外部叠加层等程序读取
+
+文件布局(小端，共64字节):
+    0   4s  魔数 b"RCSP"
+    4   H   布局版本
+    6   H   保留
+    8   Q   版本计数器，写入期间为奇数
+    16  B   是否允许触发(armed)
+    17  B   是否正在连点
+    18  6x  保留
+    24  Q   累计连点次数
+    32  Q   累计注入点击次数
+    40  I   本次连点的点击次数
+    44  I   进程ID
+    48  d   本次连点的点击速率(次/秒)
+    56  q   最近一次更新的时间(单调纳秒)
+
+读取方按seqlock方式读取：先读版本计数器，为奇数时重试；复制数据后再读一次，
+两次不同则重试。读取只是内存访问，不需要系统调用，也不需要与写入方协调。
+"""
+
+import os
+import sys
+import mmap
+import struct
+import tempfile
+import threading
+
+from core.clock import monotonic_ns
+from utils.constants import APP_NAME
+
+
+STATUS_MAGIC = b"RCSP"
+STATUS_LAYOUT_VERSION = 1
+STATUS_SIZE = 64
+
+_HEADER = struct.Struct("<4sHH")
+_SEQ = struct.Struct("<Q")
+_PAYLOAD = struct.Struct("<BB6xQQIIdq")
+_SEQ_OFFSET = 8
+_PAYLOAD_OFFSET = 16
+
+
+def default_status_path():
+    """
+    默认的状态页路径，Linux上优先使用内存文件系统/dev/shm
+    
+    Returns:
+        str: 文件路径
+    """
+    directory = "/dev/shm" if sys.platform.startswith("linux") and os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"{APP_NAME.lower()}_status.bin")
+
+
+class StatusPage:
+    """
+    状态页写入方
+    
+    写入方可能在钩子线程(连点开始/停止)和调度线程(每次点击)上调用，
+    写入之间用锁互斥；读取方不加锁。
+    """
+    
+    def __init__(self, path=None):
+        """
+        创建并映射状态页文件
+        
+        Args:
+            path: 文件路径，默认使用default_status_path()
+        """
+        self.path = path or default_status_path()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._pid = os.getpid()
+        
+        with open(self.path, "wb") as f:
+            f.write(bytes(STATUS_SIZE))
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), STATUS_SIZE)
+        _HEADER.pack_into(self._map, 0, STATUS_MAGIC, STATUS_LAYOUT_VERSION, 0)
+        
+        # 当前状态
+        self.armed = True
+        self.clicking = False
+        self.bursts = 0
+        self.total_clicks = 0
+        self.burst_clicks = 0
+        self.cps = 0.0
+        self._write()
+    
+    def _write(self):
+        """按seqlock协议写入当前状态，调用方负责互斥"""
+        mapped = self._map
+        _SEQ.pack_into(mapped, _SEQ_OFFSET, self._seq + 1)
+        _PAYLOAD.pack_into(
+            mapped, _PAYLOAD_OFFSET,
+            self.armed, self.clicking, self.bursts, self.total_clicks,
+            self.burst_clicks, self._pid, self.cps, monotonic_ns(),
+        )
+        self._seq += 2
+        _SEQ.pack_into(mapped, _SEQ_OFFSET, self._seq)
+    
+    def set_armed(self, armed):
+        """
+        更新是否允许触发
+        
+        Args:
+            armed: 是否允许触发
+        """
+        with self._lock:
+            self.armed = armed
+            self._write()
+    
+    def burst_started(self):
+        """连点开始"""
+        with self._lock:
+            self.clicking = True
+            self.bursts += 1
+            self.burst_clicks = 0
+            self.cps = 0.0
+            self._write()
+    
+    def click_injected(self, count, elapsed_ns):
+        """
+        连点中注入了一次点击，在调度线程上调用
+        
+        Args:
+            count: 本次连点的点击次数
+            elapsed_ns: 从首次点击到现在的时长(纳秒)
+        """
+        with self._lock:
+            self.burst_clicks = count
+            self.total_clicks += 1
+            if count > 1 and elapsed_ns > 0:
+                self.cps = (count - 1) * 1e9 / elapsed_ns
+            self._write()
+    
+    def burst_stopped(self):
+        """连点停止，保留最后的点击速率"""
+        with self._lock:
+            self.clicking = False
+            self._write()
+    
+    def close(self):
+        """解除映射并删除文件"""
+        with self._lock:
+            self._map.close()
+            self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class StatusPageReader:
+    """状态页读取方，可在其他进程中使用"""
+    
+    def __init__(self, path=None):
+        """
+        映射状态页文件
+        
+        Args:
+            path: 文件路径，默认使用default_status_path()
+        
+        Raises:
+            OSError: 文件不存在(程序未运行或未启用状态页)
+            ValueError: 文件不是状态页或布局版本不兼容
+        """
+        with open(path or default_status_path(), "rb") as f:
+            self._map = mmap.mmap(f.fileno(), STATUS_SIZE, access=mmap.ACCESS_READ)
+        magic, version, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != STATUS_MAGIC or version != STATUS_LAYOUT_VERSION:
+            raise ValueError("not a compatible status page")
+        self.retries = 0      # 因读到写入中途的数据而重试的次数
+    
+    def read(self):
+        """
+        读取一份一致的状态快照
+        
+        Returns:
+            dict: armed、clicking、bursts、total_clicks、burst_clicks、pid、cps、updated_ns
+        """
+        mapped = self._map
+        while True:
+            before = _SEQ.unpack_from(mapped, _SEQ_OFFSET)[0]
+            if before & 1:
+                self.retries += 1
+                continue
+            values = _PAYLOAD.unpack_from(mapped, _PAYLOAD_OFFSET)
+            if _SEQ.unpack_from(mapped, _SEQ_OFFSET)[0] == before:
+                break
+            self.retries += 1
+        
+        armed, clicking, bursts, total_clicks, burst_clicks, pid, cps, updated_ns = values
+        return {
+            "armed": bool(armed),
+            "clicking": bool(clicking),
+            "bursts": bursts,
+            "total_clicks": total_clicks,
+            "burst_clicks": burst_clicks,
+            "pid": pid,
+            "cps": cps,
+            "updated_ns": updated_ns,
+        }
+    
+    def close(self):
+        """解除映射"""
+        self._map.close()
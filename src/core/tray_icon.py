@@ -6,14 +6,16 @@
 """
 
 import sys
-from PyQt5.QtWidgets import QSystemTrayIcon, QMenu, QAction
-from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QSize
+from PyQt5.QtWidgets import QSystemTrayIcon, QMenu, QAction, QWidget
+from PyQt5.QtCore import QSize, QTimer
 
-from utils.constants import APP_NAME, APP_ICON_PATH, SETTINGS_ICON_PATH, ABOUT_ICON_PATH, EXIT_ICON_PATH
+from utils.constants import APP_NAME, SETTINGS_ICON_PATH, ABOUT_ICON_PATH, EXIT_ICON_PATH
 from utils.language import Language
 from utils.config import Config
 from core.mouse_handler import MouseHandler
+from core.clock import monotonic_ns
+from utils.notify_bus import NotificationBus
+from utils.icon_cache import IconCache, STATE_IDLE, STATE_CLICKING, STATE_PAUSED
 from ui.settings_dialog import SettingsDialog
 from ui.about_dialog import AboutDialog
 
@@ -29,8 +31,15 @@ class SystemTrayIcon(QSystemTrayIcon):
         self._lang = Language()
         self._mouse_handler = MouseHandler()
         
+        # 启动时解码全部图标，之后切换状态只使用缓存
+        self._icons = IconCache()
+        self._icons.preload()
+        self._clicking = False
+        self._armed = True
+        self._tray_state = STATE_IDLE
+        
         # 设置图标
-        self.setIcon(QIcon(APP_ICON_PATH))
+        self.setIcon(self._icons.state_icon(STATE_IDLE))
         self.setToolTip(APP_NAME)
         
         # 创建右键菜单
@@ -44,9 +53,29 @@ class SystemTrayIcon(QSystemTrayIcon):
         # 设置菜单
         self.setContextMenu(self.menu)
         
+        # 打开菜单时检查监听器是否存活(空闲时看门狗不运行)
+        self.menu.aboutToShow.connect(self._mouse_handler.check_listener)
+        self.menu.aboutToShow.connect(self._update_target_action)
+        self.menu.aboutToShow.connect(self._update_macro_actions)
+        self.menu.aboutToShow.connect(self._update_bounded_action)
+        
         # 连接信号
         self.activated.connect(self._on_tray_activated)
         self._config.config_changed.connect(self._on_config_changed)
+        
+        # 连点状态和触发暂停状态都经通知总线合并，托盘图标的更新频率不超过ui_max_update_hz
+        self._mouse_handler.rapid_click_started.connect(lambda: self._set_clicking(True))
+        self._mouse_handler.rapid_click_stopped.connect(lambda: self._set_clicking(False))
+        NotificationBus().subscribe("armed", self._on_armed)
+        NotificationBus().subscribe("profile_finished", self._on_profile_finished)
+        NotificationBus().subscribe("profile_switched", self._on_profile_switched)
+        NotificationBus().subscribe("macro_finished", self._on_macro_finished)
+        NotificationBus().subscribe("bounded_finished", self._on_bounded_finished)
+        NotificationBus().subscribe("target_finished", self._on_target_finished)
+        
+        # 启动完成后在空闲时预先创建对话框
+        if self._config.get("keep_dialogs_warm", True):
+            QTimer.singleShot(self._config.get("dialog_prebuild_delay_ms", 2000), self._prebuild_dialogs)
     
     def _create_menu(self):
         """创建托盘右键菜单"""
@@ -54,23 +83,91 @@ class SystemTrayIcon(QSystemTrayIcon):
         self.menu.clear()
         
         # 设置选项
-        self.settings_action = QAction(QIcon(SETTINGS_ICON_PATH), self._lang.get("settings"), self)
+        self.settings_action = QAction(self._icons.icon(SETTINGS_ICON_PATH), self._lang.get("settings"), self)
         self.settings_action.triggered.connect(self._show_settings_dialog)
         self.menu.addAction(self.settings_action)
         
         # 关于选项
-        self.about_action = QAction(QIcon(ABOUT_ICON_PATH), self._lang.get("about"), self)
+        self.about_action = QAction(self._icons.icon(ABOUT_ICON_PATH), self._lang.get("about"), self)
         self.about_action.triggered.connect(self._show_about_dialog)
         self.menu.addAction(self.about_action)
         
+        # 后台窗口连点选项
+        self.target_action = QAction(self._target_action_text(), self)
+        self.target_action.triggered.connect(self._schedule_target)
+        self.menu.addAction(self.target_action)
+        
+        self.target_stop_action = QAction(self._lang.format("target_stop", 0), self)
+        self.target_stop_action.triggered.connect(self._mouse_handler.targets.stop_all)
+        self.menu.addAction(self.target_stop_action)
+        
+        # 有界连点选项
+        self.bounded_action = QAction(self._bounded_action_text(), self)
+        self.bounded_action.triggered.connect(self._toggle_bounded_burst)
+        self.menu.addAction(self.bounded_action)
+        
+        # 宏录制与回放选项
+        self._menu_shown_ns = 0
+        self.macro_record_action = QAction(self._lang.get("macro_record"), self)
+        self.macro_record_action.triggered.connect(self._toggle_macro_recording)
+        self.menu.addAction(self.macro_record_action)
+        
+        self.macro_play_action = QAction(self._lang.get("macro_play"), self)
+        self.macro_play_action.triggered.connect(self._toggle_macro_playback)
+        self.menu.addAction(self.macro_play_action)
+        
+        # 诊断日志选项
+        self.diagnostics_action = QAction(self._lang.get("save_diagnostics"), self)
+        self.diagnostics_action.triggered.connect(self._save_diagnostics)
+        self.menu.addAction(self.diagnostics_action)
+        
+        # 性能采样选项(仅调试模式显示)
+        self.profile_action = QAction(self._profile_action_text(), self)
+        self.profile_action.triggered.connect(self._start_profile)
+        self.profile_action.setVisible(self._config.get("debug_mode", False))
+        self.menu.addAction(self.profile_action)
+        
         # 分隔线
         self.menu.addSeparator()
         
         # 退出选项
-        self.exit_action = QAction(QIcon(EXIT_ICON_PATH), self._lang.get("exit"), self)
+        self.exit_action = QAction(self._icons.icon(EXIT_ICON_PATH), self._lang.get("exit"), self)
         self.exit_action.triggered.connect(self._exit_app)
         self.menu.addAction(self.exit_action)
     
+    def _set_clicking(self, clicking):
+        """
+        连点状态变化
+        
+        Args:
+            clicking: 是否正在连点
+        """
+        self._clicking = clicking
+        self._update_state_icon()
+    
+    def _on_armed(self, armed, count):
+        """
+        触发暂停状态通知处理
+        
+        Args:
+            armed: 是否允许触发
+            count: 合并的通知数量
+        """
+        self._armed = armed
+        self._update_state_icon()
+    
+    def _update_state_icon(self):
+        """切换到当前状态对应的缓存图标，状态未变化时不做任何事"""
+        if self._clicking:
+            state = STATE_CLICKING
+        elif not self._armed:
+            state = STATE_PAUSED
+        else:
+            state = STATE_IDLE
+        if state != self._tray_state:
+            self._tray_state = state
+            self.setIcon(self._icons.state_icon(state))
+    
     def _on_tray_activated(self, reason):
         """
         托盘图标激活事件处理
@@ -82,45 +179,230 @@ class SystemTrayIcon(QSystemTrayIcon):
         if reason == QSystemTrayIcon.DoubleClick:
             self._show_settings_dialog()
     
-    def _show_settings_dialog(self):
-        """显示设置对话框"""
-        # 确保设置窗口只能打开一个
+    def _prebuild_dialogs(self):
+        """空闲时预先创建对话框并完成样式和布局计算，打开时只需刷新内容"""
         if self._settings_dialog is None:
             self._settings_dialog = SettingsDialog()
-            self._settings_dialog.finished.connect(self._on_settings_dialog_closed)
+            self._warm_up(self._settings_dialog)
+        if self._about_dialog is None:
+            self._about_dialog = AboutDialog()
+            self._warm_up(self._about_dialog)
+    
+    def _warm_up(self, dialog):
+        """在不显示的情况下完成对话框的样式计算和布局"""
+        dialog.ensurePolished()
+        for child in dialog.findChildren(QWidget):
+            child.ensurePolished()
+        dialog.layout().activate()
+    
+    def _show_dialog(self, dialog):
+        """
+        显示缓存的对话框，关闭后只隐藏不销毁
         
-        if not self._settings_dialog.isVisible():
-            self._settings_dialog.show()
+        Args:
+            dialog: 对话框
+        """
+        # 确保窗口只能打开一个，重新打开时从配置和语言刷新
+        if not dialog.isVisible():
+            dialog.refresh()
+            dialog.show()
         
         # 确保窗口在前台显示
-        self._settings_dialog.activateWindow()
+        dialog.raise_()
+        dialog.activateWindow()
     
-    def _on_settings_dialog_closed(self):
-        """设置对话框关闭事件处理"""
-        self._settings_dialog = None
+    def _show_settings_dialog(self):
+        """显示设置对话框"""
+        if self._settings_dialog is None:
+            self._settings_dialog = SettingsDialog()
+        self._show_dialog(self._settings_dialog)
     
     def _show_about_dialog(self):
         """显示关于对话框"""
-        # 确保关于窗口只能打开一个
         if self._about_dialog is None:
             self._about_dialog = AboutDialog()
-            self._about_dialog.finished.connect(self._on_about_dialog_closed)
+        self._show_dialog(self._about_dialog)
+    
+    def _target_action_text(self):
+        """后台连点菜单文本"""
+        return self._lang.format("target_start", self._config.get("target_capture_delay_s", 3))
+    
+    def _update_target_action(self):
+        """打开菜单时更新后台连点目标数量"""
+        count = len(self._mouse_handler.targets.snapshot())
+        self.target_stop_action.setText(self._lang.format("target_stop", count))
+        self.target_stop_action.setEnabled(count > 0)
+    
+    def _schedule_target(self):
+        """等待用户把光标移到目标位置后开始后台连点"""
+        QTimer.singleShot(int(self._config.get("target_capture_delay_s", 3) * 1000), self._start_target)
+    
+    def _start_target(self):
+        """对光标下的窗口开始后台连点"""
+        started = self._mouse_handler.start_target_at_cursor()
+        if started is None:
+            self.showMessage(APP_NAME, self._lang.get("target_failed"), QSystemTrayIcon.Warning)
+        else:
+            self.showMessage(APP_NAME, self._lang.format("target_started", *started[1:]))
+    
+    def _on_target_finished(self, job, count):
+        """
+        后台连点目标结束通知处理(停止或目标窗口关闭)
         
-        if not self._about_dialog.isVisible():
-            self._about_dialog.show()
+        Args:
+            job: 结束的后台连点任务
+            count: 通知数量，事件通知始终为1
+        """
+        self.showMessage(APP_NAME, self._lang.format("target_finished", job.target.window, job.count))
+    
+    def _bounded_action_text(self):
+        """有界连点菜单文本"""
+        clicks = self._config.get("bounded_clicks", 100)
+        duration_ms = self._config.get("bounded_duration_ms", 0)
+        limits = []
+        if clicks:
+            limits.append(self._lang.format("bounded_clicks_label", clicks))
+        if duration_ms:
+            limits.append(self._lang.format("bounded_ms_label", duration_ms))
+        return self._lang.format("bounded_start", " / ".join(limits), self._config.get("bounded_start_delay_s", 3))
+    
+    def _update_bounded_action(self):
+        """打开菜单时更新有界连点菜单"""
+        if self._mouse_handler.is_bounded_running():
+            self.bounded_action.setText(self._lang.get("bounded_stop"))
+        else:
+            self.bounded_action.setText(self._bounded_action_text())
+    
+    def _toggle_bounded_burst(self):
+        """取消正在进行的有界连点，或等待用户把光标移到目标位置后开始"""
+        if self._mouse_handler.cancel_bounded_burst():
+            return
+        QTimer.singleShot(int(self._config.get("bounded_start_delay_s", 3) * 1000), self._start_bounded_burst)
+    
+    def _start_bounded_burst(self):
+        """开始有界连点"""
+        try:
+            self._mouse_handler.run_bounded_burst(
+                self._config.get("bounded_clicks", 100), self._config.get("bounded_duration_ms", 0))
+        except ValueError as e:
+            print(f"Error starting bounded burst: {e}")
+            self.showMessage(APP_NAME, self._lang.get("bounded_invalid"), QSystemTrayIcon.Warning)
+    
+    def _on_bounded_finished(self, job, count):
+        """
+        有界连点结束通知处理
         
-        # 确保窗口在前台显示
-        self._about_dialog.activateWindow()
+        Args:
+            job: 有界连点任务
+            count: 通知数量，事件通知始终为1
+        """
+        report = job.report()
+        self.showMessage(APP_NAME, self._lang.format(
+            "bounded_finished", report["clicks"], report["duration_ms"], report["duration_error_ms"],
+            report["mean_error_ms"], report["max_error_ms"]))
     
-    def _on_about_dialog_closed(self):
-        """关于对话框关闭事件处理"""
-        self._about_dialog = None
+    def _update_macro_actions(self):
+        """打开菜单时更新宏录制和回放菜单"""
+        # 菜单弹出时间，停止录制时用于去掉打开菜单的点击
+        self._menu_shown_ns = monotonic_ns()
+        size = self._mouse_handler.macro_recording_size()
+        if size is None:
+            self.macro_record_action.setText(self._lang.get("macro_record"))
+        else:
+            self.macro_record_action.setText(self._lang.format("macro_record_stop", size))
+        playing = self._mouse_handler.macro.is_playing()
+        self.macro_play_action.setText(self._lang.get("macro_play_stop" if playing else "macro_play"))
+        self.macro_play_action.setEnabled(size is None)
+    
+    def _toggle_macro_recording(self):
+        """开始或停止录制宏"""
+        if self._mouse_handler.macro_recording_size() is None:
+            self._mouse_handler.start_macro_recording()
+            return
+        try:
+            path, count, duration_ns = self._mouse_handler.stop_macro_recording(self._menu_shown_ns)
+        except OSError as e:
+            print(f"Error saving macro: {e}")
+            self.showMessage(APP_NAME, self._lang.format("macro_failed", e), QSystemTrayIcon.Warning)
+            return
+        self.showMessage(APP_NAME, self._lang.format("macro_saved", count, duration_ns / 1e9) + f"\n{path}")
+    
+    def _toggle_macro_playback(self):
+        """开始或停止回放宏"""
+        if self._mouse_handler.macro.is_playing():
+            self._mouse_handler.macro.stop()
+            return
+        try:
+            job = self._mouse_handler.play_macro()
+        except (OSError, ValueError, RuntimeError) as e:
+            self.showMessage(APP_NAME, self._lang.format("macro_failed", e), QSystemTrayIcon.Warning)
+            return
+        if job is None:
+            self.showMessage(APP_NAME, self._lang.format("macro_failed", self._lang.get("macro_empty")), QSystemTrayIcon.Warning)
+    
+    def _on_macro_finished(self, job, count):
+        """
+        宏回放结束通知处理
+        
+        Args:
+            job: 回放任务
+            count: 通知数量，事件通知始终为1
+        """
+        timing = job.timing()
+        self.showMessage(APP_NAME, self._lang.format(
+            "macro_finished", timing["events"], timing["mean_ms"], timing["p99_ms"], timing["max_ms"]))
+    
+    def _save_diagnostics(self):
+        """导出飞行记录器内容"""
+        path = self._mouse_handler.dump_flight_recorder(reason="tray")
+        if path:
+            self.showMessage(APP_NAME, f"{self._lang.get('diagnostics_saved')}\n{path}")
+        else:
+            self.showMessage(APP_NAME, self._lang.get("diagnostics_failed"), QSystemTrayIcon.Warning)
+    
+    def _profile_action_text(self):
+        """性能采样菜单文本"""
+        return self._lang.format("start_profile", self._config.get("profile_duration_s", 10))
+    
+    def _start_profile(self):
+        """开始性能采样"""
+        if self._mouse_handler.start_profile() is None:
+            self.showMessage(APP_NAME, self._lang.get("profile_busy"), QSystemTrayIcon.Warning)
+        else:
+            self.showMessage(APP_NAME, self._lang.format("profile_started", self._config.get("profile_duration_s", 10)))
+    
+    def _on_profile_finished(self, result, count):
+        """
+        性能采样结束通知处理
+        
+        Args:
+            result: 采样结果，失败时为None
+            count: 通知数量，事件通知始终为1
+        """
+        if result:
+            self.showMessage(APP_NAME, f"{self._lang.get('profile_saved')}\n{result['path']}")
+        else:
+            self.showMessage(APP_NAME, self._lang.get("profile_failed"), QSystemTrayIcon.Warning)
+    
+    def _on_profile_switched(self, name, count):
+        """
+        配置方案切换通知处理，连续切换只提示最后一次
+        
+        Args:
+            name: 当前配置方案名称
+            count: 合并的通知数量
+        """
+        self.showMessage(APP_NAME, self._lang.format("profile_switched", name or self._lang.get("default_profile")))
     
     def _exit_app(self):
         """退出应用程序"""
         # 停止鼠标监听
         self._mouse_handler.stop_listening()
         
+        # 写完队列中的使用统计
+        if self._mouse_handler.stats is not None:
+            self._mouse_handler.stats.stop()
+        
         # 隐藏托盘图标并退出
         self.hide()
         sys.exit(0)
@@ -130,4 +412,9 @@ class SystemTrayIcon(QSystemTrayIcon):
         # 更新菜单文本
         self.settings_action.setText(self._lang.get("settings"))
         self.about_action.setText(self._lang.get("about"))
+        self.target_action.setText(self._target_action_text())
+        self._update_target_action()
+        self.diagnostics_action.setText(self._lang.get("save_diagnostics"))
+        self.profile_action.setText(self._profile_action_text())
+        self.profile_action.setVisible(self._config.get("debug_mode", False))
         self.exit_action.setText(self._lang.get("exit")) 
\ No newline at end of file
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+钩子回调看门狗模块
+
+系统会静默移除回调过慢的低级钩子，移除后监听器不再收到任何事件。
+看门狗统计每次回调的耗时，在p99接近预算时关闭可选工作，并检测
+死亡或停滞的监听器后重新启动。
+"""
+
+import time
+from array import array
+from collections import deque
+
+from core.clock import NS_PER_MS
+from core.scheduler import ScheduledJob
+
+
+class CallbackTimer:
+    """回调耗时的预分配环形记录"""
+    
+    def __init__(self, capacity=512):
+        self._samples = array("q", bytes(8 * capacity))
+        self._capacity = capacity
+        self._index = 0
+        self.count = 0          # 累计记录次数
+    
+    def record(self, duration_ns):
+        """
+        记录一次回调耗时
+        
+        Args:
+            duration_ns: 耗时(纳秒)
+        """
+        self._samples[self._index] = duration_ns
+        self._index += 1
+        if self._index == self._capacity:
+            self._index = 0
+        self.count += 1
+    
+    def percentile(self, pct):
+        """
+        计算最近样本的百分位耗时，只在看门狗线程上调用
+        
+        Args:
+            pct: 百分位(0-100)
+        
+        Returns:
+            int: 耗时(纳秒)，没有样本时返回0
+        """
+        size = min(self.count, self._capacity)
+        if size == 0:
+            return 0
+        ordered = sorted(self._samples[:size])
+        return ordered[min(size - 1, size * pct // 100)]
+
+
+class _WatchdogJob(ScheduledJob):
+    """看门狗的周期检查任务"""
+    
+    def __init__(self, watchdog):
+        super(_WatchdogJob, self).__init__()
+        self._watchdog = watchdog
+    
+    def fire(self, now_ns):
+        return self._watchdog.check(now_ns)
+    
+    def on_finished(self):
+        self._watchdog.on_job_finished(self)
+
+
+class HookWatchdog:
+    """
+    钩子监听器看门狗
+    
+    检查任务运行在引擎的调度线程上，只在有输入或连点活动时按周期运行，
+    连续若干周期没有活动后自动停止，空闲时不产生任何唤醒。
+    
+    handler需要提供:
+        get_listener(): 当前监听器，counts_wakeups属性表示是否统计唤醒次数
+        get_hook_wakeups(): 钩子线程唤醒次数
+        get_injected_clicks(): 累计注入的点击次数
+        restart_listener(reason): 重启监听器
+        report_incident(kind, detail): 报告事件
+    """
+    
+    # 连续多少个周期没有活动后停止检查
+    IDLE_PERIODS = 3
+    
+    def __init__(self, handler, scheduler, budget_ms=10, interval_ms=1000, shed_ratio=0.5):
+        """
+        初始化看门狗
+        
+        Args:
+            handler: 提供监听器状态和重启能力的对象
+            scheduler: 运行检查任务的调度器
+            budget_ms: 回调耗时预算(毫秒)
+            interval_ms: 检查周期(毫秒)
+            shed_ratio: p99超过预算的该比例时关闭可选工作
+        """
+        self._handler = handler
+        self._scheduler = scheduler
+        self.timer = CallbackTimer()
+        self.shedding = False       # 是否已关闭可选工作
+        self._job = None
+        self.configure(budget_ms, interval_ms, shed_ratio)
+        
+        self._last_wakeups = 0
+        self._last_injected = 0
+        self._last_samples = 0
+        self._idle_periods = 0
+    
+    def configure(self, budget_ms, interval_ms, shed_ratio):
+        """
+        更新看门狗参数
+        
+        Args:
+            budget_ms: 回调耗时预算(毫秒)
+            interval_ms: 检查周期(毫秒)
+            shed_ratio: p99超过预算的该比例时关闭可选工作
+        """
+        self.budget_ns = int(budget_ms * NS_PER_MS)
+        self._interval_ns = int(interval_ms * NS_PER_MS)
+        self._shed_ratio = shed_ratio
+    
+    def arm(self):
+        """有活动时启动周期检查，已在运行时不做任何事"""
+        if self._job is not None:
+            return
+        job = _WatchdogJob(self)
+        self._job = job
+        self._scheduler.submit(job, self._scheduler.clock.now_ns() + self._interval_ns)
+    
+    def disarm(self):
+        """停止周期检查"""
+        job = self._job
+        if job is not None:
+            self._scheduler.cancel(job)
+    
+    def on_job_finished(self, job):
+        """检查任务结束"""
+        if self._job is job:
+            self._job = None
+    
+    def check(self, now_ns):
+        """
+        执行一次检查
+        
+        Args:
+            now_ns: 当前时间(纳秒)
+        
+        Returns:
+            int: 下一次检查时间，没有活动时返回None停止检查
+        """
+        listener = self._handler.get_listener()
+        wakeups = self._handler.get_hook_wakeups()
+        injected = self._handler.get_injected_clicks()
+        samples = self.timer.count
+        
+        if listener is None or not listener.is_alive():
+            self._handler.report_incident("listener_dead", "hook listener thread is not running")
+            self._handler.restart_listener("listener_dead")
+            wakeups = 0
+        elif (getattr(listener, "counts_wakeups", False)
+              and injected != self._last_injected and wakeups == self._last_wakeups):
+            # 注入的点击同样会经过钩子，有注入却没有任何钩子回调说明钩子已被系统移除；
+            # 不统计唤醒次数的后端无法据此判断，跳过停滞检测
+            self._handler.report_incident(
+                "listener_stalled",
+                f"{injected - self._last_injected} injected clicks produced no hook events")
+            self._handler.restart_listener("listener_stalled")
+            wakeups = 0
+        
+        self._update_shedding()
+        
+        active = wakeups != self._last_wakeups or injected != self._last_injected or samples != self._last_samples
+        self._last_wakeups = wakeups
+        self._last_injected = injected
+        self._last_samples = samples
+        
+        if active:
+            self._idle_periods = 0
+        else:
+            self._idle_periods += 1
+            if self._idle_periods >= self.IDLE_PERIODS:
+                self._idle_periods = 0
+                return None
+        return now_ns + self._interval_ns
+    
+    def _update_shedding(self):
+        """根据回调耗时p99开关可选工作，带滞回避免来回切换"""
+        p99 = self.timer.percentile(99)
+        threshold = self.budget_ns * self._shed_ratio
+        if not self.shedding and p99 > threshold:
+            self.shedding = True
+            self._handler.report_incident(
+                "shedding_on", f"hook p99 {p99 / NS_PER_MS:.2f}ms > {threshold / NS_PER_MS:.2f}ms")
+        elif self.shedding and p99 < threshold / 2:
+            self.shedding = False
+            self._handler.report_incident(
+                "shedding_off", f"hook p99 {p99 / NS_PER_MS:.2f}ms")
+
+
+class IncidentLog:
+    """最近的看门狗事件记录"""
+    
+    def __init__(self, capacity=20):
+        self._incidents = deque(maxlen=capacity)
+    
+    def add(self, kind, detail):
+        """
+        记录一个事件
+        
+        Args:
+            kind: 事件类型
+            detail: 描述
+        """
+        self._incidents.append({"time": time.time(), "kind": kind, "detail": detail})
+    
+    def snapshot(self):
+        """
+        获取事件列表副本
+        
+        Returns:
+            list: 按时间顺序的事件
+        """
+        return list(self._incidents)
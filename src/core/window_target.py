@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+后台窗口连点模块
+
+把点击直接投递给指定窗口的指定坐标，不移动也不使用全局光标：
+    Windows: PostMessage发送WM_LBUTTONDOWN/WM_LBUTTONUP(坐标为窗口客户区坐标)
+    X11: XSendEvent发送ButtonPress/ButtonRelease(坐标相对于目标窗口)
+
+部分程序会忽略投递的消息或合成事件(如直接读取原始输入的游戏)，这类窗口无法后台连点。
+多个目标的连点任务共用鼠标连点的调度线程。
+"""
+
+import sys
+import ctypes
+import threading
+
+from core.engine import HeldBurstJob
+
+
+# Windows鼠标消息
+_WM_LBUTTONDOWN = 0x0201
+_WM_LBUTTONUP = 0x0202
+_MK_LBUTTON = 0x0001
+
+
+_user32_dll = None
+
+
+class TargetGoneError(Exception):
+    """目标窗口已关闭"""
+    pass
+
+
+def _user32():
+    """
+    获取声明了函数原型的user32
+    
+    窗口句柄和LPARAM在64位系统上是指针宽度，不声明原型会按int截断。使用独立的WinDLL实例，
+    不修改ctypes.windll上其他模块共享的函数原型。
+    """
+    global _user32_dll
+    if _user32_dll is None:
+        from ctypes import wintypes
+        
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        user32.GetCursorPos.argtypes = [ctypes.POINTER(wintypes.POINT)]
+        user32.WindowFromPoint.restype = wintypes.HWND
+        user32.WindowFromPoint.argtypes = [wintypes.POINT]
+        user32.ScreenToClient.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.POINT)]
+        user32.IsWindow.argtypes = [wintypes.HWND]
+        user32.PostMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+        _user32_dll = user32
+    return _user32_dll
+
+
+class _Win32Target:
+    """通过PostMessage向窗口投递点击"""
+    
+    def __init__(self, window, x, y):
+        self.window = window
+        self.x = x
+        self.y = y
+        self._lparam = ((y & 0xFFFF) << 16) | (x & 0xFFFF)
+        self._user32 = _user32()
+    
+    def _post(self, message, wparam):
+        if not self._user32.IsWindow(self.window):
+            raise TargetGoneError(f"window {self.window:#x} is gone")
+        self._user32.PostMessageW(self.window, message, wparam, self._lparam)
+    
+    def press(self):
+        self._post(_WM_LBUTTONDOWN, _MK_LBUTTON)
+    
+    def release(self):
+        self._post(_WM_LBUTTONUP, 0)
+    
+    def click(self):
+        self.press()
+        self.release()
+    
+    def close(self):
+        pass
+
+
+class _X11Target:
+    """通过XSendEvent向窗口发送合成的按键事件"""
+    
+    def __init__(self, window, x, y):
+        import Xlib.display
+        
+        self.window = window
+        self.x = x
+        self.y = y
+        # 每个目标使用自己的连接，只在调度线程上使用
+        self._display = Xlib.display.Display()
+        self._root = self._display.screen().root
+        self._window = self._display.create_resource_object("window", window)
+    
+    def _send(self, event_class, state):
+        from Xlib import X, error
+        
+        event = event_class(
+            time=X.CurrentTime, root=self._root, window=self._window, same_screen=1, child=X.NONE,
+            root_x=0, root_y=0, event_x=self.x, event_y=self.y, state=state, detail=1,
+        )
+        mask = X.ButtonPressMask if state == 0 else X.ButtonReleaseMask
+        try:
+            self._window.send_event(event, event_mask=mask, propagate=True)
+            self._display.sync()
+        except error.BadWindow:
+            raise TargetGoneError(f"window {self.window:#x} is gone")
+    
+    def press(self):
+        from Xlib.protocol import event
+        self._send(event.ButtonPress, 0)
+    
+    def release(self):
+        from Xlib import X
+        from Xlib.protocol import event
+        self._send(event.ButtonRelease, X.Button1Mask)
+    
+    def click(self):
+        self.press()
+        self.release()
+    
+    def close(self):
+        self._display.close()
+
+
+def create_target(window, x, y):
+    """
+    创建窗口点击目标
+    
+    Args:
+        window: 窗口句柄(Windows)或窗口ID(X11)
+        x, y: 相对于窗口的坐标
+    
+    Returns:
+        目标对象，提供press()、release()、click()和close()
+    """
+    if sys.platform == "win32":
+        return _Win32Target(window, x, y)
+    return _X11Target(window, x, y)
+
+
+def target_under_cursor():
+    """
+    获取光标下最深一层的窗口以及光标在该窗口中的坐标
+    
+    Returns:
+        tuple: (窗口, x, y)，无法获取时返回None
+    """
+    if sys.platform == "win32":
+        from ctypes import wintypes
+        
+        user32 = _user32()
+        point = wintypes.POINT()
+        if not user32.GetCursorPos(ctypes.byref(point)):
+            return None
+        hwnd = user32.WindowFromPoint(point)
+        if not hwnd or not user32.ScreenToClient(hwnd, ctypes.byref(point)):
+            return None
+        return hwnd, point.x, point.y
+    
+    try:
+        import Xlib.display
+    except ImportError:
+        return None
+    display = Xlib.display.Display()
+    try:
+        window = display.screen().root
+        pointer = window.query_pointer()
+        while pointer.child:
+            window = pointer.child
+            pointer = window.query_pointer()
+        return window.id, pointer.win_x, pointer.win_y
+    finally:
+        display.close()
+
+
+class TargetBurstJob(HeldBurstJob):
+    """
+    向窗口目标执行点击程序的调度任务
+    
+    沿用HeldBurstJob的时间表推进逻辑，不依赖引擎和用户按键，直到被取消或目标窗口关闭。
+    """
+    
+    def __init__(self, target_id, target, program, on_done=None):
+        super(TargetBurstJob, self).__init__(None, program)
+        self.target_id = target_id
+        self.target = target
+        self._on_done = on_done
+        # 取消可能发生在其他线程上，投递与关闭目标之间互斥
+        self._io_lock = threading.Lock()
+        self._closed = False
+    
+    def _deliver(self, action):
+        """投递一次按键动作，目标窗口关闭或任务已结束时返回False"""
+        try:
+            with self._io_lock:
+                if self._closed:
+                    return False
+                action()
+            return True
+        except TargetGoneError as e:
+            print(f"[DEBUG] 后台连点目标已关闭: {e}")
+        except Exception as e:
+            print(f"Error during targeted clicking: {e}")
+        return False
+    
+    def fire(self, now_ns):
+        target = self.target
+        if self.pressed:
+            self.pressed = False
+            if not self._deliver(target.release):
+                return None
+            return self._advance(now_ns)
+        
+        if self.count == 0:
+            self.base_ns = self.deadline_ns
+            self.start_ns = now_ns
+        hold_ns = self.program.holds[self.index]
+        if not self._deliver(target.press if hold_ns > 0 else target.click):
+            return None
+        self.count += 1
+        self.press_ns = self.deadline_ns
+        if hold_ns > 0:
+            self.pressed = True
+            return self.press_ns + hold_ns
+        return self._advance(now_ns)
+    
+    def on_finished(self):
+        # 在按下阶段被取消时补发释放
+        if self.pressed:
+            self.pressed = False
+            self._deliver(self.target.release)
+        with self._io_lock:
+            self._closed = True
+            self.target.close()
+        if self._on_done:
+            self._on_done(self)
+
+
+class TargetManager:
+    """管理同时进行的多个后台连点目标"""
+    
+    def __init__(self, scheduler):
+        """
+        初始化管理器
+        
+        Args:
+            scheduler: 与鼠标连点共用的截止时间调度器
+        """
+        self._scheduler = scheduler
+        self._lock = threading.Lock()
+        self._jobs = {}                 # 目标编号 -> TargetBurstJob
+        self._next_id = 1
+        self.on_finished = None         # 目标结束时调用，参数为任务
+    
+    def start(self, window, x, y, program):
+        """
+        开始向窗口连点
+        
+        Args:
+            window: 窗口句柄或窗口ID
+            x, y: 相对于窗口的坐标
+            program: 预编译的点击程序
+        
+        Returns:
+            int: 目标编号
+        """
+        target = create_target(window, x, y)
+        with self._lock:
+            target_id = self._next_id
+            self._next_id += 1
+            job = TargetBurstJob(target_id, target, program, self._job_finished)
+            self._jobs[target_id] = job
+        self._scheduler.submit(job)
+        return target_id
+    
+    def stop(self, target_id):
+        """
+        停止一个目标
+        
+        Args:
+            target_id: 目标编号
+        
+        Returns:
+            bool: 目标存在返回True
+        """
+        with self._lock:
+            job = self._jobs.get(target_id)
+        if job is None:
+            return False
+        self._scheduler.cancel(job)
+        return True
+    
+    def stop_all(self):
+        """停止所有目标"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            self._scheduler.cancel(job)
+    
+    def snapshot(self):
+        """
+        获取正在进行的目标
+        
+        Returns:
+            list: (编号, 窗口, x, y, 已点击次数)
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [(job.target_id, job.target.window, job.target.x, job.target.y, job.count) for job in jobs]
+    
+    def _job_finished(self, job):
+        """任务结束(取消或目标关闭)"""
+        with self._lock:
+            self._jobs.pop(job.target_id, None)
+        if self.on_finished:
+            self.on_finished(job)
@@ -9,12 +9,18 @@ RapidClicker - 自动连点工具
 import sys
 import os
 import ctypes
+import signal
+import socket
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import QSocketNotifier
 
 from utils.singleton import SingletonApp
 from utils.config import Config
+from utils.icon_cache import IconCache
 from core.tray_icon import SystemTrayIcon
+from core.mouse_handler import MouseHandler
+from core.flight_recorder import install_crash_dump, install_signal_dump
+from core.control import ControlServer, send_command
 from utils.constants import APP_ICON_PATH
 
 
@@ -26,15 +32,62 @@ def check_admin():
         return False
 
 
+def install_signal_wakeup(app):
+    """
+    让Qt事件循环在收到信号时立即执行Python信号处理函数
+    
+    Qt事件循环运行在C++中，Python信号处理函数要等到解释器再次执行字节码才会运行。
+    通过set_wakeup_fd把信号写入socket，由QSocketNotifier唤醒事件循环，不需要轮询定时器。
+    
+    Args:
+        app: QApplication实例
+    
+    Returns:
+        tuple: 需要保持引用的(读端socket, 写端socket, QSocketNotifier)
+    """
+    read_sock, write_sock = socket.socketpair()
+    read_sock.setblocking(False)
+    write_sock.setblocking(False)
+    signal.set_wakeup_fd(write_sock.fileno())
+    
+    notifier = QSocketNotifier(read_sock.fileno(), QSocketNotifier.Read, app)
+    notifier.activated.connect(lambda *args: read_sock.recv(64))
+    return read_sock, write_sock, notifier
+
+
+def run_control_command():
+    """
+    处理 --control "<命令>" 参数：把命令发送给运行中的实例并打印回复
+    
+    Returns:
+        bool: 命令行包含--control时返回True
+    """
+    if "--control" not in sys.argv:
+        return False
+    
+    index = sys.argv.index("--control")
+    line = " ".join(sys.argv[index + 1:]) or "help"
+    port = Config().get("control_port", 0)
+    if not port:
+        print("Control interface is disabled (control_port is 0)")
+        sys.exit(1)
+    try:
+        print(send_command(port, line))
+    except OSError as e:
+        print(f"Error sending control command: {e}")
+        sys.exit(1)
+    return True
+
+
 def main():
     """主程序入口"""
     # 初始化配置
-    Config()
+    config = Config()
     
     # 创建应用
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)  # 关闭所有窗口时不退出应用
-    app.setWindowIcon(QIcon(APP_ICON_PATH))
+    app.setWindowIcon(IconCache().icon(APP_ICON_PATH))
     
     # 确保程序只能运行一个实例
     singleton = SingletonApp("RapidClicker_Singleton_Lock")
@@ -46,11 +99,28 @@ def main():
     tray_icon = SystemTrayIcon()
     tray_icon.show()
     
+    # 崩溃或收到信号时导出飞行记录器
+    recorder = MouseHandler().recorder
+    install_crash_dump(recorder)
+    if install_signal_dump(recorder) is not None:
+        signal_wakeup = install_signal_wakeup(app)
+    
+    # 本地控制接口
+    control_port = config.get("control_port", 0)
+    if control_port:
+        control_server = ControlServer(control_port)
+        MouseHandler().register_control_commands(control_server)
+        control_server.start()
+    
     # 启动应用
     sys.exit(app.exec_())
 
 
 if __name__ == "__main__":
+    # 向运行中的实例发送控制命令，不需要管理员权限
+    if run_control_command():
+        sys.exit(0)
+    
     # 判断是否需要以管理员权限运行（在某些系统上可能需要）
     if not check_admin():
         params = " ".join([f'"{arg}"' for arg in sys.argv])
@@ -10,14 +10,17 @@ from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
     QPushButton, QGroupBox, QSizePolicy
 )
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon, QPixmap, QFont, QCursor
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont, QCursor
 
 from utils.constants import (
     APP_NAME, APP_VERSION, APP_AUTHOR, APP_GITHUB,
     APP_ICON_PATH, ABOUT_ICON_PATH
 )
+from utils.config import Config
+from utils.icon_cache import IconCache
 from utils.language import Language
+from core.mouse_handler import MouseHandler
 
 
 class ClickableLabel(QLabel):
@@ -47,6 +50,7 @@ class AboutDialog(QDialog):
         
         # 初始化语言
         self._lang = Language()
+        self._ui_language = Config().get("language", "en")  # 界面文本对应的语言
         
         # 设置窗口属性
         self._init_ui()
@@ -55,7 +59,7 @@ class AboutDialog(QDialog):
         """初始化UI"""
         # 设置窗口标题和图标
         self.setWindowTitle(self._lang.get("about_title"))
-        self.setWindowIcon(QIcon(APP_ICON_PATH))
+        self.setWindowIcon(IconCache().icon(APP_ICON_PATH))
         
         # 设置窗口属性（无最大化最小化按钮）
         self.setWindowFlags(Qt.Dialog | Qt.WindowCloseButtonHint | Qt.MSWindowsFixedSizeDialogHint)
@@ -70,7 +74,7 @@ class AboutDialog(QDialog):
         
         # 图标
         icon_label = QLabel()
-        icon_pixmap = QPixmap(ABOUT_ICON_PATH).scaled(QSize(80, 80), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        icon_pixmap = IconCache().pixmap(ABOUT_ICON_PATH, 80, 80)
         icon_label.setPixmap(icon_pixmap)
         top_layout.addWidget(icon_label)
         
@@ -159,6 +163,21 @@ class AboutDialog(QDialog):
         info_group.setLayout(info_layout)
         main_layout.addWidget(info_group)
         
+        # 使用统计组
+        self.usage_group = QGroupBox(self._lang.get("usage"))
+        self.usage_group.setFont(QFont("", 10, QFont.Bold))
+        usage_layout = QVBoxLayout()
+        usage_layout.setContentsMargins(20, 20, 20, 15)
+        
+        self.usage_label = QLabel()
+        self.usage_label.setWordWrap(True)
+        self.usage_label.setFont(version_font)
+        usage_layout.addWidget(self.usage_label)
+        
+        self.usage_group.setLayout(usage_layout)
+        main_layout.addWidget(self.usage_group)
+        self._update_usage()
+        
         # 底部按钮
         buttons_layout = QHBoxLayout()
         buttons_layout.addStretch()
@@ -176,7 +195,7 @@ class AboutDialog(QDialog):
         self.setLayout(main_layout)
         
         # 设置窗口尺寸
-        self.setFixedSize(600, 460)  # 再次增加窗口尺寸
+        self.setFixedSize(600, 590)  # 再次增加窗口尺寸
     
     def closeEvent(self, event):
         """重写关闭事件"""
@@ -184,9 +203,36 @@ class AboutDialog(QDialog):
     
     def resizeEvent(self, event):
         """重写大小调整事件，防止窗口大小变化"""
-        self.setFixedSize(600, 460)
+        self.setFixedSize(600, 590)
         event.accept()
     
+    def _update_usage(self):
+        """显示今天和本周的使用统计"""
+        stats = MouseHandler().stats
+        if stats is None:
+            self.usage_label.setText(self._lang.get("usage_disabled"))
+            return
+        
+        lines = []
+        for title_key, rollup in zip(("usage_today", "usage_week"), stats.summary()):
+            line = f"{self._lang.get(title_key)}: " + self._lang.format(
+                "usage_line", rollup["bursts"], rollup["clicks"], rollup["active_s"], rollup["cps"])
+            apps = {app: values for app, values in rollup["apps"].items() if app}
+            if apps:
+                top_app = max(apps, key=lambda app: apps[app]["clicks"])
+                line += f" ({self._lang.get('usage_top_app')} {top_app})"
+            lines.append(line)
+        self.usage_label.setText("\n".join(lines))
+    
+    def refresh(self):
+        """重新打开前刷新使用统计，语言变化时才更新界面文本"""
+        language = Config().get("language", "en")
+        if language != self._ui_language:
+            self._ui_language = language
+            self._update_ui_texts()
+        else:
+            self._update_usage()
+    
     def changeEvent(self, event):
         """处理语言变更事件"""
         if event.type() == event.LanguageChange:
@@ -202,6 +248,8 @@ class AboutDialog(QDialog):
         info_group = self.findChild(QGroupBox)
         if info_group:
             info_group.setTitle(self._lang.get("details"))
+        self.usage_group.setTitle(self._lang.get("usage"))
+        self._update_usage()
         
         # 更新标签
         self.version_title.setText(f"{self._lang.get('version')}:")
@@ -0,0 +1,372 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+点击速率校准对话框模块
+"""
+
+import math
+from array import array
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+    QPushButton, QGroupBox, QFrame, QWidget
+)
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QFont, QPainter, QColor, QPen
+
+from core.clock import NS_PER_MS
+from core.mouse_handler import MouseHandler
+from utils.constants import APP_ICON_PATH
+from utils.icon_cache import IconCache
+from utils.language import Language
+from utils.notify_bus import NotificationBus
+
+
+# 两次点击间隔超过该值时视为新的一组快速点击(毫秒)
+BURST_GAP_MS = 1000
+
+# 推荐的时间窗口相对测得p90的余量
+WINDOW_MARGIN = 1.25
+
+# 设置界面允许的取值范围
+MIN_TRIGGER_COUNT = 2
+MAX_TRIGGER_COUNT = 10
+MIN_TRIGGER_WINDOW_MS = 100
+MAX_TRIGGER_WINDOW_MS = 1000
+
+# 调度测试的时长(毫秒)，执行次数按请求的间隔换算，间隔较长时也不会让用户等待太久
+TEST_BURST_MS = 2000
+
+
+def _percentile(values, pct):
+    """计算百分位数"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def recommend_trigger(bursts, current_count):
+    """
+    根据用户的快速点击推荐触发次数和时间窗口
+    
+    对每个候选次数N统计所有连续N次按下的时间跨度，时间窗口取p90跨度加余量，
+    保证用户正常的快速点击能稳定触发；优先保留当前次数，窗口超出上限时减少次数。
+    次数至少为3，避免普通双击触发连点。
+    
+    Args:
+        bursts: 每组快速点击的按下时间列表(毫秒)
+        current_count: 当前的触发次数
+    
+    Returns:
+        tuple: (触发次数, 时间窗口毫秒)，样本不足时返回None
+    """
+    count = max(3, min(MAX_TRIGGER_COUNT, current_count))
+    while count >= 3:
+        spans = [
+            presses[i + count - 1] - presses[i]
+            for presses in bursts
+            for i in range(len(presses) - count + 1)
+        ]
+        if spans:
+            window = _percentile(spans, 90) * WINDOW_MARGIN
+            # 向上取整到50毫秒
+            window = int(math.ceil(window / 50.0) * 50)
+            if window <= MAX_TRIGGER_WINDOW_MS:
+                return count, max(MIN_TRIGGER_WINDOW_MS, window)
+        count -= 1
+    return None
+
+
+class HistogramWidget(QWidget):
+    """
+    间隔直方图
+    
+    样本增量地累加到固定数量的桶中，重绘只遍历桶，与样本总数无关。
+    """
+    
+    BINS = 40
+    
+    def __init__(self, parent=None):
+        super(HistogramWidget, self).__init__(parent)
+        self._counts = array("l", bytes(array("l").itemsize * self.BINS))
+        self._bin_ms = 1.0
+        self._marker_ms = None
+        self._total = 0
+        self.setMinimumHeight(110)
+    
+    def configure(self, max_ms, marker_ms=None):
+        """
+        清空并设置范围
+        
+        Args:
+            max_ms: 横轴上限(毫秒)，更大的样本计入最后一个桶
+            marker_ms: 标记线位置(毫秒)，如请求的间隔
+        """
+        for i in range(self.BINS):
+            self._counts[i] = 0
+        self._bin_ms = max(max_ms, 1.0) / self.BINS
+        self._marker_ms = marker_ms
+        self._total = 0
+        self.update()
+    
+    def add_samples(self, values_ms):
+        """
+        追加样本
+        
+        Args:
+            values_ms: 间隔(毫秒)
+        """
+        last = self.BINS - 1
+        for value in values_ms:
+            self._counts[min(last, max(0, int(value / self._bin_ms)))] += 1
+        self._total += len(values_ms)
+        self.update()
+    
+    def paintEvent(self, event):
+        """绘制直方图"""
+        painter = QPainter(self)
+        width, height = self.width(), self.height()
+        painter.fillRect(0, 0, width, height, QColor(250, 250, 250))
+        painter.setPen(QPen(QColor(200, 200, 200)))
+        painter.drawRect(0, 0, width - 1, height - 1)
+        
+        peak = max(self._counts) if self._total else 0
+        if peak:
+            bar_width = width / self.BINS
+            for i, count in enumerate(self._counts):
+                if count:
+                    bar_height = int((height - 4) * count / peak)
+                    painter.fillRect(int(i * bar_width) + 1, height - 2 - bar_height,
+                                     max(1, int(bar_width) - 1), bar_height, QColor(0, 120, 215))
+        
+        if self._marker_ms is not None:
+            x = int(width * self._marker_ms / (self._bin_ms * self.BINS))
+            painter.setPen(QPen(QColor(220, 50, 50), 2))
+            painter.drawLine(x, 0, x, height)
+        painter.end()
+
+
+class ClickPad(QFrame):
+    """记录按下时间的点击区域"""
+    
+    pressed = pyqtSignal(int)  # 按下时间(毫秒，来自系统事件时间戳)
+    
+    def __init__(self, parent=None):
+        super(ClickPad, self).__init__(parent)
+        self.setFrameShape(QFrame.StyledPanel)
+        self.setMinimumHeight(90)
+        self.setCursor(Qt.PointingHandCursor)
+        self.setStyleSheet("ClickPad { background-color: #eef5fc; }")
+    
+    def mousePressEvent(self, event):
+        """鼠标按下事件处理"""
+        if event.button() == Qt.LeftButton:
+            self.pressed.emit(event.timestamp())
+        event.accept()
+    
+    def mouseDoubleClickEvent(self, event):
+        """双击的第二次按下同样计入"""
+        self.mousePressEvent(event)
+
+
+class CalibrationDialog(QDialog):
+    """
+    点击速率校准对话框
+    
+    校准期间暂停连点触发。用户在点击区域内快速点击，对话框根据测得的
+    间隔分布推荐触发次数和时间窗口；测试连点在连点调度线程上按请求的
+    间隔运行(不注入点击)，直方图通过通知总线限速增量刷新。
+    """
+    
+    def __init__(self, trigger_count, click_interval_ms, parent=None):
+        """
+        初始化对话框
+        
+        Args:
+            trigger_count: 当前的触发次数
+            click_interval_ms: 当前的自动点击间隔(毫秒)
+        """
+        super(CalibrationDialog, self).__init__(parent)
+        
+        self._lang = Language()
+        self._mouse_handler = MouseHandler()
+        self._bus = NotificationBus()
+        
+        self._trigger_count = trigger_count
+        self._click_interval_ms = click_interval_ms
+        self._bursts = []               # 每组快速点击的按下时间
+        self._last_press_ms = None
+        self._recommendation = None
+        self._test_job = None
+        self._test_consumed = 0         # 已计入直方图的测试样本数
+        
+        self._init_ui()
+        
+        self._mouse_handler.set_trigger_enabled(False)
+        self._bus.subscribe("test_burst", self._on_test_burst_progress)
+    
+    def _init_ui(self):
+        """初始化UI"""
+        self.setWindowTitle(self._lang.get("calibration_title"))
+        self.setWindowIcon(IconCache().icon(APP_ICON_PATH))
+        self.setWindowFlags(Qt.Dialog | Qt.WindowCloseButtonHint | Qt.MSWindowsFixedSizeDialogHint)
+        
+        main_layout = QVBoxLayout()
+        main_layout.setSpacing(15)
+        main_layout.setContentsMargins(20, 20, 20, 20)
+        
+        # 点击采集
+        record_group = QGroupBox(self._lang.get("calibration_record"))
+        record_group.setFont(QFont("", 10, QFont.Bold))
+        record_layout = QVBoxLayout()
+        
+        hint_label = QLabel(self._lang.get("calibration_hint"))
+        hint_label.setWordWrap(True)
+        record_layout.addWidget(hint_label)
+        
+        self.pad = ClickPad()
+        self.pad.pressed.connect(self._on_pad_pressed)
+        record_layout.addWidget(self.pad)
+        
+        self.record_histogram = HistogramWidget()
+        self.record_histogram.configure(BURST_GAP_MS / 2)
+        record_layout.addWidget(self.record_histogram)
+        
+        self.record_stats_label = QLabel(self._lang.get("calibration_no_data"))
+        self.record_stats_label.setWordWrap(True)
+        record_layout.addWidget(self.record_stats_label)
+        
+        record_group.setLayout(record_layout)
+        main_layout.addWidget(record_group)
+        
+        # 测试连点
+        test_group = QGroupBox(self._lang.get("calibration_test"))
+        test_group.setFont(QFont("", 10, QFont.Bold))
+        test_layout = QVBoxLayout()
+        
+        self.test_histogram = HistogramWidget()
+        self.test_histogram.configure(self._click_interval_ms * 2, self._click_interval_ms)
+        test_layout.addWidget(self.test_histogram)
+        
+        self.test_stats_label = QLabel(self._lang.format("calibration_test_hint", self._click_interval_ms))
+        self.test_stats_label.setWordWrap(True)
+        test_layout.addWidget(self.test_stats_label)
+        
+        test_group.setLayout(test_layout)
+        main_layout.addWidget(test_group)
+        
+        # 按钮
+        buttons_layout = QHBoxLayout()
+        self.reset_button = QPushButton(self._lang.get("calibration_reset"))
+        self.reset_button.clicked.connect(self._reset_recording)
+        self.test_button = QPushButton(self._lang.get("calibration_run_test"))
+        self.test_button.clicked.connect(self._run_test_burst)
+        self.apply_button = QPushButton(self._lang.get("calibration_apply"))
+        self.apply_button.setEnabled(False)
+        self.apply_button.clicked.connect(self.accept)
+        self.close_button = QPushButton(self._lang.get("cancel"))
+        self.close_button.clicked.connect(self.reject)
+        
+        for button in (self.reset_button, self.test_button, self.apply_button, self.close_button):
+            button.setMinimumHeight(35)
+            buttons_layout.addWidget(button)
+        
+        main_layout.addLayout(buttons_layout)
+        self.setLayout(main_layout)
+        self.setFixedSize(520, 620)
+    
+    def recommendation(self):
+        """
+        获取推荐的触发参数
+        
+        Returns:
+            tuple: (触发次数, 时间窗口毫秒)，没有推荐时返回None
+        """
+        return self._recommendation
+    
+    def _on_pad_pressed(self, timestamp_ms):
+        """
+        点击区域按下处理
+        
+        Args:
+            timestamp_ms: 按下时间(毫秒)
+        """
+        if self._last_press_ms is None or timestamp_ms - self._last_press_ms > BURST_GAP_MS:
+            self._bursts.append([])
+        else:
+            self.record_histogram.add_samples((timestamp_ms - self._last_press_ms,))
+        self._bursts[-1].append(timestamp_ms)
+        self._last_press_ms = timestamp_ms
+        self._update_recommendation()
+    
+    def _update_recommendation(self):
+        """根据已采集的点击更新统计和推荐"""
+        gaps = [b - a for presses in self._bursts for a, b in zip(presses, presses[1:])]
+        if len(gaps) < 2:
+            return
+        
+        median = _percentile(gaps, 50)
+        text = self._lang.format(
+            "calibration_stats", len(gaps) + len(self._bursts), median, _percentile(gaps, 90), 1000.0 / max(median, 1))
+        
+        self._recommendation = recommend_trigger(self._bursts, self._trigger_count)
+        if self._recommendation is not None:
+            count, window = self._recommendation
+            text += "\n" + self._lang.format("calibration_recommend", count, window)
+        self.record_stats_label.setText(text)
+        self.apply_button.setEnabled(self._recommendation is not None)
+    
+    def _reset_recording(self):
+        """清空已采集的点击"""
+        self._bursts = []
+        self._last_press_ms = None
+        self._recommendation = None
+        self.record_histogram.configure(BURST_GAP_MS / 2)
+        self.record_stats_label.setText(self._lang.get("calibration_no_data"))
+        self.apply_button.setEnabled(False)
+    
+    def _run_test_burst(self):
+        """开始测试连点"""
+        if self._test_job is not None and not self._test_job.finished:
+            return
+        self._test_consumed = 0
+        self.test_histogram.configure(self._click_interval_ms * 2, self._click_interval_ms)
+        self.test_button.setEnabled(False)
+        # 至少两次执行才能得到一个间隔
+        clicks = max(2, int(TEST_BURST_MS / max(self._click_interval_ms, 1)))
+        self._test_job = self._mouse_handler.run_test_burst(self._click_interval_ms, clicks)
+    
+    def _on_test_burst_progress(self, count, merged):
+        """
+        测试连点进度通知处理，已经过通知总线合并限速
+        
+        Args:
+            count: 已执行的次数
+            merged: 合并的通知数量
+        """
+        job = self._test_job
+        if job is None:
+            return
+        
+        # 只处理上次刷新之后的新样本
+        times = job.times[:count]
+        start = max(1, self._test_consumed)
+        self.test_histogram.add_samples([(times[i] - times[i - 1]) / NS_PER_MS for i in range(start, len(times))])
+        self._test_consumed = len(times)
+        
+        if len(times) >= 2:
+            gaps = [(b - a) / NS_PER_MS for a, b in zip(times, times[1:])]
+            self.test_stats_label.setText(self._lang.format(
+                "calibration_test_stats", len(times), job.clicks, self._click_interval_ms,
+                sum(gaps) / len(gaps), _percentile(gaps, 99), 1000.0 * len(gaps) / max(sum(gaps), 1e-9)))
+        
+        if count >= job.clicks:
+            self.test_button.setEnabled(True)
+    
+    def done(self, result):
+        """关闭对话框时恢复连点触发并停止测试"""
+        self._bus.unsubscribe("test_burst", self._on_test_burst_progress)
+        if self._test_job is not None:
+            self._mouse_handler.cancel_test_burst(self._test_job)
+        self._mouse_handler.set_trigger_enabled(True)
+        super(CalibrationDialog, self).done(result)
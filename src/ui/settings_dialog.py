@@ -12,11 +12,21 @@ from PyQt5.QtWidgets import (
     QMessageBox
 )
 from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon, QFont
+from PyQt5.QtGui import QFont
 
 from utils.constants import APP_ICON_PATH, APP_NAME
+from utils.icon_cache import IconCache
 from utils.config import Config
 from utils.language import Language
+from ui.calibration_dialog import CalibrationDialog
+
+
+# 鼠标设置中可以被配置方案覆盖的配置项
+_MOUSE_KEYS = (
+    ("trigger_click_count", 5),
+    ("trigger_click_interval", 300),
+    ("auto_click_interval", 500),
+)
 
 
 class SettingsDialog(QDialog):
@@ -28,6 +38,7 @@ class SettingsDialog(QDialog):
         # 初始化
         self._config = Config()
         self._lang = Language()
+        self._ui_language = None  # 界面文本对应的语言，变化时才重新设置文本
         
         # 设置窗口属性
         self._init_ui()
@@ -40,7 +51,7 @@ class SettingsDialog(QDialog):
         """初始化UI"""
         # 设置窗口标题和图标
         self.setWindowTitle(self._lang.get("settings_title"))
-        self.setWindowIcon(QIcon(APP_ICON_PATH))
+        self.setWindowIcon(IconCache().icon(APP_ICON_PATH))
         
         # 设置窗口属性（无最大化最小化按钮）
         self.setWindowFlags(Qt.Dialog | Qt.WindowCloseButtonHint | Qt.MSWindowsFixedSizeDialogHint)
@@ -101,6 +112,12 @@ class SettingsDialog(QDialog):
         
         mouse_layout.addRow(self.auto_click_interval_label, self.auto_click_interval_spin)
         
+        # 校准按钮
+        self.calibrate_button = QPushButton(self._lang.get("calibrate"))
+        self.calibrate_button.setMinimumHeight(35)
+        self.calibrate_button.setFixedWidth(150)
+        mouse_layout.addRow(QLabel(""), self.calibrate_button)
+        
         mouse_group.setLayout(mouse_layout)
         main_layout.addWidget(mouse_group)
         
@@ -160,19 +177,60 @@ class SettingsDialog(QDialog):
         self.setLayout(main_layout)
         
         # 设置窗口尺寸
-        self.setFixedSize(550, 450)  # 再次增加窗口尺寸
+        self.setFixedSize(550, 510)  # 再次增加窗口尺寸
     
     def _connect_signals(self):
         """连接信号"""
         self.save_button.clicked.connect(self._save_settings)
         self.cancel_button.clicked.connect(self.reject)
+        self.calibrate_button.clicked.connect(self._show_calibration_dialog)
+    
+    def _show_calibration_dialog(self):
+        """打开校准对话框，接受时把推荐值填入表单(点击保存后生效)"""
+        dialog = CalibrationDialog(self.trigger_count_spin.value(), self.auto_click_interval_spin.value(), self)
+        if dialog.exec_() == QDialog.Accepted and dialog.recommendation() is not None:
+            count, window = dialog.recommendation()
+            self.trigger_count_spin.setValue(count)
+            self.trigger_interval_spin.setValue(window)
+    
+    def refresh(self):
+        """重新打开前从配置刷新表单，对话框关闭后只隐藏不销毁，未保存的修改被丢弃"""
+        self._load_settings()
+    
+    def _active_profile(self):
+        """
+        获取当前配置方案
+        
+        Returns:
+            tuple: (方案名称, 覆盖的参数)，使用顶层配置时返回("", None)
+        """
+        name = self._config.get("active_profile", "")
+        profile = self._config.get("profiles", {}).get(name) if name else None
+        return (name, profile) if profile is not None else ("", None)
+    
+    def _mouse_values(self):
+        """当前生效的鼠标设置：配置方案覆盖的参数优先，其余使用顶层配置"""
+        _, profile = self._active_profile()
+        values = {key: self._config.get(key, default) for key, default in _MOUSE_KEYS}
+        if profile:
+            values.update((key, profile[key]) for key, _ in _MOUSE_KEYS if key in profile)
+        return values
+    
+    def _update_mouse_group_title(self):
+        """鼠标设置组标题，编辑配置方案时显示方案名称"""
+        name, _ = self._active_profile()
+        title = self._lang.get("mouse_settings")
+        if name:
+            title = self._lang.format("mouse_settings_profile", title=title, profile=name)
+        self.findChild(QGroupBox, "", Qt.FindDirectChildrenOnly).setTitle(title)
     
     def _load_settings(self):
         """加载设置"""
-        # 鼠标设置
-        self.trigger_count_spin.setValue(self._config.get("trigger_click_count", 5))
-        self.trigger_interval_spin.setValue(self._config.get("trigger_click_interval", 300))
-        self.auto_click_interval_spin.setValue(self._config.get("auto_click_interval", 500))
+        # 鼠标设置(当前配置方案生效的值)
+        values = self._mouse_values()
+        self.trigger_count_spin.setValue(values["trigger_click_count"])
+        self.trigger_interval_spin.setValue(values["trigger_click_interval"])
+        self.auto_click_interval_spin.setValue(values["auto_click_interval"])
         
         # 应用设置
         language = self._config.get("language", "en")
@@ -183,15 +241,18 @@ class SettingsDialog(QDialog):
             
         self.auto_start_check.setChecked(self._config.get("auto_start", False))
         
-        # 更新标签文本
-        self._update_ui_texts()
+        # 语言变化时更新标签文本
+        if language != self._ui_language:
+            self._ui_language = language
+            self._update_ui_texts()
+        self._update_mouse_group_title()
     
     def _update_ui_texts(self):
         """更新UI文本为当前语言"""
         self.setWindowTitle(self._lang.get("settings_title"))
         
         # 更新组标题
-        self.findChild(QGroupBox, "", Qt.FindDirectChildrenOnly).setTitle(self._lang.get("mouse_settings"))
+        self._update_mouse_group_title()
         app_group = self.findChildren(QGroupBox, "", Qt.FindDirectChildrenOnly)[1]
         app_group.setTitle(self._lang.get("app_settings"))
         
@@ -199,6 +260,7 @@ class SettingsDialog(QDialog):
         self.trigger_count_label.setText(f"{self._lang.get('trigger_click_count')} ({self._lang.get('times')})")
         self.trigger_interval_label.setText(f"{self._lang.get('trigger_click_interval')} ({self._lang.get('ms')})")
         self.auto_click_interval_label.setText(f"{self._lang.get('auto_click_interval')} ({self._lang.get('ms')})")
+        self.calibrate_button.setText(self._lang.get("calibrate"))
         
         # 更新语言选项
         self.language_label.setText(self._lang.get("language"))
@@ -222,14 +284,21 @@ class SettingsDialog(QDialog):
         language = "en" if self.english_radio.isChecked() else "zh"
         auto_start = self.auto_start_check.isChecked()
         
-        # 更新配置
-        self._config.update({
+        mouse_values = {
             "trigger_click_count": trigger_count,
             "trigger_click_interval": trigger_interval,
             "auto_click_interval": auto_click_interval,
-            "language": language,
-            "auto_start": auto_start
-        })
+        }
+        
+        # 使用配置方案时鼠标设置保存到该方案，否则方案会覆盖保存的顶层参数
+        name, profile = self._active_profile()
+        if profile is not None:
+            profiles = dict(self._config.get("profiles", {}))
+            profiles[name] = dict(profile, **mouse_values)
+            mouse_values = {"profiles": profiles}
+        
+        # 更新配置
+        self._config.update(dict(mouse_values, language=language, auto_start=auto_start))
         
         # 保存配置
         if self._config.save_config():
@@ -256,5 +325,5 @@ class SettingsDialog(QDialog):
         
     def resizeEvent(self, event):
         """重写大小调整事件，防止窗口大小变化"""
-        self.setFixedSize(550, 450)
+        self.setFixedSize(550, 510)
         event.accept() 
\ No newline at end of file
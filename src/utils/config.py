@@ -6,9 +6,11 @@
 """
 
 import os
+import copy
 import json
 import sys
 import winreg
+import threading
 import subprocess
 from PyQt5.QtCore import QObject, pyqtSignal
 
@@ -36,6 +38,8 @@ class Config(QObject):
         # 初始化配置
         self._config_file = os.path.join(os.path.expanduser("~"), f".{APP_NAME.lower()}.json")
         self._config = self._load_config()
+        self._save_timer = None
+        self._save_lock = threading.Lock()
         self._initialized = True
     
     def _load_config(self):
@@ -44,22 +48,25 @@ class Config(QObject):
             if os.path.exists(self._config_file):
                 with open(self._config_file, 'r', encoding='utf-8') as f:
                     config = json.load(f)
-                    # 确保新添加的配置项也加入
+                    # 确保新添加的配置项也加入(深拷贝，避免修改嵌套的默认值)
                     for key, value in DEFAULT_CONFIG.items():
                         if key not in config:
-                            config[key] = value
+                            config[key] = copy.deepcopy(value)
                     return config
         except Exception as e:
             print(f"Error loading config: {e}")
         
-        # 如果配置文件不存在或加载失败，返回默认配置
-        return DEFAULT_CONFIG.copy()
+        # 如果配置文件不存在或加载失败，返回默认配置的深拷贝
+        return copy.deepcopy(DEFAULT_CONFIG)
     
     def save_config(self):
         """保存配置到文件"""
         try:
+            # 在锁内序列化，热键和控制接口线程可能同时通过set修改配置
+            with self._save_lock:
+                text = json.dumps(self._config, indent=4)
             with open(self._config_file, 'w', encoding='utf-8') as f:
-                json.dump(self._config, f, indent=4)
+                f.write(text)
                 
             # 保存自启动设置
             self._set_auto_start(self._config.get("auto_start", False))
@@ -71,17 +78,50 @@ class Config(QObject):
             print(f"Error saving config: {e}")
             return False
     
+    def save_in_background(self, delay_s=1.0):
+        """
+        延迟在后台线程上写入配置文件，用于频繁的内存修改(如切换配置方案)
+        
+        只写文件，不发送配置变更信号，也不更新自启动设置；
+        延迟期间的多次调用合并为一次写入。
+        
+        Args:
+            delay_s: 写入前等待的时间(秒)
+        """
+        with self._save_lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(delay_s, self._write_in_background)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def _write_in_background(self):
+        """后台写入线程：先写临时文件再替换，避免写到一半时退出损坏配置"""
+        try:
+            # 在锁内序列化，嵌套的配置项(如配置方案)不会在序列化途中被修改
+            with self._save_lock:
+                self._save_timer = None
+                text = json.dumps(self._config, indent=4)
+            temp_file = self._config_file + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temp_file, self._config_file)
+        except Exception as e:
+            print(f"Error saving config: {e}")
+    
     def get(self, key, default=None):
         """获取配置项"""
         return self._config.get(key, default)
     
     def set(self, key, value):
         """设置配置项"""
-        self._config[key] = value
+        with self._save_lock:
+            self._config[key] = value
     
     def update(self, new_config):
         """批量更新配置"""
-        self._config.update(new_config)
+        with self._save_lock:
+            self._config.update(new_config)
     
     def get_all(self):
         """获取所有配置"""
@@ -35,129 +35,97 @@ DEFAULT_CONFIG = {
     "trigger_click_count": 5,         # 触发连点的点击次数
     "trigger_click_interval": 300,    # 触发连点的时间间隔(毫秒)
     "auto_click_interval": 500,        # 自动连点的间隔时间(毫秒)
+    "click_program": "",             # 使用的点击程序名称，为空时按auto_click_interval固定间隔连点
+    "click_programs": {},            # 点击程序定义，格式见core/click_program.py
+    
+    # 输入设置
+    "input_source_mode": "buttons",  # 输入源模式(buttons仅订阅按键事件/all订阅全部指针事件)
+    
+    # 线程调度设置
+    "click_worker_cpus": [],         # 连点线程绑定的CPU编号，为空表示不绑定
+    "click_worker_priority": "normal",  # 连点线程优先级(normal/high/realtime)
+    "listener_cpus": [],             # 监听线程绑定的CPU编号，为空表示不绑定
+    "listener_priority": "normal",   # 监听线程优先级(normal/high/realtime)
+    
+    # 看门狗设置
+    "hook_budget_ms": 10,            # 钩子回调耗时预算(毫秒)
+    "hook_shed_ratio": 0.5,          # 回调p99超过预算的该比例时关闭日志、提示和事件记录
+    "watchdog_interval_ms": 1000,    # 看门狗检查周期(毫秒)，仅在有活动时运行
+    
+    # 诊断设置
+    "flight_recorder_size": 4096,    # 飞行记录器保留的状态变化条数
+    "profile_duration_s": 10,        # 采样分析时长(秒)
+    "profile_interval_ms": 5,        # 采样分析间隔(毫秒)
+    "control_port": 0,               # 本地控制接口端口，0表示关闭
+    "status_page_enabled": False,    # 把引擎状态发布到内存映射文件，供叠加层读取
+    "status_page_path": "",          # 状态页文件路径，为空时使用临时目录(Linux为/dev/shm)
+    "shadow_detectors": [],          # 影子评估的候选触发参数，如[[3, 250], [4, 300]]，结果见metrics
+    
+    # 自适应触发设置
+    "adaptive_trigger": False,       # 学习快速点击的节奏，节奏吻合时少于触发次数也提前触发
+    "adaptive_min_count": 3,         # 提前触发所需的最少按下次数
+    "adaptive_tolerance": 2.0,       # 间隔允许偏离学习均值的标准差倍数，越小越保守
+    "adaptive_min_samples": 20,      # 学到多少个间隔后才允许提前触发
+    "adaptive_confirm_hold_ms": 150, # 触发后按住超过该时长视为有意触发，否则计为误触发(毫秒)
+    "adaptive_cadence": {},          # 每个配置方案学到的节奏[均值毫秒, 方差, 样本数]，自动保存
+    
+    # 使用统计设置
+    "stats_enabled": True,           # 记录每次连点的使用统计
+    "stats_max_bytes": 1048576,      # 单个统计文件的大小上限(字节)，超过后轮转
+    "stats_keep_files": 3,           # 保留的已轮转统计文件数量
+    
+    # 滚轮连续滚动设置
+    "scroll_enabled": False,         # 同方向快速滚动后自动持续滚动
+    "scroll_trigger_count": 4,       # 触发所需的同方向滚轮刻度数
+    "scroll_trigger_interval": 250,  # 触发时间窗口(毫秒)
+    "scroll_repeat_interval": 30,    # 注入滚动的间隔(毫秒)
+    "scroll_notches_per_tick": 3,    # 每次注入合并的刻度数
+    "scroll_sustain_ms": 400,        # 停止滚动超过该时长后结束(毫秒)
+    
+    # 后台窗口连点设置
+    "target_capture_delay_s": 3,     # 从托盘菜单选择后等待多久再读取光标下的窗口(秒)
+    
+    # 有界连点设置(托盘菜单)
+    "bounded_clicks": 100,           # 点击次数，0表示只按时长限制
+    "bounded_duration_ms": 0,        # 时长(毫秒)，0表示只按次数限制
+    "bounded_start_delay_s": 3,      # 从托盘菜单选择后等待多久再开始(秒)，便于把光标移到目标位置
+    
+    # 宏录制与回放设置
+    "macro_path": "",                # 宏文件路径，为空时使用用户目录下的.rapidclicker_macro.bin
+    "macro_speed": 1.0,              # 回放速度倍数
+    "macro_loops": 1,                # 回放次数，0表示直到手动停止
+    
+    # 键盘连发设置
+    "keyboard_enabled": False,       # 快速连按某个键后按住时重复注入该键
+    "keyboard_keys": [],             # 允许连发的键，如["space", "e", "f1"]，为空时所有键都允许
+    "keyboard_trigger_count": 3,     # 触发连发的按键次数
+    "keyboard_trigger_interval": 300,  # 触发连发的时间窗口(毫秒)
+    "keyboard_repeat_interval": 50,  # 连发间隔(毫秒)
+    
+    # 配置方案设置
+    "profiles": {},                  # 配置方案定义，格式见core/profiles.py
+    "active_profile": "",            # 当前配置方案，为空时使用上面的顶层参数
+    "profile_hotkeys": {},           # 切换方案的全局热键，如{"<ctrl>+<alt>+1": "", "<ctrl>+<alt>+2": "fast"}
+    
+    # 按应用启用规则
+    "app_rules_mode": "off",         # off不限制，allow只在匹配的窗口中连点，deny在匹配的窗口中不连点
+    "app_rules": [],                 # 规则列表，如"process:game.exe"、"class:Notepad"，支持*和?通配符
+    
+    # 界面通知设置
+    "ui_frame_window_ms": 16,        # 通知合并的帧窗口(毫秒)
+    "ui_max_update_hz": 10,          # 界面通知的最大更新频率
     
     # 应用设置
     "language": "en",                # 默认语言(en/zh)
     "auto_start": False,             # 开机自启动
+    "keep_dialogs_warm": True,       # 启动后预先创建设置和关于对话框，关闭时只隐藏
+    "dialog_prebuild_delay_ms": 2000,  # 启动后多久预先创建对话框(毫秒)
     
     # 调试设置
     "debug_mode": False,             # 调试模式
 }
 
 # 语言设置
-LANGUAGES = {
-    "en": {
-        # 通用
-        "language": "Language",
-        "english": "English",
-        "chinese": "Chinese",
-        "save": "Save",
-        "cancel": "Cancel",
-        "ok": "OK",
-        "auto_start": "Auto Start",
-        
-        # 托盘菜单
-        "settings": "Settings",
-        "about": "About",
-        "exit": "Exit",
-        
-        # 设置窗口
-        "settings_title": "Settings",
-        "mouse_settings": "Mouse Settings",
-        "app_settings": "Application Settings",
-        "trigger_click_count": "Trigger Click Count",
-        "trigger_click_interval": "Trigger Time Window",
-        "auto_click_interval": "Auto Click Interval",
-        "ms": "ms",  # 毫秒单位
-        "times": " times",  # 次数单位
-        "settings_saved": "Settings saved successfully!",
-        
-        # 关于窗口
-        "about_title": "About RapidClicker",
-        "about_description": "RapidClicker is a tool for automatic mouse clicking.",
-        "version": "Version",
-        "author": "Author",
-        "github": "GitHub",
-        "details": "Details",
-        
-        # 调试信息
-        "debug_click_detected": "Click detected",
-        "debug_rapid_click_triggered": "Rapid click triggered",
-        "debug_rapid_click_stopped": "Rapid click stopped",
-        "debug_initial_config": "Initial config: trigger count={0}, trigger window={1}ms, click interval={2}ms",
-        "debug_click_recorded": "Mouse click recorded: queue size={0}",
-        "debug_rapid_mode_activated": "Rapid click mode activated",
-        "debug_rapid_click_started": "Long press detected, auto-clicking started",
-        "debug_release_detected": "Mouse release detected, stopping auto-click",
-        "debug_click_check": "Click detection: {0} clicks in {1}s (threshold: {2}s), result",
-        "debug_result": "result",
-        "debug_using_relaxed_condition": "Using relaxed trigger conditions",
-        "debug_using_persistence_condition": "Using persistence-based trigger condition",
-        "debug_auto_clicking_started": "Auto-clicking started",
-        "debug_auto_clicking_stopped": "Auto-clicking stopped",
-        "debug_clicks_performed": "Performed {count} clicks, average interval: {avg}ms",
-        "debug_config_updated": "Config updated: trigger count={0}, trigger window={1}ms, click interval={2}ms",
-        "debug_mode_timeout": "Rapid click mode timed out due to inactivity",
-        
-        # 错误消息
-        "error_invalid_input": "Invalid input value",
-        "error_already_running": "Application is already running!",
-    },
-    "zh": {
-        # 通用
-        "language": "语言",
-        "english": "英文",
-        "chinese": "中文",
-        "save": "保存",
-        "cancel": "取消",
-        "ok": "确定",
-        "auto_start": "开机自启动",
-        
-        # 托盘菜单
-        "settings": "设置",
-        "about": "关于",
-        "exit": "退出",
-        
-        # 设置窗口
-        "settings_title": "设置",
-        "mouse_settings": "鼠标设置",
-        "app_settings": "应用设置",
-        "trigger_click_count": "触发点击次数",
-        "trigger_click_interval": "触发时间窗口",
-        "auto_click_interval": "自动点击间隔",
-        "ms": "毫秒",  # 毫秒单位
-        "times": " 次",  # 次数单位
-        "settings_saved": "设置保存成功！",
-        
-        # 关于窗口
-        "about_title": "关于 RapidClicker",
-        "about_description": "RapidClicker 是一个自动鼠标连点工具。",
-        "version": "版本",
-        "author": "作者",
-        "github": "GitHub",
-        "details": "详细信息",
-        
-        # 调试信息
-        "debug_click_detected": "检测到点击",
-        "debug_rapid_click_triggered": "已触发连点",
-        "debug_rapid_click_stopped": "连点已停止",
-        "debug_initial_config": "初始配置: 触发点击次数={0}, 触发时间窗口={1}毫秒, 点击间隔={2}毫秒",
-        "debug_click_recorded": "记录鼠标点击: 当前队列大小={0}",
-        "debug_rapid_mode_activated": "快速点击模式已激活",
-        "debug_rapid_click_started": "检测到长按，开始自动连点",
-        "debug_release_detected": "检测到鼠标释放，停止连点",
-        "debug_click_check": "点击检测: {0}{1}在{2}秒内 (阈值: {3}秒), {4}",
-        "debug_result": "结果",
-        "debug_using_relaxed_condition": "使用宽松的触发条件",
-        "debug_using_persistence_condition": "使用持久性触发条件",
-        "debug_auto_clicking_started": "开始自动连点",
-        "debug_auto_clicking_stopped": "停止自动连点",
-        "debug_clicks_performed": "已连点{count}次, 平均间隔: {avg}毫秒",
-        "debug_config_updated": "配置已更新: 触发点击次数={0}, 触发时间窗口={1}毫秒, 点击间隔={2}毫秒",
-        "debug_mode_timeout": "快速点击模式因长时间不活动而超时",
-        
-        # 错误消息
-        "error_invalid_input": "输入值无效",
-        "error_already_running": "应用程序已在运行！",
-    }
-} 
+# 每种语言一个消息目录文件(assets/lang/<语言代码>.json)，运行时只加载正在使用的语言
+LANG_DIR = resource_path(os.path.join("assets", "lang"))
+FALLBACK_LANGUAGE = "en"               # 当前语言缺少某条消息时使用的语言
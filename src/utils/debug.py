@@ -12,6 +12,7 @@ from PyQt5.QtCore import Qt, QTimer, QPoint, QObject, pyqtSignal
 
 from utils.config import Config
 from utils.language import Language
+from utils.notify_bus import NotificationBus
 
 
 class Toast(QWidget):
@@ -39,21 +40,40 @@ class Toast(QWidget):
         
         self.layout.addWidget(self.label)
         
-        # 自动关闭定时器
+        # 自动关闭定时器，单次触发，隐藏后不再唤醒事件循环
         self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.hide)
+        
+        # 几何信息缓存，屏幕变化或提示尺寸变化时才重新计算位置
+        self._screen_geo = None
+        self._cached_size = None
+        desktop = QApplication.desktop()
+        desktop.resized.connect(self._invalidate_geometry)
+        desktop.screenCountChanged.connect(self._invalidate_geometry)
+    
+    def _invalidate_geometry(self, *args):
+        """屏幕变化时清除缓存的几何信息"""
+        self._screen_geo = None
+        self._cached_size = None
     
     def show_message(self, message, duration=1500):
         """显示消息"""
-        self.label.setText(message)
-        self.adjustSize()
+        if message != self.label.text():
+            self.label.setText(message)
+            self.adjustSize()
+        
+        if self._screen_geo is None:
+            self._screen_geo = QApplication.desktop().screenGeometry()
         
-        # 移动到屏幕右下角，保持在任务栏上方
-        screen_geo = QApplication.desktop().screenGeometry()
-        taskbar_height = 40  # 估计任务栏高度
-        x = screen_geo.width() - self.width() - 20
-        y = screen_geo.height() - self.height() - taskbar_height - 15  # 任务栏上方15像素
-        self.move(QPoint(x, y))
+        size = self.size()
+        if size != self._cached_size:
+            # 移动到屏幕右下角，保持在任务栏上方
+            self._cached_size = size
+            taskbar_height = 40  # 估计任务栏高度
+            x = self._screen_geo.width() - self.width() - 20
+            y = self._screen_geo.height() - self.height() - taskbar_height - 15  # 任务栏上方15像素
+            self.move(QPoint(x, y))
         
         self.show()
         
@@ -76,12 +96,13 @@ class DebugHelper(QObject):
     def __init__(self):
         if self._initialized:
             return
-            
+        
         super(DebugHelper, self).__init__()
         
         # 初始化
         self._config = Config()
         self._lang = Language()
+        self._bus = NotificationBus()
         self._toast = None
         
         # 检查是否在开发环境中
@@ -90,8 +111,9 @@ class DebugHelper(QObject):
         # 初始化完成标志
         self._initialized = True
         
-        # 连接调试消息信号
+        # 连接调试消息信号，消息经通知总线合并后在界面线程上发出
         self.debug_message.connect(self._on_debug_message)
+        self._bus.subscribe("toast", self._on_toast_notification)
     
     def is_debug_mode(self):
         """判断是否处于调试模式"""
@@ -111,8 +133,20 @@ class DebugHelper(QObject):
             # 输出到控制台
             print(f"[DEBUG] {message}")
             
-            # 发送消息信号
-            self.debug_message.emit(message)
+            # 投递到通知总线，同一帧窗口内的消息只显示最新一条
+            self._bus.post("toast", message)
+    
+    def _on_toast_notification(self, message, count):
+        """
+        通知总线派发的提示消息
+        
+        Args:
+            message: 最新的消息
+            count: 窗口内合并的消息数量
+        """
+        if count > 1:
+            message = f"{message} (x{count})"
+        self.debug_message.emit(message)
     
     def _on_debug_message(self, message):
         """处理调试消息"""
@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+前台应用查询模块
+"""
+
+import os
+import sys
+import ctypes
+import threading
+
+
+# Windows进程访问权限
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+# 前台窗口变化事件(SetWinEventHook)
+_EVENT_SYSTEM_FOREGROUND = 0x0003
+_WINEVENT_OUTOFCONTEXT = 0x0000
+_WM_QUIT = 0x0012
+
+# 进程名缓存的最大条目数
+_CACHE_SIZE = 256
+
+# 进程ID会被复用，缓存按(进程ID, 进程创建时间)区分同一ID的不同进程
+_name_cache = {}   # (进程ID, 创建时间) -> 可执行文件名
+
+_win32_dlls = None
+
+
+def _win32():
+    """
+    获取声明了函数原型的user32和kernel32
+    
+    句柄在64位系统上是指针宽度，不声明restype会被截断为32位整数。使用独立的WinDLL实例，
+    不修改ctypes.windll上其他模块共享的函数原型。
+    
+    Returns:
+        tuple: (user32, kernel32)
+    """
+    global _win32_dlls
+    if _win32_dlls is None:
+        from ctypes import wintypes
+        
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        user32.GetForegroundWindow.restype = wintypes.HWND
+        user32.GetForegroundWindow.argtypes = []
+        user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+        user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+        user32.GetClassNameW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+        
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        kernel32.GetProcessTimes.argtypes = [wintypes.HANDLE] + [ctypes.POINTER(ctypes.c_uint64)] * 4
+        kernel32.QueryFullProcessImageNameW.argtypes = [
+            wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)]
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        _win32_dlls = (user32, kernel32)
+    return _win32_dlls
+
+
+def query_foreground_app():
+    """
+    查询前台窗口所属应用的可执行文件名，涉及打开进程等较慢的调用，不要在钩子或连点线程上调用
+    
+    Returns:
+        str: 小写的可执行文件名(如"notepad.exe")，无法获取时返回空字符串
+    """
+    try:
+        if sys.platform == "win32":
+            pid = _window_pid_windows(_win32()[0].GetForegroundWindow())
+        else:
+            pid = _active_window_pid_x11()
+    except Exception as e:
+        print(f"Error querying foreground app: {e}")
+        return ""
+    return _cached_process_name(pid)
+
+
+def _window_pid_windows(hwnd):
+    """获取窗口所属的进程ID"""
+    if not hwnd:
+        return 0
+    from ctypes import wintypes
+    
+    pid = wintypes.DWORD()
+    _win32()[0].GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    return pid.value
+
+
+def _active_window_pid_x11():
+    """通过_NET_ACTIVE_WINDOW和_NET_WM_PID获取X11前台窗口的进程ID"""
+    try:
+        import Xlib.display
+    except ImportError:
+        return 0
+    display = Xlib.display.Display()
+    try:
+        root = display.screen().root
+        active = root.get_full_property(display.intern_atom("_NET_ACTIVE_WINDOW"), 0)
+        if not active or not active.value or not active.value[0]:
+            return 0
+        window = display.create_resource_object("window", active.value[0])
+        pid = window.get_full_property(display.intern_atom("_NET_WM_PID"), 0)
+        return pid.value[0] if pid and pid.value else 0
+    finally:
+        display.close()
+
+
+def _window_class_windows(hwnd):
+    """获取窗口类名"""
+    if not hwnd:
+        return ""
+    buffer = ctypes.create_unicode_buffer(256)
+    if not _win32()[0].GetClassNameW(hwnd, buffer, 256):
+        return ""
+    return buffer.value
+
+
+def _cached_process_name(pid):
+    """
+    带缓存的进程名查询，缓存按进程创建时间区分复用了同一进程ID的进程
+    
+    Args:
+        pid: 进程ID
+    
+    Returns:
+        str: 小写的可执行文件名，失败时返回空字符串
+    """
+    if not pid:
+        return ""
+    if sys.platform == "win32":
+        return _cached_process_name_windows(pid)
+    
+    started = _process_start_time_linux(pid)
+    if started is None:
+        return ""
+    return _cache_lookup((pid, started), lambda: _process_name_linux(pid))
+
+
+def _cache_lookup(key, lookup):
+    """查询缓存，未命中时调用lookup获取进程名并写入缓存"""
+    name = _name_cache.get(key)
+    if name is None:
+        name = lookup()
+        if len(_name_cache) >= _CACHE_SIZE:
+            _name_cache.clear()
+        _name_cache[key] = name
+    return name
+
+
+def _cached_process_name_windows(pid):
+    """Windows实现：同一个进程句柄上先取创建时间作为缓存键，未命中时再查询映像路径"""
+    from ctypes import wintypes
+    
+    _, kernel32 = _win32()
+    handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return ""
+    try:
+        creation, exit_time, kernel, user = (ctypes.c_uint64() for _ in range(4))
+        if not kernel32.GetProcessTimes(handle, ctypes.byref(creation), ctypes.byref(exit_time),
+                                        ctypes.byref(kernel), ctypes.byref(user)):
+            return ""
+        
+        def image_name():
+            size = wintypes.DWORD(260)
+            buffer = ctypes.create_unicode_buffer(size.value)
+            if not kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+                return ""
+            return os.path.basename(buffer.value).lower()
+        
+        return _cache_lookup((pid, creation.value), image_name)
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _process_start_time_linux(pid):
+    """
+    获取进程的启动时间(/proc/<pid>/stat第22个字段，开机后的时钟滴答数)
+    
+    Returns:
+        int: 启动时间，进程不存在时返回None
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="utf-8") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # 第2个字段是括号中的进程名，可能包含空格，从最后一个右括号之后开始数
+    fields = stat[stat.rfind(")") + 2:].split()
+    try:
+        return int(fields[19])
+    except (IndexError, ValueError):
+        return None
+
+
+def _process_name_linux(pid):
+    """获取进程名，失败时返回空字符串"""
+    try:
+        with open(f"/proc/{pid}/comm", "r", encoding="utf-8") as f:
+            return f.read().strip().lower()
+    except OSError:
+        return ""
+
+
+class ForegroundTracker:
+    """
+    前台窗口跟踪器
+    
+    在自己的线程上等待系统的前台窗口变化通知(Windows上为EVENT_SYSTEM_FOREGROUND，
+    X11上为根窗口_NET_ACTIVE_WINDOW属性变化)，变化时查询一次进程名和窗口类名并缓存，
+    然后调用on_change。其他线程只读取缓存，不产生任何系统调用。
+    """
+    
+    def __init__(self, on_change=None):
+        """
+        初始化跟踪器
+        
+        Args:
+            on_change: 前台窗口变化时在跟踪线程上调用，参数为(进程名, 窗口类名)
+        """
+        self.on_change = on_change
+        self.process = ""        # 当前前台窗口的小写进程名
+        self.window_class = ""   # 当前前台窗口的类名
+        self._thread = None
+        self._thread_id = 0
+        self._running = False
+    
+    def start(self):
+        """
+        启动跟踪线程
+        
+        Returns:
+            bool: 当前平台支持前台窗口通知时返回True
+        """
+        if self._thread is not None:
+            return True
+        if sys.platform == "win32":
+            target = self._run_windows
+        else:
+            try:
+                import Xlib.display  # noqa: F401
+            except ImportError:
+                print("[DEBUG] python-xlib未安装，无法跟踪前台窗口")
+                return False
+            target = self._run_x11
+        self._running = True
+        self._thread = threading.Thread(target=target, name="RapidClickForeground", daemon=True)
+        self._thread.start()
+        return True
+    
+    def stop(self):
+        """停止跟踪线程"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._running = False
+        if sys.platform == "win32" and self._thread_id:
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, _WM_QUIT, 0, 0)
+            thread.join(1.0)
+        # X11线程阻塞在next_event上，是守护线程，在下一个事件到来时退出
+        self._thread = None
+    
+    def _update(self, process, window_class):
+        """缓存新的前台窗口身份并通知"""
+        if process == self.process and window_class == self.window_class:
+            return
+        self.process = process
+        self.window_class = window_class
+        if self.on_change is not None:
+            try:
+                self.on_change(process, window_class)
+            except Exception as e:
+                print(f"Error handling foreground change: {e}")
+    
+    def _update_windows(self, hwnd):
+        """根据窗口句柄更新缓存"""
+        self._update(_cached_process_name(_window_pid_windows(hwnd)), _window_class_windows(hwnd))
+    
+    def _run_windows(self):
+        """Windows跟踪线程：注册WinEvent钩子并运行消息循环"""
+        from ctypes import wintypes
+        
+        user32 = _win32()[0]
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD,
+        )
+        
+        def callback(hook, event, hwnd, id_object, id_child, thread, time_ms):
+            if hwnd:
+                self._update_windows(hwnd)
+        
+        # 回调对象必须在钩子存在期间保持引用
+        proc = WinEventProc(callback)
+        hook = user32.SetWinEventHook(
+            _EVENT_SYSTEM_FOREGROUND, _EVENT_SYSTEM_FOREGROUND, 0, proc, 0, 0, _WINEVENT_OUTOFCONTEXT)
+        if not hook:
+            print("Error registering foreground window hook")
+            return
+        try:
+            self._update_windows(user32.GetForegroundWindow())
+            msg = wintypes.MSG()
+            while self._running and user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            user32.UnhookWinEvent(hook)
+    
+    def _run_x11(self):
+        """X11跟踪线程：监听根窗口的_NET_ACTIVE_WINDOW属性变化"""
+        import Xlib.display
+        from Xlib import X
+        
+        try:
+            display = Xlib.display.Display()
+        except Exception as e:
+            print(f"Error opening X display: {e}")
+            return
+        try:
+            root = display.screen().root
+            active_atom = display.intern_atom("_NET_ACTIVE_WINDOW")
+            pid_atom = display.intern_atom("_NET_WM_PID")
+            root.change_attributes(event_mask=X.PropertyChangeMask)
+            
+            def refresh():
+                active = root.get_full_property(active_atom, 0)
+                if not active or not active.value or not active.value[0]:
+                    self._update("", "")
+                    return
+                window = display.create_resource_object("window", active.value[0])
+                pid = window.get_full_property(pid_atom, 0)
+                wm_class = window.get_wm_class()
+                self._update(
+                    _cached_process_name(pid.value[0] if pid and pid.value else 0),
+                    wm_class[1] if wm_class else "",
+                )
+            
+            refresh()
+            while self._running:
+                event = display.next_event()
+                if event.type == X.PropertyNotify and event.atom == active_atom:
+                    try:
+                        refresh()
+                    except Exception as e:
+                        # 窗口可能在查询前已关闭
+                        print(f"Error querying active window: {e}")
+        except Exception as e:
+            print(f"Error tracking foreground window: {e}")
+        finally:
+            display.close()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+图标缓存模块
+
+所有图标和图片在启动时解码一次并保存在内存中，之后创建菜单、打开对话框和切换托盘
+状态图标都只是取出缓存的对象，不读文件也不解码图片。必须在QApplication创建之后使用。
+"""
+
+from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor, QPen
+from PyQt5.QtCore import Qt, QSize
+
+from utils.constants import APP_ICON_PATH, ABOUT_ICON_PATH, SETTINGS_ICON_PATH, EXIT_ICON_PATH
+
+
+# 托盘状态图标
+STATE_IDLE = "idle"          # 等待触发
+STATE_CLICKING = "clicking"  # 正在连点
+STATE_PAUSED = "paused"      # 暂停触发(校准中或前台应用被规则禁止)
+
+# 生成状态图标时使用的尺寸
+_STATE_ICON_SIZES = (16, 20, 24, 32, 48)
+
+# 状态标记颜色
+_STATE_COLORS = {
+    STATE_CLICKING: QColor(0, 200, 83),
+}
+
+
+class IconCache:
+    """图标缓存，单例模式实现"""
+    
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(IconCache, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+    
+    def __init__(self):
+        if self._initialized:
+            return
+        
+        self._icons = {}         # 文件路径 -> QIcon
+        self._pixmaps = {}       # (文件路径, 宽, 高) -> QPixmap
+        self._state_icons = {}   # 状态 -> QIcon
+        self._initialized = True
+    
+    def preload(self):
+        """解码所有资源图标并生成托盘状态图标"""
+        for path in (APP_ICON_PATH, ABOUT_ICON_PATH, SETTINGS_ICON_PATH, EXIT_ICON_PATH):
+            self.icon(path)
+        for state in (STATE_IDLE, STATE_CLICKING, STATE_PAUSED):
+            self.state_icon(state)
+    
+    def icon(self, path):
+        """
+        获取图标
+        
+        Args:
+            path: 图标文件路径
+        
+        Returns:
+            QIcon: 已解码的图标
+        """
+        icon = self._icons.get(path)
+        if icon is None:
+            icon = self._icons[path] = self._decode_icon(path)
+        return icon
+    
+    def pixmap(self, path, width, height):
+        """
+        获取按比例缩放后的图片
+        
+        Args:
+            path: 图片文件路径
+            width, height: 最大尺寸
+        
+        Returns:
+            QPixmap: 缩放后的图片
+        """
+        key = (path, width, height)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(path).scaled(QSize(width, height), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self._pixmaps[key] = pixmap
+        return pixmap
+    
+    def state_icon(self, state):
+        """
+        获取托盘状态图标
+        
+        Args:
+            state: STATE_IDLE、STATE_CLICKING或STATE_PAUSED
+        
+        Returns:
+            QIcon: 状态图标
+        """
+        icon = self._state_icons.get(state)
+        if icon is None:
+            icon = self._state_icons[state] = self._make_state_icon(state)
+        return icon
+    
+    def _decode_icon(self, path):
+        """把图标文件的各个尺寸解码为内存中的图片，避免QIcon在首次绘制时才读取文件"""
+        source = QIcon(path)
+        sizes = source.availableSizes() or [QSize(size, size) for size in _STATE_ICON_SIZES]
+        icon = QIcon()
+        for size in sizes:
+            icon.addPixmap(source.pixmap(size))
+        return icon
+    
+    def _make_state_icon(self, state):
+        """在应用图标上绘制状态标记"""
+        base = self.icon(APP_ICON_PATH)
+        if state == STATE_IDLE:
+            return base
+        
+        icon = QIcon()
+        for size in _STATE_ICON_SIZES:
+            if state == STATE_PAUSED:
+                # 暂停时使用灰色的禁用样式
+                icon.addPixmap(base.pixmap(QSize(size, size), QIcon.Disabled))
+                continue
+            
+            pixmap = QPixmap(base.pixmap(QSize(size, size)))
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            dot = max(5, size * 2 // 5)
+            painter.setPen(QPen(Qt.white, max(1, size // 16)))
+            painter.setBrush(_STATE_COLORS[state])
+            painter.drawEllipse(pixmap.width() - dot - 1, pixmap.height() - dot - 1, dot, dot)
+            painter.end()
+            icon.addPixmap(pixmap)
+        return icon
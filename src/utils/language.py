@@ -3,12 +3,72 @@
 
 """
 语言工具模块，处理多语言支持
+
+消息目录按语言存放在独立的文件中(assets/lang/<语言代码>.json)，只在使用时加载当前语言：
+    加载时把后备语言(英语)合并进来，查找只需要一次字典访问
+    含有占位符的模板在加载时解析校验并绑定格式化方法，格式化只是一次调用
+新增语言只增加一个文件，不使用该语言的用户不需要为它付出启动时间和内存。
 """
 
-from utils.constants import LANGUAGES
+import os
+import json
+import string
+
+from utils.constants import LANG_DIR, FALLBACK_LANGUAGE
 from utils.config import Config
 
 
+def _catalog_path(language):
+    """获取语言消息目录文件路径"""
+    return os.path.join(LANG_DIR, f"{language}.json")
+
+
+def _read_catalog(language):
+    """
+    读取语言消息目录
+    
+    Args:
+        language: 语言代码
+    
+    Returns:
+        dict: 键 -> 文本，文件不存在或无法解析时返回空字典
+    """
+    try:
+        with open(_catalog_path(language), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Error loading language catalog {language}: {e}")
+        return {}
+
+
+def _compile_templates(messages):
+    """
+    预先解析含有占位符的模板
+    
+    Args:
+        messages: 键 -> 文本
+    
+    Returns:
+        dict: 键 -> 绑定的str.format方法，占位符无效的模板按普通文本处理
+    """
+    formatter = string.Formatter()
+    templates = {}
+    for key, text in messages.items():
+        if "{" not in text:
+            continue
+        try:
+            # parse是惰性的，遍历一遍才会检查出不成对的花括号
+            for _ in formatter.parse(text):
+                pass
+        except ValueError as e:
+            print(f"Error parsing message template {key}: {e}")
+            continue
+        templates[key] = text.format
+    return templates
+
+
 class Language:
     """语言工具类，实现为单例模式"""
     
@@ -23,10 +83,13 @@ class Language:
     def __init__(self):
         if self._initialized:
             return
-            
+        
         # 获取配置中的语言设置
         self._config = Config()
         self._current_language = self._config.get("language", "en")
+        self._messages = {}      # 键 -> 文本(已合并后备语言)
+        self._templates = {}     # 键 -> 预解析的格式化方法
+        self._load(self._current_language)
         
         # 初始化完成标志
         self._initialized = True
@@ -34,25 +97,47 @@ class Language:
         # 注册配置变更事件
         self._config.config_changed.connect(self._on_config_changed)
     
+    def _load(self, language):
+        """
+        加载语言消息目录，并合并后备语言
+        
+        Args:
+            language: 语言代码
+        """
+        messages = _read_catalog(FALLBACK_LANGUAGE)
+        if language != FALLBACK_LANGUAGE:
+            messages.update(_read_catalog(language))
+        self._messages = messages
+        self._templates = _compile_templates(messages)
+        print(f"[DEBUG] 已加载语言消息目录: {language} ({len(messages)}条)")
+    
     def get(self, key):
         """
         获取指定key的翻译文本
         
         Args:
             key: 翻译键值
-            
+        
         Returns:
             str: 翻译后的文本，如果未找到则返回键值本身
         """
-        if self._current_language in LANGUAGES and key in LANGUAGES[self._current_language]:
-            return LANGUAGES[self._current_language][key]
+        return self._messages.get(key, key)
+    
+    def format(self, key, *args, **kwargs):
+        """
+        获取指定key的翻译文本并填入参数
+        
+        Args:
+            key: 翻译键值
+            *args, **kwargs: 模板参数
         
-        # 如果当前语言没有对应翻译，尝试使用英语
-        if "en" in LANGUAGES and key in LANGUAGES["en"]:
-            return LANGUAGES["en"][key]
-            
-        # 如果都没有找到，返回键值本身
-        return key
+        Returns:
+            str: 格式化后的文本，没有占位符的文本原样返回
+        """
+        template = self._templates.get(key)
+        if template is None:
+            return self._messages.get(key, key)
+        return template(*args, **kwargs)
     
     def set_language(self, language):
         """
@@ -61,8 +146,9 @@ class Language:
         Args:
             language: 语言代码(en/zh)
         """
-        if language in LANGUAGES:
+        if os.path.exists(_catalog_path(language)):
             self._current_language = language
+            self._load(language)
             self._config.set("language", language)
             self._config.save_config()
     
@@ -79,4 +165,5 @@ class Language:
         """配置变更处理"""
         new_language = self._config.get("language", "en")
         if new_language != self._current_language:
-            self._current_language = new_language 
\ No newline at end of file
+            self._current_language = new_language
+            self._load(new_language)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+界面通知总线模块，合并并限速从工作线程发往界面线程的通知
+"""
+
+import threading
+import time
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from utils.config import Config
+
+
+class NotificationBus(QObject):
+    """
+    合并、限速的通知总线，单例模式实现，必须在界面线程上首次创建
+    
+    任意线程都可以按主题投递通知。状态主题(post)在一个帧窗口内只保留最新的值，
+    被覆盖的通知直接丢弃；事件主题(post_event)的每个通知都按投递顺序派发，
+    只在窗口内积压过多时丢弃最早的。界面线程按不超过ui_max_update_hz的频率统一派发，
+    每个帧窗口最多产生一次跨线程事件。
+    """
+    
+    # 每个事件主题在一个窗口内最多保留的通知数量
+    MAX_EVENTS = 16
+    
+    _instance = None
+    _flush_requested = pyqtSignal()  # 跨线程请求界面线程安排派发
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(NotificationBus, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+    
+    def __init__(self):
+        if self._initialized:
+            return
+        
+        super(NotificationBus, self).__init__()
+        
+        self._config = Config()
+        self._lock = threading.Lock()
+        self._pending = {}            # 主题 -> 最新值
+        self._counts = {}             # 主题 -> 窗口内合并的通知数量
+        self._events = {}             # 事件主题 -> 窗口内的通知队列(从早到晚)
+        self._dropped = {}            # 事件主题 -> 窗口内因积压丢弃的通知数量
+        self._subscribers = {}        # 主题 -> 回调列表
+        self._flush_scheduled = False
+        self._last_flush = 0.0
+        
+        # 派发定时器，单次触发
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+        
+        self._initialized = True
+        
+        self._flush_requested.connect(self._schedule_flush)
+    
+    def subscribe(self, topic, callback):
+        """
+        订阅主题，回调在界面线程上以(最新值, 合并数量)调用，事件主题的合并数量始终为1
+        
+        Args:
+            topic: 主题名称
+            callback: 回调函数
+        """
+        self._subscribers.setdefault(topic, []).append(callback)
+    
+    def unsubscribe(self, topic, callback):
+        """
+        取消订阅，生命周期短于总线的对象(如对话框)关闭时调用
+        
+        Args:
+            topic: 主题名称
+            callback: 订阅时传入的回调函数
+        """
+        callbacks = self._subscribers.get(topic, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+    
+    def post(self, topic, value):
+        """
+        投递通知，可在任意线程调用
+        
+        Args:
+            topic: 主题名称
+            value: 通知内容，同一窗口内的旧值会被覆盖
+        """
+        with self._lock:
+            self._pending[topic] = value
+            self._counts[topic] = self._counts.get(topic, 0) + 1
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self._flush_requested.emit()
+    
+    def post_event(self, topic, value):
+        """
+        投递一次性事件(如任务结束)，可在任意线程调用，不同的通知不会互相覆盖
+        
+        Args:
+            topic: 主题名称
+            value: 通知内容
+        """
+        with self._lock:
+            queue = self._events.get(topic)
+            if queue is None:
+                queue = self._events[topic] = deque()
+            if len(queue) >= self.MAX_EVENTS:
+                queue.popleft()
+                self._dropped[topic] = self._dropped.get(topic, 0) + 1
+            queue.append(value)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self._flush_requested.emit()
+    
+    def _schedule_flush(self):
+        """在界面线程上安排一次派发"""
+        frame_window = self._config.get("ui_frame_window_ms", 16) / 1000.0
+        min_interval = 1.0 / max(1, self._config.get("ui_max_update_hz", 10))
+        now = time.monotonic()
+        delay = max(frame_window, self._last_flush + min_interval - now)
+        self._timer.start(int(delay * 1000))
+    
+    def _flush(self):
+        """派发窗口内合并后的通知"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            counts, self._counts = self._counts, {}
+            events, self._events = self._events, {}
+            dropped, self._dropped = self._dropped, {}
+            self._flush_scheduled = False
+        self._last_flush = time.monotonic()
+        
+        for topic, value in pending.items():
+            self._dispatch(topic, value, counts.get(topic, 1))
+        for topic, queue in events.items():
+            if topic in dropped:
+                print(f"[DEBUG] 通知主题{topic}积压过多，丢弃了{dropped[topic]}个最早的事件")
+            for value in queue:
+                self._dispatch(topic, value, 1)
+    
+    def _dispatch(self, topic, value, count):
+        """
+        把一个通知派发给主题的所有订阅者
+        
+        Args:
+            topic: 主题名称
+            value: 通知内容
+            count: 合并的通知数量
+        """
+        for callback in tuple(self._subscribers.get(topic, ())):
+            try:
+                callback(value, count)
+            except Exception as e:
+                print(f"Error dispatching notification {topic}: {e}")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+采样分析器模块，在运行中的程序内按需采样各线程调用栈并统计线程CPU时间
+"""
+
+import os
+import sys
+import time
+import ctypes
+import threading
+from collections import Counter
+
+from utils.constants import APP_NAME
+
+
+# Windows线程访问权限
+_THREAD_QUERY_LIMITED_INFORMATION = 0x0800
+
+
+def thread_cpu_times():
+    """
+    获取当前进程中各Python线程已消耗的CPU时间
+    
+    Returns:
+        dict: 线程名 -> CPU时间(秒)，无法获取的线程不包含在内
+    """
+    times = {}
+    for thread in threading.enumerate():
+        seconds = _thread_cpu_time(thread)
+        if seconds is not None:
+            times[thread.name] = seconds
+    return times
+
+
+def _thread_cpu_time(thread):
+    """
+    获取单个线程的CPU时间(用户态+内核态)
+    
+    Args:
+        thread: threading.Thread实例
+    
+    Returns:
+        float: CPU时间(秒)，失败时返回None
+    """
+    if sys.platform == "win32":
+        return _thread_cpu_time_windows(thread.native_id)
+    
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+    except (AttributeError, OSError, TypeError):
+        return None
+
+
+def _thread_cpu_time_windows(native_id):
+    """Windows实现：OpenThread/GetThreadTimes，时间单位为100纳秒"""
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.OpenThread.restype = ctypes.c_void_p
+    kernel32.OpenThread.argtypes = [ctypes.c_uint32, ctypes.c_int, ctypes.c_uint32]
+    kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+    
+    handle = kernel32.OpenThread(_THREAD_QUERY_LIMITED_INFORMATION, False, native_id)
+    if not handle:
+        return None
+    try:
+        creation, exit_time, kernel, user = (ctypes.c_uint64() for _ in range(4))
+        if not kernel32.GetThreadTimes(ctypes.c_void_p(handle), ctypes.byref(creation), ctypes.byref(exit_time),
+                                       ctypes.byref(kernel), ctypes.byref(user)):
+            return None
+        return (kernel.value + user.value) / 1e7
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+class SamplingProfiler:
+    """
+    按需启动的采样分析器
+    
+    在独立线程上按固定间隔读取sys._current_frames()，把各线程的调用栈
+    合并成折叠栈格式(可直接交给flamegraph.pl或speedscope)。被采样线程
+    不做任何插桩，开销只有采样线程自身的执行时间；不在分析时不存在该线程。
+    """
+    
+    def __init__(self, interval_ms=5):
+        """
+        初始化分析器
+        
+        Args:
+            interval_ms: 采样间隔(毫秒)
+        """
+        self._interval = interval_ms / 1000.0
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def is_running(self):
+        """
+        检查是否正在采样
+        
+        Returns:
+            bool: 正在采样返回True
+        """
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+    
+    def start(self, duration_s, path=None, on_finished=None):
+        """
+        开始一次采样，在duration_s秒后自动结束并写入文件
+        
+        Args:
+            duration_s: 采样时长(秒)
+            path: 折叠栈文件路径，默认写入用户目录；CPU时间报告写入同名.cpu.txt文件
+            on_finished: 结束后在采样线程上调用，参数为结果字典(失败时为None)
+        
+        Returns:
+            str: 折叠栈文件路径，已有采样在进行时返回None
+        """
+        with self._lock:
+            if self.is_running():
+                return None
+            if path is None:
+                stamp = time.strftime("%Y%m%d_%H%M%S")
+                path = os.path.join(os.path.expanduser("~"), f".{APP_NAME.lower()}_profile_{stamp}.folded")
+            self._thread = threading.Thread(
+                target=self._run, args=(duration_s, path, on_finished),
+                name="RapidClickProfiler", daemon=True)
+            self._thread.start()
+            return path
+    
+    def _run(self, duration_s, path, on_finished):
+        """采样线程主循环"""
+        own_ident = threading.get_ident()
+        stacks = Counter()
+        samples = 0
+        cpu_before = thread_cpu_times()
+        wall_start = time.perf_counter()
+        deadline = wall_start + duration_s
+        
+        while time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stacks[self._collapse(names.get(ident, str(ident)), frame)] += 1
+            samples += 1
+            time.sleep(self._interval)
+        
+        wall = time.perf_counter() - wall_start
+        cpu_after = thread_cpu_times()
+        cpu = {name: cpu_after[name] - cpu_before.get(name, 0.0) for name in cpu_after}
+        
+        result = {
+            "path": path,
+            "cpu_path": path + ".cpu.txt",
+            "samples": samples,
+            "wall_s": wall,
+            "cpu_s": cpu,
+        }
+        try:
+            self._write(result, stacks)
+        except Exception as e:
+            print(f"Error writing profile: {e}")
+            result = None
+        
+        if on_finished is not None:
+            on_finished(result)
+    
+    @staticmethod
+    def _collapse(thread_name, frame):
+        """
+        把调用栈转换为折叠栈格式的一行(从根到叶，以分号分隔)
+        
+        Args:
+            thread_name: 线程名，作为栈的根
+            frame: 栈顶帧
+        
+        Returns:
+            str: 折叠后的栈
+        """
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        parts.append(thread_name)
+        parts.reverse()
+        return ";".join(parts)
+    
+    @staticmethod
+    def _write(result, stacks):
+        """写入折叠栈文件和CPU时间报告"""
+        with open(result["path"], "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        
+        wall = result["wall_s"]
+        with open(result["cpu_path"], "w", encoding="utf-8") as f:
+            f.write(f"# {APP_NAME} profile: {result['samples']} samples over {wall:.2f}s\n")
+            f.write("# thread\tcpu_s\tcpu_pct\n")
+            for name, seconds in sorted(result["cpu_s"].items(), key=lambda item: -item[1]):
+                f.write(f"{name}\t{seconds:.4f}\t{100.0 * seconds / wall if wall else 0.0:.1f}\n")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+使用统计存储模块
+
+每次连点结束后把摘要追加到紧凑的二进制日志中，写入在后台线程上完成，
+文件超过大小上限时轮转。按天和按周的汇总在第一次查询时计算并缓存，
+之后只增量读取新追加的记录。
+"""
+
+import os
+import queue
+import struct
+import datetime
+import threading
+
+from utils.constants import APP_NAME
+from utils.foreground import query_foreground_app
+
+
+# 记录格式：开始时间(Unix毫秒)、有效时长(毫秒)、点击次数、应用名长度，后跟UTF-8应用名
+_RECORD = struct.Struct("<qIIB")
+
+# 写入线程的退出标记
+_STOP = object()
+
+
+def _new_rollup():
+    """创建空的汇总项"""
+    return {"bursts": 0, "clicks": 0, "active_s": 0.0, "apps": {}}
+
+
+def _add_to_rollup(rollup, clicks, active_s, app):
+    """把一次连点计入汇总项"""
+    rollup["bursts"] += 1
+    rollup["clicks"] += clicks
+    rollup["active_s"] += active_s
+    app_rollup = rollup["apps"].setdefault(app, {"bursts": 0, "clicks": 0, "active_s": 0.0})
+    app_rollup["bursts"] += 1
+    app_rollup["clicks"] += clicks
+    app_rollup["active_s"] += active_s
+
+
+def _finish_rollup(rollup):
+    """
+    复制汇总项并计算平均点击速率
+    
+    Returns:
+        dict: bursts、clicks、active_s、cps以及按应用的同样字段(apps)
+    """
+    result = dict(rollup)
+    result["cps"] = rollup["clicks"] / rollup["active_s"] if rollup["active_s"] > 0 else 0.0
+    result["apps"] = {
+        app: dict(values, cps=values["clicks"] / values["active_s"] if values["active_s"] > 0 else 0.0)
+        for app, values in rollup["apps"].items()
+    }
+    return result
+
+
+class StatsStore:
+    """
+    连点使用统计存储
+    
+    record_burst只把摘要放入队列，可以在任意线程调用；文件写入、前台应用名
+    查询都在写入线程上完成。写入线程阻塞在队列上，空闲时不会唤醒。
+    """
+    
+    def __init__(self, directory=None, max_bytes=1024 * 1024, keep_files=3):
+        """
+        初始化统计存储
+        
+        Args:
+            directory: 日志目录，默认为用户目录下的.rapidclicker_stats
+            max_bytes: 单个日志文件的大小上限，超过后轮转
+            keep_files: 保留的已轮转文件数量
+        """
+        if directory is None:
+            directory = os.path.join(os.path.expanduser("~"), f".{APP_NAME.lower()}_stats")
+        self._directory = directory
+        self._path = os.path.join(directory, "stats.bin")
+        self._max_bytes = max_bytes
+        self._keep_files = keep_files
+        
+        self._queue = queue.Queue()
+        self._thread = None
+        self._generation = 0            # 每次轮转加一，汇总缓存据此失效
+        
+        self._rollup_lock = threading.Lock()
+        self._days = {}                 # 日期 -> 汇总项
+        self._read_offset = 0           # 当前文件已计入汇总的字节数
+        self._rollup_generation = None  # 汇总缓存对应的轮转代数
+    
+    def _rotated_path(self, index):
+        """第index个已轮转文件的路径，数字越大越旧"""
+        return os.path.join(self._directory, f"stats.{index}.bin")
+    
+    def start(self):
+        """启动写入线程"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._writer, name="RapidClickStats", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """写完队列中的记录后停止写入线程"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(2.0)
+        self._thread = None
+    
+    def record_burst(self, start_time, active_ns, clicks, app=None):
+        """
+        记录一次连点，只入队不做任何IO
+        
+        Args:
+            start_time: 开始时间(Unix秒)
+            active_ns: 从第一次点击到停止的时长(纳秒)
+            clicks: 点击次数
+            app: 连点开始时的前台应用名，为None时在写入线程上查询当前的前台应用
+        """
+        self._queue.put_nowait((start_time, active_ns, clicks, app))
+    
+    def _writer(self):
+        """写入线程主循环"""
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+        except OSError as e:
+            print(f"Error creating stats directory: {e}")
+            return
+        
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            start_time, active_ns, clicks, app = item
+            if app is None:
+                app = query_foreground_app()
+            app = app.encode("utf-8")[:255]
+            data = _RECORD.pack(int(start_time * 1000), int(active_ns // 1000000), clicks, len(app)) + app
+            try:
+                with open(self._path, "ab") as f:
+                    f.write(data)
+                    size = f.tell()
+                if size >= self._max_bytes:
+                    self._rotate()
+            except OSError as e:
+                print(f"Error writing stats: {e}")
+    
+    def _rotate(self):
+        """轮转日志文件：stats.bin -> stats.1.bin -> stats.2.bin ..."""
+        oldest = self._rotated_path(self._keep_files)
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for index in range(self._keep_files - 1, 0, -1):
+            path = self._rotated_path(index)
+            if os.path.exists(path):
+                os.replace(path, self._rotated_path(index + 1))
+        os.replace(self._path, self._rotated_path(1))
+        self._generation += 1
+    
+    def _read_records(self, path, offset):
+        """
+        从offset开始读取完整的记录
+        
+        Args:
+            path: 日志文件路径
+            offset: 起始字节
+        
+        Returns:
+            tuple: (记录列表, 读到的最后一条完整记录之后的偏移)
+        """
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return [], offset
+        
+        records = []
+        pos = 0
+        header = _RECORD.size
+        # 写入线程可能正在追加，末尾不完整的记录留到下次读取
+        while pos + header <= len(data):
+            start_ms, active_ms, clicks, app_len = _RECORD.unpack_from(data, pos)
+            if pos + header + app_len > len(data):
+                break
+            app = data[pos + header:pos + header + app_len].decode("utf-8", "replace")
+            records.append((start_ms, active_ms, clicks, app))
+            pos += header + app_len
+        return records, offset + pos
+    
+    def _refresh_rollups(self):
+        """增量更新按天汇总，必须持有_rollup_lock"""
+        if self._rollup_generation != self._generation:
+            # 发生过轮转，从所有文件重新计算
+            self._rollup_generation = self._generation
+            self._days = {}
+            self._read_offset = 0
+            for index in range(self._keep_files, 0, -1):
+                self._add_records(self._read_records(self._rotated_path(index), 0)[0])
+        
+        records, self._read_offset = self._read_records(self._path, self._read_offset)
+        self._add_records(records)
+    
+    def _add_records(self, records):
+        """把记录计入按天汇总"""
+        for start_ms, active_ms, clicks, app in records:
+            day = datetime.date.fromtimestamp(start_ms / 1000.0)
+            rollup = self._days.get(day)
+            if rollup is None:
+                rollup = self._days[day] = _new_rollup()
+            _add_to_rollup(rollup, clicks, active_ms / 1000.0, app)
+    
+    def daily(self):
+        """
+        获取按天的汇总
+        
+        Returns:
+            dict: datetime.date -> 汇总(bursts、clicks、active_s、cps、apps)
+        """
+        with self._rollup_lock:
+            self._refresh_rollups()
+            return {day: _finish_rollup(rollup) for day, rollup in self._days.items()}
+    
+    def weekly(self):
+        """
+        获取按ISO周的汇总
+        
+        Returns:
+            dict: (年, 周) -> 汇总(bursts、clicks、active_s、cps、apps)
+        """
+        with self._rollup_lock:
+            self._refresh_rollups()
+            weeks = {}
+            for day, rollup in self._days.items():
+                week = weeks.setdefault(day.isocalendar()[:2], _new_rollup())
+                week["bursts"] += rollup["bursts"]
+                week["clicks"] += rollup["clicks"]
+                week["active_s"] += rollup["active_s"]
+                for app, values in rollup["apps"].items():
+                    app_week = week["apps"].setdefault(app, {"bursts": 0, "clicks": 0, "active_s": 0.0})
+                    for key in ("bursts", "clicks", "active_s"):
+                        app_week[key] += values[key]
+            return {week: _finish_rollup(rollup) for week, rollup in weeks.items()}
+    
+    def summary(self, today=None):
+        """
+        获取今天和本周的汇总，供界面显示
+        
+        Args:
+            today: 日期，默认为今天
+        
+        Returns:
+            tuple: (今天的汇总, 本周的汇总)，没有数据时为空汇总
+        """
+        today = today or datetime.date.today()
+        empty = _finish_rollup(_new_rollup())
+        return self.daily().get(today, empty), self.weekly().get(today.isocalendar()[:2], empty)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+线程调度调优模块，设置当前线程的CPU亲和性和调度优先级
+"""
+
+import os
+import sys
+import ctypes
+import threading
+
+
+# 优先级级别
+PRIORITY_NORMAL = "normal"       # 不做调整
+PRIORITY_HIGH = "high"           # 提高普通优先级(nice值/THREAD_PRIORITY_HIGHEST)
+PRIORITY_REALTIME = "realtime"   # 请求实时调度(SCHED_FIFO/SCHED_RR/THREAD_PRIORITY_TIME_CRITICAL)
+
+# Windows线程优先级常量
+_THREAD_PRIORITY_HIGHEST = 2
+_THREAD_PRIORITY_TIME_CRITICAL = 15
+
+# Linux下提高优先级时使用的nice增量
+_NICE_BUMP = -5
+
+
+def tune_current_thread(cpus=None, priority=PRIORITY_NORMAL):
+    """
+    调整当前线程的CPU亲和性和调度优先级
+    
+    必须在目标线程内调用。请求无法满足时会逐级降级，返回值记录实际获得的设置。
+    
+    Args:
+        cpus: 允许运行的CPU编号列表，为空表示不限制
+        priority: 优先级级别(normal/high/realtime)
+    
+    Returns:
+        dict: thread为线程名，affinity为实际生效的CPU列表(未设置时为None)，
+            priority为实际获得的调度策略描述
+    """
+    report = {
+        "thread": threading.current_thread().name,
+        "affinity": None,
+        "priority": PRIORITY_NORMAL,
+    }
+    
+    if sys.platform == "win32":
+        _tune_windows(cpus, priority, report)
+    else:
+        _tune_posix(cpus, priority, report)
+    return report
+
+
+def _tune_posix(cpus, priority, report):
+    """Linux实现：线程级sched_setaffinity/sched_setscheduler，pid为0表示调用线程"""
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, set(cpus))
+            report["affinity"] = sorted(os.sched_getaffinity(0))
+        except OSError as e:
+            report["affinity_error"] = str(e)
+    
+    if priority == PRIORITY_REALTIME and hasattr(os, "sched_setscheduler"):
+        for policy_name in ("SCHED_FIFO", "SCHED_RR"):
+            policy = getattr(os, policy_name)
+            try:
+                param = os.sched_param(os.sched_get_priority_min(policy) + 1)
+                os.sched_setscheduler(0, policy, param)
+                report["priority"] = f"{policy_name}({param.sched_priority})"
+                return
+            except OSError:
+                continue
+        # 没有CAP_SYS_NICE或RLIMIT_RTPRIO时退回nice调整
+    
+    if priority in (PRIORITY_HIGH, PRIORITY_REALTIME) and hasattr(os, "setpriority"):
+        tid = threading.get_native_id()
+        try:
+            current = os.getpriority(os.PRIO_PROCESS, tid)
+            os.setpriority(os.PRIO_PROCESS, tid, current + _NICE_BUMP)
+            report["priority"] = f"nice({os.getpriority(os.PRIO_PROCESS, tid)})"
+        except OSError as e:
+            report["priority_error"] = str(e)
+
+
+def _tune_windows(cpus, priority, report):
+    """Windows实现：SetThreadAffinityMask/SetThreadPriority"""
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.GetCurrentThread.restype = ctypes.c_void_p
+    kernel32.SetThreadAffinityMask.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+    kernel32.SetThreadAffinityMask.restype = ctypes.c_size_t
+    kernel32.SetThreadPriority.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    kernel32.GetThreadPriority.argtypes = [ctypes.c_void_p]
+    handle = kernel32.GetCurrentThread()
+    
+    if cpus:
+        mask = 0
+        for cpu in cpus:
+            mask |= 1 << int(cpu)
+        if kernel32.SetThreadAffinityMask(handle, mask):
+            report["affinity"] = sorted(int(cpu) for cpu in cpus)
+        else:
+            report["affinity_error"] = f"SetThreadAffinityMask failed: {ctypes.get_last_error()}"
+    
+    levels = []
+    if priority == PRIORITY_REALTIME:
+        levels.append(_THREAD_PRIORITY_TIME_CRITICAL)
+    if priority in (PRIORITY_HIGH, PRIORITY_REALTIME):
+        levels.append(_THREAD_PRIORITY_HIGHEST)
+    for level in levels:
+        if kernel32.SetThreadPriority(handle, level):
+            granted = kernel32.GetThreadPriority(handle)
+            report["priority"] = "time_critical" if granted == _THREAD_PRIORITY_TIME_CRITICAL else f"thread_priority({granted})"
+            return
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+"""
+测试配置：把src加入模块搜索路径，测试只使用不依赖Qt和pynput的核心模块
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""
+事件时间换算测试：32位毫秒时间戳回绕与乱序事件
+"""
+
+from core.clock import EventTimeNormalizer, NS_PER_MS
+
+
+WRAP_MS = EventTimeNormalizer.WRAP_MS
+
+# 偏移估计按经过的时间放宽，换算结果允许有这么多的误差
+_DRIFT_NS = 10000
+
+
+def test_timestamps_continue_across_wrap():
+    normalizer = EventTimeNormalizer()
+    start_ns = 10 ** 12
+    first_ns, delay = normalizer.normalize(WRAP_MS - 5, start_ns)
+    assert (first_ns, delay) == (start_ns, 0)
+    
+    # 计数器从0xFFFFFFFB回绕到5，实际只经过了10毫秒
+    event_ns, delay = normalizer.normalize(5, start_ns + 10 * NS_PER_MS)
+    assert event_ns - first_ns == 10 * NS_PER_MS
+    assert delay == 0
+
+
+def test_delivery_delay_measured_across_wrap():
+    normalizer = EventTimeNormalizer()
+    normalizer.normalize(WRAP_MS - 1, 0)
+    # 事件在回绕后1毫秒发生，但3毫秒后才投递
+    event_ns, delay = normalizer.normalize(1, 5 * NS_PER_MS)
+    assert abs(event_ns - 2 * NS_PER_MS) < _DRIFT_NS
+    assert abs(delay - 3 * NS_PER_MS) < _DRIFT_NS
+
+
+def test_out_of_order_event_just_before_wrap():
+    normalizer = EventTimeNormalizer()
+    normalizer.normalize(WRAP_MS - 2, 0)
+    normalizer.normalize(3, 5 * NS_PER_MS)
+    # 回绕前发生的事件晚到，按负差值处理而不是向前跳约49.7天
+    event_ns, delay = normalizer.normalize(WRAP_MS - 1, 6 * NS_PER_MS)
+    assert abs(event_ns - 1 * NS_PER_MS) < _DRIFT_NS
+    assert abs(delay - 5 * NS_PER_MS) < _DRIFT_NS
+
+
+def test_missing_timestamp_uses_callback_time():
+    normalizer = EventTimeNormalizer()
+    assert normalizer.normalize(None, 123) == (123, 0)
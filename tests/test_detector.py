@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""
+自适应触发检测器测试：学习节奏、提前触发与误触发统计
+"""
+
+from core.clock import NS_PER_MS
+from core.detector import AdaptiveTriggerDetector
+
+
+GAP_NS = 50 * NS_PER_MS
+
+
+def _detector():
+    return AdaptiveTriggerDetector(5, 300 * NS_PER_MS, min_count=3, tolerance=2.0,
+                                   min_samples=4, confirm_hold_ns=150 * NS_PER_MS)
+
+
+def _tap_run(detector, start_ns, taps, gap_ns=GAP_NS):
+    """一轮连按，返回每次按下是否触发以及最后一次按下的时间"""
+    results = []
+    t = start_ns
+    for i in range(taps):
+        t = start_ns + i * gap_ns
+        results.append(detector.press(t))
+        if i < taps - 1:
+            detector.release(t + 10 * NS_PER_MS)
+    return results, t
+
+
+def test_learns_cadence_from_confirmed_full_trigger():
+    detector = _detector()
+    learned = []
+    detector.on_learned = learned.append
+    
+    results, last_ns = _tap_run(detector, 0, 5)
+    assert results == [False, False, False, False, True]
+    # 按住超过确认时长后释放，这一轮的间隔用于学习
+    detector.release(last_ns + 200 * NS_PER_MS)
+    
+    assert detector.samples == 4
+    assert detector.mean_ns == GAP_NS
+    assert learned == [[50.0, 0.0, 4]]
+    snapshot = detector.snapshot()
+    assert snapshot["full_triggers"] == 1 and snapshot["early_triggers"] == 0
+    assert snapshot["full_latency_ms"] == 200.0
+
+
+def test_triggers_early_once_cadence_is_learned():
+    detector = _detector()
+    detector.load_model([50.0, 4.0, 20])
+    
+    results, last_ns = _tap_run(detector, 0, 3)
+    assert results == [False, False, True]
+    detector.release(last_ns + 200 * NS_PER_MS)
+    
+    snapshot = detector.snapshot()
+    assert snapshot["early_triggers"] == 1
+    assert snapshot["early_latency_ms"] == 100.0
+    assert snapshot["false_early"] == 0
+    assert detector.samples == 22
+
+
+def test_no_early_trigger_before_enough_samples():
+    detector = _detector()
+    detector.load_model([50.0, 4.0, 3])
+    results, _ = _tap_run(detector, 0, 3)
+    assert results == [False, False, False]
+
+
+def test_no_early_trigger_off_cadence():
+    detector = _detector()
+    detector.load_model([50.0, 4.0, 20])
+    # 间隔30毫秒，超出50±2×2毫秒
+    results, _ = _tap_run(detector, 0, 3, 30 * NS_PER_MS)
+    assert results == [False, False, False]
+
+
+def test_unconfirmed_early_trigger_counts_as_false():
+    detector = _detector()
+    detector.load_model([50.0, 4.0, 20])
+    
+    results, last_ns = _tap_run(detector, 0, 3)
+    assert results[-1]
+    # 触发后很快释放，没有确认
+    detector.release(last_ns + 20 * NS_PER_MS)
+    assert detector.samples == 20
+    
+    # 下一轮开始时结算上一轮
+    detector.press(last_ns + 1000 * NS_PER_MS)
+    snapshot = detector.snapshot()
+    assert snapshot["false_early"] == 1
+    assert snapshot["false_early_rate"] == 1.0
+
+
+def test_model_round_trip():
+    detector = _detector()
+    detector.load_model([42.5, 9.0, 30])
+    assert detector.model() == [42.5, 9.0, 30]
+    detector.load_model(None)
+    assert detector.model() == [0.0, 0.0, 0]
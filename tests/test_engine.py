@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""
+连点引擎测试：在虚拟时钟下检查触发检测、调度器和模拟不变量
+"""
+
+import pytest
+
+from core.clock import VirtualClock, NS_PER_MS
+from core.detector import TriggerDetector
+from core.engine import ClickEngine
+from core.injected import InjectedEvents
+from core.scheduler import DeadlineScheduler, ScheduledJob
+from core.simulation import RecordingInjector, SyntheticEventSource, Simulation, fuzz
+
+
+class _OnceJob(ScheduledJob):
+    """执行一次并记录执行时间的任务"""
+    
+    def __init__(self, fired):
+        super(_OnceJob, self).__init__()
+        self.fired = fired
+        self.finished_calls = 0
+    
+    def fire(self, now_ns):
+        self.fired.append((self, now_ns))
+        return None
+    
+    def on_finished(self):
+        self.finished_calls += 1
+
+
+def _run_all(scheduler, clock):
+    """按截止时间执行到没有任务"""
+    deadline = scheduler.next_deadline()
+    while deadline is not None:
+        clock.advance_to(deadline)
+        deadline = scheduler.run_due()
+
+
+def test_fuzz_holds_invariants_with_fixed_seed():
+    stats = fuzz(50, gestures=50, seed=1)
+    assert stats["violations"] == []
+    assert stats["triggers"] > 0
+    assert stats["clicks"] > stats["triggers"]
+
+
+def test_check_invariants_on_generated_sequence():
+    events = SyntheticEventSource(seed=7).generate(200, 5, 300)
+    sim = Simulation(trigger_count=5, trigger_interval_ms=300, click_interval_ms=50)
+    sim.run(events)
+    assert sim.check_invariants(events) == []
+
+
+def test_trigger_exactly_at_window_boundary():
+    detector = TriggerDetector(3, 300 * NS_PER_MS)
+    assert not detector.press(0)
+    assert not detector.press(150 * NS_PER_MS)
+    # 跨度恰好等于窗口时触发
+    assert detector.press(300 * NS_PER_MS)
+    assert detector.span_ns() == 300 * NS_PER_MS
+
+
+def test_no_trigger_one_nanosecond_past_window():
+    detector = TriggerDetector(3, 300 * NS_PER_MS)
+    detector.press(0)
+    detector.press(150 * NS_PER_MS)
+    assert not detector.press(300 * NS_PER_MS + 1)
+
+
+def test_trigger_after_ring_buffer_wraps():
+    detector = TriggerDetector(3, 300 * NS_PER_MS)
+    # 慢速按下填满并绕过环形缓冲区
+    for i in range(7):
+        assert not detector.press(i * 200 * NS_PER_MS)
+    base = 6 * 200 * NS_PER_MS
+    # 最近三次中最早的一次仍是慢速按下，不触发
+    assert not detector.press(base + 250 * NS_PER_MS)
+    # 最近三次的跨度恰好等于窗口
+    assert detector.press(base + 300 * NS_PER_MS)
+    assert detector.span_ns() == 300 * NS_PER_MS
+    # 写入位置绕回后继续按窗口判断
+    assert detector.press(base + 400 * NS_PER_MS)
+    assert detector.span_ns() == 150 * NS_PER_MS
+    # 间隔超过窗口，之前的按下不再参与触发
+    assert not detector.press(base + 1000 * NS_PER_MS)
+    assert detector.size == 1
+
+
+def test_scheduler_cancel_then_resubmit():
+    clock = VirtualClock()
+    scheduler = DeadlineScheduler(clock)
+    fired = []
+    
+    cancelled = _OnceJob(fired)
+    scheduler.submit(cancelled, 10 * NS_PER_MS)
+    scheduler.cancel(cancelled)
+    assert cancelled.cancelled and cancelled.finished
+    assert cancelled.finished_calls == 1
+    # 重复取消不会再次调用on_finished
+    scheduler.cancel(cancelled)
+    assert cancelled.finished_calls == 1
+    assert scheduler.next_deadline() is None
+    
+    resubmitted = _OnceJob(fired)
+    scheduler.submit(resubmitted, 20 * NS_PER_MS)
+    assert scheduler.next_deadline() == 20 * NS_PER_MS
+    _run_all(scheduler, clock)
+    
+    assert fired == [(resubmitted, 20 * NS_PER_MS)]
+    assert resubmitted.finished and not resubmitted.cancelled
+    assert resubmitted.finished_calls == 1
+
+
+def test_scheduler_runs_jobs_in_deadline_order_after_cancel():
+    clock = VirtualClock()
+    scheduler = DeadlineScheduler(clock)
+    fired = []
+    jobs = [_OnceJob(fired) for _ in range(3)]
+    for i, job in enumerate(jobs):
+        scheduler.submit(job, (30 - i * 10) * NS_PER_MS)
+    scheduler.cancel(jobs[2])
+    _run_all(scheduler, clock)
+    assert fired == [(jobs[1], 20 * NS_PER_MS), (jobs[0], 30 * NS_PER_MS)]
+
+
+def _bounded_engine(click_interval_ms=5):
+    """虚拟时钟下的连点引擎"""
+    clock = VirtualClock()
+    scheduler = DeadlineScheduler(clock)
+    injector = RecordingInjector(clock)
+    engine = ClickEngine(injector, scheduler)
+    engine.configure(5, 300, click_interval_ms)
+    return engine, scheduler, clock, injector
+
+
+def test_bounded_burst_exact_clicks():
+    engine, scheduler, clock, injector = _bounded_engine()
+    done = []
+    job = engine.run_bounded(clicks=1000, on_done=done.append)
+    _run_all(scheduler, clock)
+    
+    report = job.report()
+    assert done == [job]
+    assert len(injector.clicks) == 1000
+    assert report["clicks"] == 1000 and report["completed"]
+    assert report["duration_ms"] == 999 * 5
+    assert report["duration_error_ms"] == 0
+    assert report["max_error_ms"] == 0
+
+
+def test_bounded_burst_exact_duration():
+    engine, scheduler, clock, injector = _bounded_engine()
+    job = engine.run_bounded(duration_ms=2000)
+    _run_all(scheduler, clock)
+    
+    report = job.report()
+    assert report["completed"]
+    assert report["clicks"] == 400
+    assert report["duration_ms"] == 2000
+    # 最后一次点击在结束时刻之前
+    assert injector.clicks[-1] < 2000 * NS_PER_MS
+
+
+def test_bounded_burst_stops_at_first_limit():
+    engine, scheduler, clock, injector = _bounded_engine()
+    job = engine.run_bounded(clicks=10, duration_ms=20)
+    _run_all(scheduler, clock)
+    assert job.report()["clicks"] == 4
+    assert job.completed
+
+
+def test_bounded_burst_cancel():
+    engine, scheduler, clock, injector = _bounded_engine()
+    done = []
+    job = engine.run_bounded(clicks=100, on_done=done.append)
+    for _ in range(7):
+        clock.advance_to(scheduler.next_deadline())
+        scheduler.run_due()
+    scheduler.cancel(job)
+    
+    assert done == [job]
+    assert job.report()["clicks"] == 7
+    assert not job.completed
+    assert scheduler.next_deadline() is None
+
+
+def test_bounded_burst_requires_a_limit():
+    engine = _bounded_engine()[0]
+    with pytest.raises(ValueError):
+        engine.run_bounded()
+
+
+def test_late_injected_events_are_recognised_after_injection_returns():
+    engine, scheduler, clock, injector = _bounded_engine()
+    engine.run_bounded(clicks=3)
+    _run_all(scheduler, clock)
+    
+    # 注入早已返回，钩子此时才收到三次按下和释放
+    for _ in range(3):
+        assert engine.injected.consume(True)
+        assert engine.injected.consume(False)
+    # 之后的事件来自用户
+    assert not engine.injected.consume(False)
+    assert engine.injected.pending() == 0
+
+
+def test_injected_event_registrations_expire():
+    injected = InjectedEvents()
+    injected.EXPIRY_NS = -1
+    injected.expect(True)
+    assert not injected.consume(True)
+    assert injected.pending() == 0
+
+
+def test_forget_cancels_a_failed_injection():
+    injected = InjectedEvents()
+    injected.expect((1, True))
+    injected.forget((1, True))
+    assert not injected.consume((1, True))
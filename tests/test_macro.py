@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""
+宏录制与回放测试：保存、读取并在虚拟时钟下按缩放后的时间回放
+"""
+
+import pytest
+
+from core.clock import VirtualClock, NS_PER_MS
+from core.macro import MacroRecorder, MacroFile, MacroPlayer, macro_dir_path, BUTTON_LEFT, BUTTON_RIGHT
+from core.scheduler import DeadlineScheduler
+
+
+class _ButtonInjector:
+    """记录回放注入的按键事件"""
+    
+    def __init__(self, clock):
+        self._clock = clock
+        self.events = []
+    
+    def button_at(self, x, y, button, pressed):
+        self.events.append((self._clock.now_ns(), x, y, button, pressed))
+
+
+def _record(path):
+    """录制一个两次点击的宏，返回(事件, 录制时长)"""
+    start_ns = 5000 * NS_PER_MS
+    recorder = MacroRecorder(start_ns)
+    events = [
+        (0, 10, 20, BUTTON_LEFT, True),
+        (30, 10, 20, BUTTON_LEFT, False),
+        (100, 300, 400, BUTTON_RIGHT, True),
+        (140, 300, 400, BUTTON_RIGHT, False),
+    ]
+    for t_ms, x, y, button, pressed in events:
+        recorder.add(x, y, button, pressed, start_ns + t_ms * NS_PER_MS)
+    count, duration_ns = recorder.save(path, start_ns + 200 * NS_PER_MS)
+    assert count == len(events)
+    return events, duration_ns
+
+
+def _run_all(scheduler, clock):
+    deadline = scheduler.next_deadline()
+    while deadline is not None:
+        clock.advance_to(deadline)
+        deadline = scheduler.run_due()
+
+
+def test_save_and_read_back(tmp_path):
+    path = str(tmp_path / "macro.bin")
+    events, duration_ns = _record(path)
+    assert duration_ns == 200 * NS_PER_MS
+    
+    macro = MacroFile(path)
+    try:
+        assert macro.count == len(events)
+        assert macro.duration_ns == duration_ns
+        codes = [(t // NS_PER_MS, x, y, code >> 1, bool(code & 1)) for t, x, y, code in macro.read_chunk()]
+        assert codes == events
+        assert macro.read_chunk() == []
+    finally:
+        macro.close()
+
+
+def test_playback_scales_time_and_loops(tmp_path):
+    path = str(tmp_path / "macro.bin")
+    events, duration_ns = _record(path)
+    clock = VirtualClock(1000 * NS_PER_MS)
+    scheduler = DeadlineScheduler(clock)
+    injector = _ButtonInjector(clock)
+    player = MacroPlayer(injector, scheduler)
+    finished = []
+    player.on_finished = finished.append
+    
+    job = player.play(path, speed=2.0, loops=2)
+    _run_all(scheduler, clock)
+    
+    base_ns = 1000 * NS_PER_MS
+    expected = []
+    for loop in range(2):
+        loop_ns = base_ns + loop * duration_ns // 2
+        expected.extend((loop_ns + t_ms * NS_PER_MS // 2, x, y, button, pressed)
+                        for t_ms, x, y, button, pressed in events)
+    assert injector.events == expected
+    assert finished == [job]
+    assert not player.is_playing()
+    timing = job.timing()
+    assert timing["events"] == 2 * len(events)
+    assert timing["loops"] == 2
+    assert timing["max_ms"] == 0.0
+
+
+def test_playback_events_recognised_after_playback_ends(tmp_path):
+    path = str(tmp_path / "macro.bin")
+    events, _ = _record(path)
+    clock = VirtualClock()
+    scheduler = DeadlineScheduler(clock)
+    player = MacroPlayer(_ButtonInjector(clock), scheduler)
+    player.play(path)
+    _run_all(scheduler, clock)
+    assert not player.is_playing()
+    
+    # 回放结束后钩子才收到注入的事件，仍然识别为回放事件
+    for _, _, _, button, pressed in events:
+        assert player.consume_injected(button, pressed)
+    assert not player.consume_injected(BUTTON_LEFT, True)
+
+
+def test_stop_releases_held_buttons(tmp_path):
+    path = str(tmp_path / "macro.bin")
+    _record(path)
+    clock = VirtualClock()
+    scheduler = DeadlineScheduler(clock)
+    injector = _ButtonInjector(clock)
+    player = MacroPlayer(injector, scheduler)
+    
+    player.play(path)
+    # 只执行第一个事件(左键按下)后停止
+    scheduler.run_due()
+    player.stop()
+    assert [event[3:] for event in injector.events] == [(BUTTON_LEFT, True), (BUTTON_LEFT, False)]
+    assert not player.is_playing()
+
+
+def test_not_a_macro_file(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a macro file at all")
+    with pytest.raises(ValueError):
+        MacroFile(str(path))
+
+
+@pytest.mark.parametrize("name", ["", ".", "..", "../macro.bin", "a/../../b", "/etc/passwd", "sub/macro.bin"])
+def test_macro_dir_path_rejects_paths(name):
+    with pytest.raises(ValueError):
+        macro_dir_path(name)
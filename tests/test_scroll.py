@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+滚轮连续滚动测试：注入的刻度晚到时不当作用户滚动
+"""
+
+from core.clock import VirtualClock, NS_PER_MS
+from core.scheduler import DeadlineScheduler
+from core.scroll_engine import ScrollEngine
+
+
+class _ScrollInjector:
+    """记录注入的滚动，按X11的方式每个刻度产生一个钩子事件"""
+    
+    def __init__(self):
+        self.scrolls = []
+    
+    def scroll(self, dx, dy):
+        self.scrolls.append((dx, dy))
+    
+    def scroll_events(self, notches):
+        return abs(notches)
+
+
+def _start_scrolling():
+    clock = VirtualClock()
+    scheduler = DeadlineScheduler(clock)
+    injector = _ScrollInjector()
+    engine = ScrollEngine(injector, scheduler)
+    engine.configure(4, 250, 30, 3, 400)
+    started = False
+    for i in range(4):
+        clock.advance_to(i * 50 * NS_PER_MS)
+        started = engine.on_scroll(0, -1, clock.now_ns())
+    assert started
+    return engine, scheduler, clock, injector
+
+
+def test_late_injected_scrolls_are_recognised_after_injection_returns():
+    engine, scheduler, clock, injector = _start_scrolling()
+    for _ in range(2):
+        clock.advance_to(scheduler.next_deadline())
+        scheduler.run_due()
+    engine.stop()
+    assert injector.scrolls == [(0, -3), (0, -3)]
+    
+    # 注入早已返回，钩子此时才逐个收到六个刻度
+    for _ in range(6):
+        assert engine.consume_injected(0, -1)
+    # 之后的滚动来自用户
+    assert not engine.consume_injected(0, -1)
+    assert engine.injected.pending() == 0
+
+
+def test_repeat_scrolling_ends_after_sustain_without_user_scrolls():
+    engine, scheduler, clock, injector = _start_scrolling()
+    # 每个注入的刻度到达钩子时都被识别，不会刷新用户滚动时间
+    deadline = scheduler.next_deadline()
+    while deadline is not None and clock.now_ns() < 5000 * NS_PER_MS:
+        clock.advance_to(deadline)
+        deadline = scheduler.run_due()
+        while engine.consume_injected(0, -1):
+            pass
+    assert not engine.is_scrolling()
+    assert clock.now_ns() < 1000 * NS_PER_MS
+
+
+def test_failed_scroll_injection_is_forgotten():
+    engine, scheduler, clock, injector = _start_scrolling()
+    
+    def fail(dx, dy):
+        raise OSError("injection failed")
+    
+    injector.scroll = fail
+    clock.advance_to(scheduler.next_deadline())
+    scheduler.run_due()
+    assert engine.injected.pending() == 0
+    engine.stop()